@@ -0,0 +1,159 @@
+import threading
+import time
+from logger import logger
+
+
+def _int(value):
+    """체결잔고 값 → int (부호/공백 포함, 비어 있으면 0)"""
+    try:
+        return int(str(value).strip().replace(",", "") or 0)
+    except ValueError:
+        return 0
+
+
+class AccountBook:
+    """보유 종목 / 미체결 주문 메모리 장부
+
+    로그인 후 opw00018 / opt10075 로 한 번 채운 뒤(seed) OnReceiveChejanData 의
+    주문체결(gubun 0) / 잔고(gubun 1) 이벤트로 갱신한다. 주기적인 재조회(reconcile)로 어긋남을 확인한다.
+    Qt 스레드가 쓰고 HTTP 서버(asyncio) 스레드가 읽으므로 lock 으로 보호한다.
+    조회 함수는 아직 채워지기 전이면 None 을 반환한다 (호출 측이 TR 로 조회).
+    """
+
+    def __init__(self, quote_book=None):
+        self.quote_book = quote_book
+        self._positions = {}  # 종목코드(A 제외) -> {code, name, quantity, purchase_price, current_price}
+        self._orders = {}  # 주문번호 -> {code, name, qty, filled, price, order_no, order_type}
+        self._lock = threading.Lock()
+        self.seeded = False
+        self.chejan_events = 0
+        self.reconciled_at = None
+        self.drift_count = 0
+
+    # ---------------- seed / reconcile (TR 결과) ----------------
+    def load(self, holdings, orders):
+        """TR 조회 결과로 장부 교체. 기존 장부와 달랐으면 True (seed 이후에만 판단)"""
+        positions = {}
+        for h in holdings:
+            code = h["code"].replace("A", "")
+            if h.get("quantity", 0) > 0:
+                positions[code] = {
+                    "code": "A" + code,
+                    "name": h.get("name", ""),
+                    "quantity": h["quantity"],
+                    "purchase_price": h.get("purchase_price", 0),
+                    "current_price": h.get("current_price", 0),
+                }
+        order_map = {o["order_no"]: dict(o) for o in orders}
+
+        with self._lock:
+            drift = self.seeded and (
+                self._position_keys(self._positions) != self._position_keys(positions)
+                or set(self._orders) != set(order_map)
+            )
+            self._positions = positions
+            self._orders = order_map
+            self.seeded = True
+            self.reconciled_at = time.time()
+            if drift:
+                self.drift_count += 1
+
+        if drift:
+            logger.warning("[계좌 장부] 재조회 결과와 체결 이벤트 기반 장부가 달라 TR 결과로 교체")
+        return drift
+
+    @staticmethod
+    def _position_keys(positions):
+        return {(code, p["quantity"], p["purchase_price"]) for code, p in positions.items()}
+
+    # ---------------- 체결잔고 이벤트 ----------------
+    def on_order_event(self, fields):
+        """주문접수/체결/취소 (gubun 0). fields: FID -> 값"""
+        order_no = fields.get(9203, "").strip()
+        if not order_no:
+            return
+        qty = _int(fields.get(900))
+        unfilled = _int(fields.get(902))
+
+        with self._lock:
+            self.chejan_events += 1
+            if unfilled <= 0:
+                self._orders.pop(order_no, None)
+                return
+            self._orders[order_no] = {
+                "code": fields.get(9001, "").strip().replace("A", ""),
+                "name": fields.get(302, "").strip(),
+                "qty": qty,
+                "filled": qty - unfilled,
+                "price": abs(_int(fields.get(901))),
+                "order_no": order_no,
+                "order_type": fields.get(905, "").strip(),
+            }
+
+    def on_balance_event(self, fields):
+        """잔고 변경 (gubun 1). 변경된 종목의 (종목코드, 매입단가, 보유수량, 종목명) 반환"""
+        code = fields.get(9001, "").strip().replace("A", "")
+        if not code:
+            return None
+        quantity = _int(fields.get(930))
+        purchase_price = abs(_int(fields.get(931)))
+        name = fields.get(302, "").strip()
+
+        with self._lock:
+            self.chejan_events += 1
+            if quantity <= 0:
+                self._positions.pop(code, None)
+            else:
+                self._positions[code] = {
+                    "code": "A" + code,
+                    "name": name,
+                    "quantity": quantity,
+                    "purchase_price": purchase_price,
+                    "current_price": abs(_int(fields.get(10))),
+                }
+        return code, purchase_price, quantity, name
+
+    # ---------------- 조회 (HTTP 이벤트 루프에서 직접 호출) ----------------
+    def _current_price(self, code, position):
+        price = self.quote_book.price(code) if self.quote_book else None
+        return price or position["current_price"]
+
+    def holdings(self):
+        """opw00018 보유 종목과 같은 형식의 list (seed 전이면 None)"""
+        with self._lock:
+            if not self.seeded:
+                return None
+            positions = [(code, dict(p)) for code, p in self._positions.items()]
+        for code, p in positions:
+            p["current_price"] = self._current_price(code, p)
+        return [p for _, p in positions]
+
+    def balance_summary(self):
+        """{total_investment, total_valuation} (seed 전이면 None)"""
+        holdings = self.holdings()
+        if holdings is None:
+            return None
+        total = sum(h["purchase_price"] * h["quantity"] for h in holdings)
+        valuation = sum(h["current_price"] * h["quantity"] for h in holdings)
+        return {
+            "total_investment": f"{total:,}",
+            "total_valuation": f"{valuation:,}",
+        }
+
+    def unfilled_orders(self):
+        """{"orders": [...]} (seed 전이면 None)"""
+        with self._lock:
+            if not self.seeded:
+                return None
+            return {"orders": [dict(o) for _, o in sorted(self._orders.items())]}
+
+    def stats(self):
+        with self._lock:
+            return {
+                "seeded": self.seeded,
+                "positions": len(self._positions),
+                "orders": len(self._orders),
+                "chejan_events": self.chejan_events,
+                "reconciled_at": self.reconciled_at,
+                "drift_count": self.drift_count,
+            }
@@ -1,226 +1,150 @@
-from flask import Flask, render_template, jsonify, request
+import asyncio
+from quart import Quart, render_template, jsonify, request, Response
+from hypercorn.asyncio import serve
+from hypercorn.config import Config as HypercornConfig
+from concurrent.futures import Future
 from threading import Thread
-from kiwoom_app import KiwoomAppWrapper, request_queue, response_queue
-import time
+from config import Config
+from kiwoom_app import KiwoomAppWrapper, call_kiwoom, call_kiwoom_cached, queue_depth, submit_request
 from logger import logger
-
-app = Flask(__name__)
-kiwoom = KiwoomAppWrapper()
+from event_hub import event_hub
+from scan_jobs import parse_basket_item
+
+# asyncio 서버(Quart + Hypercorn). 핸들러는 Qt 스레드가 완료하는 Future 를 await 하므로 대기 중에 스레드를 잡지 않음
+app = Quart(__name__)
+# 백테스트 프로세스 풀(spawn)이 이 모듈을 다시 import 해도 Qt/키움이 생성되지 않도록 import 시점에는 만들지 않음.
+# python app.py 는 __main__ 에서 메인 스레드에 만들고, hypercorn app:app 은 before_serving 에서 전용 스레드에 만든다.
+kiwoom = None
+
+def _run_kiwoom(ready):
+    """Qt/키움 생성 → 생성 결과를 ready 로 알린 뒤 같은 스레드에서 Qt 이벤트 루프 실행"""
+    try:
+        wrapper = KiwoomAppWrapper()
+    except Exception as e:
+        logger.error(f"키움 초기화 오류: {e}")
+        ready.set_exception(e)
+        return
+    ready.set_result(wrapper)
+    wrapper.run()
+
+@app.before_serving
+async def start_kiwoom():
+    """외부 ASGI 서버(hypercorn app:app)로 실행하면 서버가 메인 스레드를 쓰므로 Qt 는 별도 스레드에서 실행"""
+    global kiwoom
+    if kiwoom is not None:
+        return
+    ready = Future()
+    Thread(target=_run_kiwoom, args=(ready,), daemon=True).start()
+    kiwoom = await asyncio.wrap_future(ready)
 
 @app.route("/")
-def index():
-    return render_template("index.html")
+async def index():
+    return await render_template("index.html")
 
 @app.route("/index2")
-def index2():
-    return render_template("index2.html")
+async def index2():
+    return await render_template("index2.html")
 
 @app.route("/index3")
-def index3():
-    return render_template("index3.html")
+async def index3():
+    return await render_template("index3.html")
 
 @app.route("/index4")
-def index4():
-    return render_template("index4.html")
+async def index4():
+    return await render_template("index4.html")
 
 @app.route("/index5")
-def index5():
-    return render_template("index5.html")
+async def index5():
+    return await render_template("index5.html")
 
+# 보유 종목/잔고/미체결은 계좌 장부(체결 이벤트로 갱신)가 채워져 있으면 Qt 스레드를 거치지 않고 바로 반환.
+# TR 이 필요하면 account_cache 로 여러 탭의 동시 조회를 TR 1회로 합치고 잠깐 재사용 (주문/체결 시 무효화)
 @app.route("/api/account")
-def get_account():
-    while not response_queue.empty():
-        response_queue.get()  # 남아있는 응답 버림
-
-    request_queue.put("get_account")  # 요청 큐에 명령 전달
-
-    timeout = 10
-    waited = 0
-    while waited < timeout:
-        if not response_queue.empty():
-            result = response_queue.get()
-            return jsonify(result)
-        time.sleep(0.1)
-        waited += 0.1
-
-    return jsonify({"error": "timeout"})
+async def get_account():
+    summary = kiwoom.trading.account_book.balance_summary()
+    if summary is not None:
+        return jsonify(summary)
+    return jsonify(await call_kiwoom_cached(kiwoom.trading.account_cache, "get_account"))
 
 @app.route("/api/available_cash")
-def get_available_cash():
-    while not response_queue.empty():
-        response_queue.get()  # 남아있는 응답 버림
-
-    request_queue.put("get_available_cash")  # 요청 큐에 명령 전달
-
-    timeout = 10
-    waited = 0
-    while waited < timeout:
-        if not response_queue.empty():
-            result = response_queue.get()
-            return jsonify(result)
-        time.sleep(0.1)
-        waited += 0.1
-
-    return jsonify({"error": "timeout"})
+async def get_available_cash():
+    return jsonify(await call_kiwoom_cached(kiwoom.trading.account_cache, "get_available_cash"))
 
 @app.route("/api/holdings")
-def get_holdings():
-    while not response_queue.empty():
-        response_queue.get()  # 남아있는 응답 버림
-
-    request_queue.put("get_holdings")  # 요청 큐에 명령 전달
-
-    timeout = 10
-    waited = 0
-    while waited < timeout:
-        if not response_queue.empty():
-            result = response_queue.get()
-            return jsonify(result)
-        time.sleep(0.1)
-        waited += 0.1
-
-    return jsonify({"error": "timeout"})
+async def get_holdings():
+    holdings = kiwoom.trading.account_book.holdings()
+    if holdings is not None:
+        return jsonify(holdings)
+    return jsonify(await call_kiwoom_cached(kiwoom.trading.account_cache, "get_holdings"))
 
 @app.route("/api/volume-leaders")
-def get_volume_leaders():
-    while not response_queue.empty():
-        response_queue.get()  # 남아있는 응답 버림
-
-    request_queue.put("volume_leaders")
-    timeout = 10
-    waited = 0
-    while waited < timeout:
-        if not response_queue.empty():
-            result = response_queue.get()
-            return jsonify(result)
-        time.sleep(0.1)
-        waited += 0.1
-    return jsonify({"error": "timeout"})
+async def get_volume_leaders():
+    return jsonify(await call_kiwoom("volume_leaders"))
 
 @app.route("/api/buy", methods=["POST"])
-def place_buy_order():
-    while not response_queue.empty():
-        response_queue.get()  # 남아있는 응답 버림
-
-    data = request.json
+async def place_buy_order():
+    data = await request.get_json()
     code = data.get("code")
     price = data.get("price")
     qty = data.get("qty")
 
-    request_queue.put({
+    return jsonify(await call_kiwoom({
         "type": "buy",
         "code": code,
         "price": price,
         "qty": qty
-    })
-
-    timeout = 10
-    waited = 0
-    while waited < timeout:
-        if not response_queue.empty():
-            result = response_queue.get()
-            return jsonify(result)
-        time.sleep(0.1)
-        waited += 0.1
-
-    return jsonify({"error": "timeout"})
+    }))
 
 @app.route("/api/sell", methods=["POST"])
-def place_sell_order():
-    while not response_queue.empty():
-        response_queue.get()  # 남아있는 응답 버림
-
-    data = request.json
+async def place_sell_order():
+    data = await request.get_json()
     code = data.get("code")
     price = data.get("price")
     qty = data.get("qty")
 
-    request_queue.put({
+    return jsonify(await call_kiwoom({
         "type": "sell",
         "code": code,
         "price": price,
         "qty": qty
-    })
-
-    timeout = 10
-    waited = 0
-    while waited < timeout:
-        if not response_queue.empty():
-            result = response_queue.get()
-            return jsonify(result)
-        time.sleep(0.1)
-        waited += 0.1
-
-    return jsonify({"error": "timeout"})
+    }))
 
 @app.route("/api/unfilled_orders")
-def get_unfilled_orders():
-    while not response_queue.empty():
-        response_queue.get()  # 남아있는 응답 버림
-
-    request_queue.put("get_unfilled_orders")
-    waited = 0
-    while waited < 10:
-        if not response_queue.empty():
-            return jsonify(response_queue.get())
-        time.sleep(0.1)
-        waited += 0.1
-    return jsonify({"error": "timeout"})
+async def get_unfilled_orders():
+    orders = kiwoom.trading.account_book.unfilled_orders()
+    if orders is not None:
+        return jsonify(orders)
+    return jsonify(await call_kiwoom_cached(kiwoom.trading.account_cache, "get_unfilled_orders"))
 
 @app.route("/api/cancel_order", methods=["POST"])
-def cancel_order():
-    while not response_queue.empty():
-        response_queue.get()  # 남아있는 응답 버림
-
-    data = request.json
+async def cancel_order():
+    data = await request.get_json()
     order_no = data.get("order_no")
     code = data.get("code")
     qty = data.get("qty")
     order_type = data.get("order_type", "")
 
-    request_queue.put({
+    return jsonify(await call_kiwoom({
         "type": "cancel_order",
         "order_no": order_no,
         "code": code,
         "qty": qty,
         "order_type": order_type
-    })
-
-    waited = 0
-    while waited < 10:
-        if not response_queue.empty():
-            return jsonify(response_queue.get())
-        time.sleep(0.1)
-        waited += 0.1
-
-    return jsonify({"error": "timeout"})
+    }))
 
 @app.route('/get-rsi-data', methods=['POST'])
-def do_something():
-    while not response_queue.empty():
-        response_queue.get()  # 남아있는 응답 버림
-
-    data = request.json
+async def do_something():
+    data = await request.get_json()
     rsiCode = data.get("rsiCode")
 
-    request_queue.put({
+    return jsonify(await call_kiwoom({
         "type": "get_rsi_data",
         "rsiCode": rsiCode
-    })
-    waited = 0
-    while waited < 30:
-        if not response_queue.empty():
-            return jsonify(response_queue.get())
-        time.sleep(0.1)
-        waited += 0.1
-    return jsonify({"error": "timeout"})
+    }, timeout=30))
 
 @app.route('/get-moving-average', methods=['POST'])
-def getMovingAverage():
-    while not response_queue.empty():
-        response_queue.get()  # 남아있는 응답 버림
-
-    data = request.json
+async def getMovingAverage():
+    data = await request.get_json()
     code = data.get("code")
     history_date = data.get("history_date")
     history_code = data.get("history_code")
@@ -228,7 +152,7 @@ def getMovingAverage():
     history_qty = data.get("history_qty")
     history_flag = data.get("history_flag")
 
-    request_queue.put({
+    return jsonify(await call_kiwoom({
         "type": "get_moving_average",
         "code": code,
         "history_date": history_date,
@@ -236,288 +160,282 @@ def getMovingAverage():
         "history_price": history_price,
         "history_qty": history_qty,
         "history_flag": history_flag
-    })
-
-    timeout = 30
-    waited = 0
-    while waited < timeout:
-        if not response_queue.empty():
-            result = response_queue.get()
-            return jsonify(result)
-        time.sleep(0.1)
-        waited += 0.1
-
-    return jsonify({"error": "timeout"})
+    }, timeout=30))
 
 @app.route('/detect-golden-cross', methods=['POST'])
-def detect_golden_cross():
-    while not response_queue.empty():
-        response_queue.get()  # 남아있는 응답 버림
-
-    data = request.json
+async def detect_golden_cross():
+    data = await request.get_json()
     code = data.get("code")
 
-    request_queue.put({
+    return jsonify(await call_kiwoom({
         "type": "detect_golden_cross",
         "code": code
-    })
-
-    timeout = 10
-    waited = 0
-    while waited < timeout:
-        if not response_queue.empty():
-            result = response_queue.get()
-            return jsonify(result)
-        time.sleep(0.1)
-        waited += 0.1
-
-    return jsonify({"error": "timeout"})
+    }))
 
 @app.route('/detect-dead-cross', methods=['POST'])
-def detect_dead_cross():
-    while not response_queue.empty():
-        response_queue.get()  # 남아있는 응답 버림
-
-    data = request.json
+async def detect_dead_cross():
+    data = await request.get_json()
     code = data.get("code")
 
-    request_queue.put({
+    return jsonify(await call_kiwoom({
         "type": "detect_dead_cross",
         "code": code
-    })
+    }))
 
-    timeout = 10
-    waited = 0
-    while waited < timeout:
-        if not response_queue.empty():
-            result = response_queue.get()
-            return jsonify(result)
-        time.sleep(0.1)
-        waited += 0.1
+@app.route('/detect-crosses', methods=['POST'])
+async def detect_crosses():
+    """골든/데드크로스(예상) 동시 판정 (일봉/현재가 조회 1회)"""
+    data = await request.get_json()
+    code = data.get("code")
 
-    return jsonify({"error": "timeout"})
+    return jsonify(await call_kiwoom({
+        "type": "detect_crosses",
+        "code": code
+    }))
 
 @app.route('/api/search-stock', methods=["POST"])
-def api_search_stock():
-    while not response_queue.empty():
-        response_queue.get()  # 남아있는 응답 버림
-
-    data = request.json
+async def api_search_stock():
+    data = await request.get_json()
     keyword = data.get("keyword", "").strip()
 
     if not keyword:
         return jsonify([])
 
-    request_queue.put({
-        "type": "search_stock_by_name",
-        "keyword": keyword
-    })
-
-    timeout = 30
-    waited = 0
-    while waited < timeout:
-        if not response_queue.empty():
-            return jsonify(response_queue.get())
-        time.sleep(0.1)
-        waited += 0.1
-
-    return jsonify({"error": "timeout"})
+    # 메모리 색인만 읽으므로 Qt 스레드(주문 처리)를 거치지 않고 바로 검색
+    return jsonify(kiwoom.trading.search_stock_by_name(keyword))
 
 @app.route('/get_invest_weather')
-def get_weather():
-    request_queue.put("get_invest_weather")
-    waited = 0
-    timeout = 60  # ✅ 최대 60초까지 기다리도록 설정
-
-    while waited < timeout:
-        if not response_queue.empty():
-            return jsonify(response_queue.get())
-        time.sleep(0.1)
-        waited += 0.1
-
-    return jsonify({"error": "timeout"})
+async def get_weather():
+    return jsonify(await call_kiwoom("get_invest_weather", timeout=60))  # ✅ 최대 60초까지 기다리도록 설정
 
 @app.route('/get_google_news_test')
-def get_google_news_test():
-    while not response_queue.empty():
-        response_queue.get()  # 남아있는 응답 버림
-
-    request_queue.put("get_google_news_test")
-    waited = 0
-    while waited < 60:
-        if not response_queue.empty():
-            return jsonify(response_queue.get())
-        time.sleep(0.1)
-        waited += 0.1
-    return jsonify({"error": "timeout"})
+async def get_google_news_test():
+    return jsonify(await call_kiwoom("get_google_news_test", timeout=60))
 
 @app.route("/api/macd", methods=["POST"])
-def get_macd():
-    while not response_queue.empty():
-        response_queue.get()
-
-    data = request.json
+async def get_macd():
+    data = await request.get_json()
     code = data.get("code")
 
-    request_queue.put({
+    return jsonify(await call_kiwoom({
         "type": "get_macd_data",
         "macdCode": code
-    })
-
-    timeout = 10
-    waited = 0
-    while waited < timeout:
-        if not response_queue.empty():
-            return jsonify(response_queue.get())
-        time.sleep(0.1)
-        waited += 0.1
-
-    return jsonify({"error": "timeout"})
+    }))
 
 @app.route("/api/stochastic", methods=["POST"])
-def get_stochastic():
-    while not response_queue.empty():
-        response_queue.get()
-
-    data = request.json
+async def get_stochastic():
+    data = await request.get_json()
     code = data.get("code")
     name = data.get("name")
 
-    request_queue.put({
+    return jsonify(await call_kiwoom({
         "type": "get_stochastic_data",
         "stochasticCode": code,
         "stochasticName": name
-    })
-
-    timeout = 10
-    waited = 0
-    while waited < timeout:
-        if not response_queue.empty():
-            return jsonify(response_queue.get())
-        time.sleep(0.1)
-        waited += 0.1
-
-    return jsonify({"error": "timeout"})
+    }))
 
 @app.route("/api/stochastic2", methods=["POST"])
-def get_stochastic2():
-    while not response_queue.empty():
-        response_queue.get()
-
-    data = request.json
+async def get_stochastic2():
+    data = await request.get_json()
     code = data.get("code")
 
-    request_queue.put({
+    return jsonify(await call_kiwoom({
         "type": "get_stochastic_data2",
         "stochasticCode": code
-    })
-
-    timeout = 10
-    waited = 0
-    while waited < timeout:
-        if not response_queue.empty():
-            return jsonify(response_queue.get())
-        time.sleep(0.1)
-        waited += 0.1
-
-    return jsonify({"error": "timeout"})
+    }))
 
 @app.route('/api/save-volume', methods=['POST'])
-def save_volume():
-    while not response_queue.empty():
-        response_queue.get()
-
-    data = request.json
+async def save_volume():
+    data = await request.get_json()
     code = data.get('code', [])
 
-    request_queue.put({
+    return jsonify(await call_kiwoom({
         'type': 'save_volume_data',
         'code': code
-    })
-
-    timeout = 30
-    waited = 0
-    while waited < timeout:
-        if not response_queue.empty():
-            result = response_queue.get()
-            return jsonify(result)
-        time.sleep(0.1)
-        waited += 0.1
-    return jsonify({'error': 'timeout'})
+    }, timeout=30))
 
 @app.route('/api/volume-search', methods=['POST'])
-def volume_search():
-    while not response_queue.empty():
-        response_queue.get()
-
-    data = request.json
+async def volume_search():
+    data = await request.get_json()
     code = data.get("code")
     name = data.get("name")
 
-    request_queue.put({
+    return jsonify(await call_kiwoom({
         "type": "volume_search",
         "code": code,
         "name": name
-    })
-
-    timeout = 30
-    waited = 0
-    while waited < timeout:
-        if not response_queue.empty():
-            result = response_queue.get()
-            return jsonify(result)
-        time.sleep(0.1)
-        waited += 0.1
-
-    return jsonify({"error": "timeout"})
+    }, timeout=30))
 
 @app.route('/api/start_loss_gain_monitor', methods=['POST'])
-def start_loss_gain_monitor():
-    while not response_queue.empty():
-        response_queue.get()
-
-    request_queue.put("start_loss_gain_monitor")
-    waited = 0
-    while waited < 10:
-        if not response_queue.empty():
-            return jsonify(response_queue.get())
-        time.sleep(0.1)
-        waited += 0.1
-    return jsonify({"error": "timeout"})
+async def start_loss_gain_monitor():
+    return jsonify(await call_kiwoom("start_loss_gain_monitor"))
+
+@app.route('/api/stop_loss_gain_monitor', methods=['POST'])
+async def stop_loss_gain_monitor():
+    return jsonify(await call_kiwoom("stop_loss_gain_monitor"))
 
 @app.route("/api/institution-trend/<code>")
-def get_institution_trend(code):
-    while not response_queue.empty():
-        response_queue.get()
-
-    request_queue.put({"type": "institution_trend", "code": code})
-    timeout = 30
-    waited = 0
-    while waited < timeout:
-        if not response_queue.empty():
-            result = response_queue.get()
-            return jsonify(result)
-        time.sleep(0.1)
-        waited += 0.1
-    return jsonify({"error": "timeout"})
+async def get_institution_trend(code):
+    return jsonify(await call_kiwoom({"type": "institution_trend", "code": code}, timeout=30))
 
 @app.route('/api/industry-volume-search', methods=['POST'])
-def industry_volume_search():
-    while not response_queue.empty():
-        response_queue.get()
-
-    request_queue.put("industry_volume_search")
-    waited = 0
-    while waited < 30:
-        if not response_queue.empty():
-            return jsonify(response_queue.get())
-        time.sleep(0.1)
-        waited += 0.1
-    return jsonify({"error": "timeout"})
-
-def run_flask():
-    app.run(debug=False, use_reloader=False)
+async def industry_volume_search():
+    return jsonify(await call_kiwoom("industry_volume_search", timeout=30))
+
+@app.route("/api/indicators/batch", methods=["POST"])
+async def indicators_batch():
+    data = await request.get_json()
+    codes = data.get("codes", [])
+    indicators = data.get("indicators", [])
+
+    if not codes or not indicators:
+        return jsonify({"results": []})
+
+    # 한 명령으로 전부 처리하면 그동안 주문/계좌(고우선) 명령이 밀리므로 INDICATORS_BATCH_STEP 종목씩 나눠
+    # 저우선 큐에 차례로 넣는다. 단위 사이에 process_requests 가 고우선 큐를 먼저 비운다.
+    # 대기 시간은 단위마다 종목당 TR 1회 기준으로 산정
+    step = Config.INDICATORS_BATCH_STEP
+    merged = {"results": []}
+    for i in range(0, len(codes), step):
+        part = codes[i:i + step]
+        result = await call_kiwoom({
+            "type": "indicators_batch",
+            "codes": part,
+            "indicators": indicators
+        }, timeout=max(30, len(part) * 2))
+        if "error" in result:
+            return jsonify(result)
+        merged["results"].extend(result["results"])
+        merged["bar_cache"] = result.get("bar_cache")
+    return jsonify(merged)
+
+@app.route("/api/bar-cache/stats")
+async def get_bar_cache_stats():
+    # 캐시 통계는 lock 으로 보호되므로 Qt 스레드를 거치지 않고 바로 조회
+    return jsonify(kiwoom.trading.bar_cache.stats())
+
+@app.route("/api/tr-scheduler/stats")
+async def get_tr_scheduler_stats():
+    stats = kiwoom.trading.tr_scheduler.stats()
+    stats["queue_depth"] = queue_depth()
+    return jsonify(stats)
+
+@app.route("/api/tr-registry/stats")
+async def get_tr_registry_stats():
+    # TR 별 요청 수 / 응답 시간 / 캐시 적중 / 파서 일괄 조회 통계
+    return jsonify({
+        "requests": kiwoom.trading.tr_registry.stats(),
+        "parser": kiwoom.trading.tr_parser.stats(),
+        "client": kiwoom.trading.tr_client.stats(),
+    })
+
+@app.route("/api/quotes")
+async def get_quotes():
+    """실시간 시세 조회 (메모리). 예: /api/quotes?codes=005930,000660"""
+    codes = [c.strip() for c in request.args.get("codes", "").split(",") if c.strip()]
+    quotes = kiwoom.trading.quote_book.get_many(codes)
+
+    # 아직 시세가 없는 종목은 실시간 등록만 요청하고 기다리지 않음 (다음 조회부터 반영)
+    missing = [code for code, quote in quotes.items() if quote is None]
+    if missing:
+        submit_request({"type": "subscribe_quotes", "codes": missing})
+    return jsonify(quotes)
+
+# 서버 스캔 작업 (진행/결과는 /api/events 의 scan_progress / scan_result 로 푸시)
+@app.route("/api/scan-jobs", methods=["POST"])
+async def submit_scan_job():
+    data = await request.get_json()
+    # 작업 상태 저장(SQLite)이 Qt 스레드의 쓰기 트랜잭션을 기다릴 수 있으므로 이벤트 루프 밖에서 실행
+    return jsonify(await asyncio.to_thread(kiwoom.scan_jobs.submit, data.get("items", []), data.get("checks", [])))
+
+@app.route("/api/scan-jobs")
+async def list_scan_jobs():
+    return jsonify(kiwoom.scan_jobs.list())
+
+@app.route("/api/scan-jobs/<job_id>")
+async def get_scan_job(job_id):
+    return jsonify(kiwoom.scan_jobs.get(job_id))
+
+@app.route("/api/scan-jobs/<job_id>/cancel", methods=["POST"])
+async def cancel_scan_job(job_id):
+    return jsonify(await asyncio.to_thread(kiwoom.scan_jobs.cancel, job_id))
+
+@app.route("/api/screener", methods=["POST"])
+async def screen_market():
+    """전 종목 스크리너 (로컬 일봉 저장소만 읽으므로 Qt 스레드를 거치지 않음)"""
+    data = await request.get_json() or {}
+    # 행렬 연산은 이벤트 루프를 막지 않도록 스레드에서 실행
+    return jsonify(await asyncio.to_thread(
+        kiwoom.trading.screener.screen, data.get("rules", []), data.get("market"), int(data.get("limit", 200))
+    ))
+
+@app.route("/api/backtest", methods=["POST"])
+async def run_backtest():
+    """저장된 일봉으로 신호 규칙 백테스트 (items 가 없으면 전 종목, 진행률은 backtest_progress 이벤트)"""
+    data = await request.get_json() or {}
+    items = data.get("items")
+    codes = [parse_basket_item(item)[0] for item in items] if items else None
+
+    def on_progress(done, total):
+        event_hub.publish("backtest_progress", {"done": done, "total": total})
+
+    return jsonify(await asyncio.to_thread(
+        kiwoom.trading.backtester.run,
+        data.get("rules", ["golden_cross"]),
+        codes=codes,
+        market=data.get("market"),
+        years=float(data.get("years", 3)),
+        stop_loss_rate=data.get("stop_loss_rate"),
+        take_profit_rate=data.get("take_profit_rate"),
+        max_hold=int(data.get("max_hold", 20)),
+        on_progress=on_progress,
+    ))
+
+@app.route("/api/scheduler")
+async def get_scheduler_status():
+    # sch_data 조회는 SQLite 를 쓰므로 이벤트 루프 밖에서 실행
+    return jsonify(await asyncio.to_thread(kiwoom.scheduler.status))
+
+@app.route("/api/scheduler/<name>", methods=["POST"])
+async def set_scheduler_job(name):
+    data = await request.get_json() or {}
+    return jsonify(await asyncio.to_thread(kiwoom.scheduler.set_enabled, name, bool(data.get("enabled", True))))
+
+@app.route("/api/events")
+async def stream_events():
+    """보유 종목/미체결/체결/자동매도/시세/스캔 결과 푸시 (Server-Sent Events)"""
+    response = Response(event_hub.stream(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+    response.timeout = None  # 연결이 유지되는 동안 응답 시간 제한 없음
+    return response
+
+@app.route("/api/events/stats")
+async def get_event_stats():
+    return jsonify(event_hub.stats())
+
+@app.route("/api/account-book/stats")
+async def get_account_book_stats():
+    return jsonify(kiwoom.trading.account_book.stats())
+
+@app.route("/api/account-cache/stats")
+async def get_account_cache_stats():
+    return jsonify(kiwoom.trading.account_cache.stats())
+
+@app.route("/api/quote-book/stats")
+async def get_quote_book_stats():
+    return jsonify(kiwoom.trading.quote_book.stats())
+
+def run_server():
+    """Hypercorn(ASGI, keep-alive) 으로 서버 실행 - Qt 가 메인 스레드를 쓰므로 별도 스레드의 이벤트 루프에서 실행"""
+    config = HypercornConfig()
+    config.bind = [f"{Config.HTTP_HOST}:{Config.HTTP_PORT}"]
+    config.keep_alive_timeout = Config.HTTP_KEEP_ALIVE_TIMEOUT
+    # 메인 스레드가 아니라 시그널 핸들러를 등록할 수 없으므로 종료 트리거는 프로세스 종료에 맡김
+    asyncio.run(serve(app, config, shutdown_trigger=asyncio.Event().wait))
 
 if __name__ == "__main__":
-    Thread(target=run_flask, daemon=True).start()
+    kiwoom = KiwoomAppWrapper()
+    Thread(target=run_server, daemon=True).start()
     kiwoom.run()
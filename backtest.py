@@ -0,0 +1,253 @@
+import os
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from config import Config
+from bar_store import BarStore
+from indicator_db import IndicatorDB, DB_PATH
+from screener import RULES, rule_masks
+
+# 신호 계산용 선행 구간 (MA120 + 5영업일). 이 구간의 신호로는 진입하지 않음
+WARMUP_DAYS = 130
+
+
+def simulate(m, entry, stop_loss_rate, take_profit_rate, max_hold, fee_rate, first_day=0):
+    """(종목 × 일자) 일봉과 진입 신호로 매매를 재현 (일자 루프, 종목 방향은 벡터 연산)
+
+    - 신호는 장 마감 후 확인되므로 다음 날 시가에 진입
+    - 보유 중에는 start_loss_gain_monitoring 과 같은 손절(-stop_loss_rate) / 익절(+take_profit_rate) 청산.
+      일봉만으로는 장중 순서를 알 수 없으므로 같은 날 둘 다 닿으면 손절로 본다 (보수적),
+      시가가 이미 기준을 넘어 시작하면 시가에 청산
+    - max_hold 영업일이 지나면 종가 청산, 종목당 동시에 한 포지션
+    반환: 거래 dict (각 값은 거래 수 길이 배열), 수익률은 fee_rate(왕복 비용) 차감 후
+    """
+    open_, high, low, close = m["open"], m["high"], m["low"], m["close"]
+    n_codes, n_days = close.shape
+    holding = np.zeros(n_codes, dtype=bool)
+    pending = np.zeros(n_codes, dtype=bool)
+    entry_price = np.zeros(n_codes)
+    entry_day = np.zeros(n_codes, dtype=np.int64)
+    trades = {"row": [], "entry_day": [], "exit_day": [], "entry_price": [], "exit_price": [], "reason": []}
+
+    def record(rows, day, price, reason):
+        trades["row"].append(rows)
+        trades["entry_day"].append(entry_day[rows])
+        trades["exit_day"].append(np.zeros(len(rows), dtype=np.int64) + day)
+        trades["entry_price"].append(entry_price[rows])
+        trades["exit_price"].append(price)
+        trades["reason"].append(np.full(len(rows), reason))
+        holding[rows] = False
+
+    for day in range(max(first_day, 1), n_days):
+        # 1. 전일 신호 → 오늘 시가 진입 (거래정지 등으로 시가가 없으면 취소)
+        enter = pending & ~np.isnan(open_[:, day]) & (open_[:, day] > 0)
+        holding |= enter
+        entry_price[enter] = open_[enter, day]
+        entry_day[enter] = day
+        pending[:] = False
+
+        # 2. 손절 / 익절 (오늘 진입분은 시가 = 진입가라 시가 갭 청산 없음)
+        active = holding & ~np.isnan(close[:, day])
+        stop = entry_price * (1 - stop_loss_rate)
+        take = entry_price * (1 + take_profit_rate)
+        hit_stop = active & (low[:, day] <= stop)
+        rows = np.nonzero(hit_stop)[0]
+        if len(rows):
+            record(rows, day, np.minimum(open_[rows, day], stop[rows]), "stop_loss")
+        hit_take = active & ~hit_stop & (high[:, day] >= take)
+        rows = np.nonzero(hit_take)[0]
+        if len(rows):
+            record(rows, day, np.maximum(open_[rows, day], take[rows]), "take_profit")
+
+        # 3. 보유 기간 만료 → 종가 청산
+        rows = np.nonzero(holding & ~np.isnan(close[:, day]) & (day - entry_day >= max_hold))[0]
+        if len(rows):
+            record(rows, day, close[rows, day], "max_hold")
+
+        # 4. 오늘 신호 → 내일 진입 예약 (보유 중이 아닌 종목만)
+        pending = entry[:, day] & ~holding
+
+    # 기간 종료 시 남은 포지션은 마지막 종가(거래정지 종목은 마지막으로 거래된 날)로 평가
+    rows = np.nonzero(holding)[0]
+    if len(rows):
+        last_day = np.array([np.nonzero(~np.isnan(close[r]))[0][-1] for r in rows])
+        record(rows, last_day, close[rows, last_day], "open")
+
+    result = {key: np.concatenate(parts) if parts else np.array([]) for key, parts in trades.items()}
+    if len(result["row"]):
+        result["return"] = result["exit_price"] / result["entry_price"] - 1 - fee_rate
+    else:
+        result["return"] = np.array([])
+    return result
+
+
+def align_by_date(m, entry):
+    """일봉 수로 오른쪽 정렬된 load_matrix 결과와 진입 신호를 공통 거래일 축으로 다시 배치
+
+    지표/신호는 종목별 일봉 순서대로 계산해야 하므로 정렬 전 행렬에서 구하고, 매매 재현만 날짜 축에서 한다.
+    같은 열은 모든 종목에서 같은 날이 되고, 거래정지 등으로 일봉이 없는 날은 NaN (신호 없음).
+    반환: ({"open", "high", "low", "close"}, 진입 신호, 열별 일자 YYYYMMDD int 배열)
+    """
+    dates = m["date"]
+    valid = ~np.isnan(dates)
+    axis = np.unique(dates[valid]).astype(np.int64)
+    rows, cols = np.nonzero(valid)
+    target = np.searchsorted(axis, dates[rows, cols].astype(np.int64))
+
+    aligned = {}
+    for key in ("open", "high", "low", "close"):
+        aligned[key] = np.full((len(dates), len(axis)), np.nan)
+        aligned[key][rows, target] = m[key][rows, cols]
+    aligned_entry = np.zeros((len(dates), len(axis)), dtype=bool)
+    aligned_entry[rows, target] = entry[rows, cols]
+    return aligned, aligned_entry, axis
+
+
+def _backtest_chunk(db_path, codes, params):
+    """프로세스 풀 작업 단위: 종목 묶음의 일봉을 읽어 신호 계산 + 매매 재현
+
+    워커 프로세스마다 자체 DB 연결을 열고, 결과는 직렬화가 가벼운 list/배열로 돌려준다.
+    """
+    started = time.perf_counter()
+    store = BarStore(IndicatorDB(db_path))
+    days = params["days"] + WARMUP_DAYS
+    m = store.load_matrix(codes, days)
+
+    masks, _ = rule_masks(m, params["rules"])
+    entry = np.logical_and.reduce([masks[rule] for rule in params["rules"]])
+
+    # 날짜 축에서 재현해 보유 기간을 거래일로 세고, 마지막 days 거래일만 진입 대상 (앞쪽은 신호 계산용)
+    aligned, entry, axis = align_by_date(m, entry)
+    trades = simulate(
+        aligned, entry, params["stop_loss_rate"], params["take_profit_rate"],
+        params["max_hold"], params["fee_rate"], first_day=max(len(axis) - params["days"], 1),
+    )
+
+    # 행 번호 → 종목코드, 열 번호 → 실제 일자 (묶음마다 날짜 축이 다를 수 있어 일자로 전달)
+    return {
+        "codes": [codes[r] for r in trades["row"].astype(np.int64)],
+        "entry_date": axis[trades["entry_day"].astype(np.int64)].tolist(),
+        "exit_date": axis[trades["exit_day"].astype(np.int64)].tolist(),
+        "entry_price": trades["entry_price"].tolist(),
+        "exit_price": trades["exit_price"].tolist(),
+        "reason": trades["reason"].tolist(),
+        "return": trades["return"].tolist(),
+        "with_bars": int(np.count_nonzero(m["count"] >= WARMUP_DAYS)),
+        "elapsed": time.perf_counter() - started,
+    }
+
+
+def summarize(trade_returns, exit_dates):
+    """거래 수익률 요약 - 수익률, 적중률, 최대 낙폭
+
+    낙폭은 거래마다 같은 금액을 넣는다고 보고 청산 일자(YYYYMMDD) 순서대로 누적한 수익률 곡선 기준.
+    """
+    returns = np.asarray(trade_returns, dtype=np.float64)
+    if len(returns) == 0:
+        return {"trades": 0}
+
+    equity = np.cumsum(returns[np.argsort(exit_dates, kind="stable")])
+    drawdown = np.maximum.accumulate(np.concatenate(([0.0], equity)))[1:] - equity
+    return {
+        "trades": int(len(returns)),
+        "hit_rate": round(float(np.mean(returns > 0)) * 100, 2),
+        "avg_return": round(float(returns.mean()) * 100, 3),
+        "median_return": round(float(np.median(returns)) * 100, 3),
+        "total_return": round(float(returns.sum()) * 100, 2),
+        "best": round(float(returns.max()) * 100, 2),
+        "worst": round(float(returns.min()) * 100, 2),
+        "max_drawdown": round(float(drawdown.max()) * 100, 2),
+    }
+
+
+class Backtester:
+    """저장된 일봉으로 기존 매매 신호를 재현하는 백테스트
+
+    - 진입: screener.rule_masks 규칙 (골든크로스, Slow STC 통합 조건 등) 을 모두 충족한 다음 날 시가
+    - 청산: 손절/익절 (기본값 Config.STOP_LOSS_RATE / TAKE_PROFIT_RATE), max_hold 영업일 경과 시 종가
+    종목을 CHUNK_SIZE 단위로 나눠 프로세스 풀에서 병렬 실행하고, 묶음 안에서는 종목 방향으로 벡터 연산한다.
+    키움/Qt 에 의존하지 않으므로 HTTP 서버가 asyncio.to_thread 작업 스레드에서 바로 실행한다 (동시에 하나만).
+    """
+
+    CHUNK_SIZE = 250
+    FEE_RATE = 0.0023  # 왕복 수수료 + 매도 세금 (대략)
+
+    def __init__(self, stock_master, db_path=DB_PATH, workers=None):
+        self.stock_master = stock_master
+        self.db_path = db_path
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self._lock = threading.Lock()
+
+    def run(self, rules, codes=None, market=None, years=3, stop_loss_rate=None, take_profit_rate=None,
+            max_hold=20, fee_rate=None, on_progress=None):
+        """codes 가 없으면 종목 마스터 전체 (market 지정 시 해당 시장)"""
+        unknown = [rule for rule in rules if rule not in RULES]
+        if unknown:
+            return {"error": f"지원하지 않는 조건: {', '.join(unknown)}"}
+        if not rules:
+            return {"error": "조건을 하나 이상 지정하세요."}
+        if not self._lock.acquire(blocking=False):
+            return {"error": "이미 백테스트가 실행 중입니다."}
+
+        try:
+            started = time.perf_counter()
+            if codes is None:
+                codes = [row[0] for row in self.stock_master.rows(market)]
+            params = {
+                "rules": list(rules),
+                "days": int(years * 250),
+                "stop_loss_rate": Config.STOP_LOSS_RATE if stop_loss_rate is None else stop_loss_rate,
+                "take_profit_rate": Config.TAKE_PROFIT_RATE if take_profit_rate is None else take_profit_rate,
+                "max_hold": max_hold,
+                "fee_rate": self.FEE_RATE if fee_rate is None else fee_rate,
+            }
+            chunks = [codes[i:i + self.CHUNK_SIZE] for i in range(0, len(codes), self.CHUNK_SIZE)]
+
+            parts = []
+            if len(chunks) <= 1:
+                parts = [_backtest_chunk(self.db_path, chunk, params) for chunk in chunks]
+            else:
+                with ProcessPoolExecutor(max_workers=min(self.workers, len(chunks))) as pool:
+                    futures = [pool.submit(_backtest_chunk, self.db_path, chunk, params) for chunk in chunks]
+                    for future in as_completed(futures):
+                        parts.append(future.result())
+                        if on_progress:
+                            on_progress(len(parts), len(chunks))
+
+            return self._report(parts, params, len(codes), time.perf_counter() - started)
+        finally:
+            self._lock.release()
+
+    def _report(self, parts, params, universe, elapsed):
+        returns = [r for part in parts for r in part["return"]]
+        exit_dates = [d for part in parts for d in part["exit_date"]]
+        reasons = [r for part in parts for r in part["reason"]]
+
+        by_reason = {}
+        for reason in sorted(set(reasons)):
+            picked = [i for i, r in enumerate(reasons) if r == reason]
+            by_reason[reason] = summarize([returns[i] for i in picked], [exit_dates[i] for i in picked])
+
+        trades = [
+            {"code": code, "return": round(ret * 100, 2), "reason": reason,
+             "entry_date": str(entry_date), "exit_date": str(exit_date),
+             "entry_price": round(entry, 2), "exit_price": round(exit_, 2)}
+            for part in parts
+            for code, ret, reason, entry_date, exit_date, entry, exit_ in zip(
+                part["codes"], part["return"], part["reason"], part["entry_date"], part["exit_date"],
+                part["entry_price"], part["exit_price"])
+        ]
+        trades.sort(key=lambda t: t["return"])
+
+        return {
+            "params": params,
+            "universe": universe,
+            "with_bars": sum(part["with_bars"] for part in parts),
+            "summary": summarize(returns, exit_dates),
+            "by_reason": by_reason,
+            "worst_trades": trades[:10],
+            "best_trades": trades[-10:][::-1],
+            "elapsed": round(elapsed, 2),
+            "worker_time": round(sum(part["elapsed"] for part in parts), 2),
+        }
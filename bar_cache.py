@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from config import Config
+
+
+class DailyBarCache:
+    """일봉(opt10081) 캐시
+
+    (종목코드, 기준일자, 수정주가구분) 단위로 파싱된 일봉을 보관한다.
+    - 기준일자가 과거인 데이터는 바뀌지 않으므로 다시 조회하지 않음
+    - 기준일자가 오늘인 데이터는 장중 계속 바뀌므로 TTL 이 지나면 재조회
+    HTTP 서버 스레드에서 통계를 읽을 수 있도록 lock 으로 보호한다.
+    """
+
+    def __init__(self, today_ttl=None, max_entries=None):
+        self.today_ttl = Config.BAR_CACHE_TTL if today_ttl is None else today_ttl
+        self.max_entries = Config.BAR_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self._entries = OrderedDict()  # key -> (저장시각, bars, complete)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    @staticmethod
+    def make_key(code, base_date, adjusted="1"):
+        return (str(code), str(base_date), str(adjusted))
+
+    def _is_fresh(self, base_date, stored_at):
+        today = datetime.today().strftime('%Y%m%d')
+        if base_date < today:
+            return True
+        return (time.monotonic() - stored_at) < self.today_ttl
+
+    def _fresh_entry(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if not self._is_fresh(key[1], entry[0]):
+            del self._entries[key]
+            self.expired += 1
+            return None
+        return entry
+
+    def get(self, code, base_date, adjusted="1", count=None, start_date=None):
+        """캐시된 일봉 반환. 없거나 만료되었거나, 요청 깊이(count/start_date)보다 얕으면 None
+
+        더 이상 과거 데이터가 없는(complete) 항목은 깊이와 관계없이 적중으로 본다.
+        """
+        key = self.make_key(code, base_date, adjusted)
+        with self._lock:
+            entry = self._fresh_entry(key)
+            if entry is None or not (entry[2] or entry[1].covers(count, start_date)):
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def partial(self, code, base_date, adjusted="1"):
+        """깊이와 관계없이 유효한 캐시 일봉 반환 (연속조회로 이어 붙이기용, 통계 미집계)"""
+        key = self.make_key(code, base_date, adjusted)
+        with self._lock:
+            entry = self._fresh_entry(key)
+            return None if entry is None else entry[1]
+
+    def put(self, code, base_date, adjusted, bars, complete=False):
+        """일봉 저장 (가장 오래 사용되지 않은 항목부터 제거)
+
+        complete: 상장일까지 모두 받아 더 이상 과거 데이터가 없는지 여부
+        """
+        key = self.make_key(code, base_date, adjusted)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), bars, complete)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, code=None):
+        """특정 종목(또는 전체) 캐시 삭제"""
+        with self._lock:
+            if code is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[0] == str(code)]:
+                del self._entries[key]
+
+    def stats(self):
+        """캐시 적중/미적중 통계 (절약한 TR 수 = hits)"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "hit_rate": round(self.hits / total * 100, 2) if total else 0.0,
+                "saved_tr": self.hits,
+            }
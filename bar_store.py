@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta
+import numpy as np
+from daily_bars import DailyBars
+from indicator_db import db as default_db
+from market_hours import is_market_open, last_market_close
+
+
+class BarStore:
+    """일봉 로컬 저장소 (stock_indicators.db 의 daily_bars 테이블)
+
+    수정주가 기준 완성된(장 마감된) 일봉만 보관한다.
+    daily_bars_sync 에 종목별 마지막 동기화 시각과 상장일까지 모두 받았는지(complete)를 기록해
+    장 마감 이후 이미 동기화한 종목은 TR 없이 바로 읽는다.
+    """
+
+    def __init__(self, database=None):
+        self.db = database or default_db
+
+    def load(self, code, start_date=None):
+        """저장된 일봉 (과거 → 최신 순, 없으면 빈 DailyBars)"""
+        rows = self.db.fetchall('''
+            SELECT CAST(date AS INTEGER), open, high, low, close, volume
+            FROM daily_bars
+            WHERE code = ? AND date >= ?
+            ORDER BY date
+        ''', (code, str(start_date or "")))
+
+        if not rows:
+            return DailyBars.empty()
+        return DailyBars(*np.array(rows, dtype=np.int64).T)
+
+    def load_matrix(self, codes, days):
+        """여러 종목의 최근 days 개 일봉을 (종목 × 일자) 2-D float 배열로 한 번에 읽음
+
+        반환: {컬럼: 배열, "count": 종목별 일봉 수}. stack_column 과 같이 종목별 마지막 일봉이
+        마지막 열에 오도록 오른쪽 정렬하고 빈 앞부분은 NaN. "date" 는 YYYYMMDD 값이므로
+        date[:, -1] 로 종목별 마지막 저장 일자를 알 수 있다 (거래정지 등으로 일봉이 끊긴 종목 확인용).
+        """
+        # 휴장일을 감안해 거래일 days 개를 넉넉히 덮는 기간만 읽음
+        since = (datetime.now() - timedelta(days=days * 7 // 5 + 30)).strftime('%Y%m%d')
+        index = {code: row for row, code in enumerate(codes)}
+        rows = []
+        # (code, date) 기본키로 종목별 범위만 읽음. SQLite 변수 개수 제한 때문에 500 종목씩 나눠 조회
+        for i in range(0, len(codes), 500):
+            part = codes[i:i + 500]
+            rows += [
+                (index[r[0]],) + r[1:]
+                for r in self.db.fetchall(f'''
+                    SELECT code, CAST(date AS INTEGER), open, high, low, close, volume
+                    FROM daily_bars
+                    WHERE code IN ({",".join("?" * len(part))}) AND date >= ?
+                    ORDER BY code, date
+                ''', (*part, since))
+            ]
+
+        columns = DailyBars.COLUMNS
+        matrix = {col: np.full((len(codes), days), np.nan) for col in columns}
+        if not rows:
+            matrix["count"] = np.zeros(len(codes), dtype=np.int64)
+            return matrix
+
+        # codes 순서로 정렬 (stable 정렬이라 종목 안에서는 일자 순 유지)
+        data = np.array(rows, dtype=np.float64)
+        data = data[np.argsort(data[:, 0], kind="stable")]
+        row_of = data[:, 0].astype(np.int64)
+
+        # 종목별 행 수와 종목 내 순번으로 오른쪽 정렬 열 위치 계산 (종목 루프 없음)
+        total = np.bincount(row_of, minlength=len(codes))
+        starts = np.concatenate(([0], np.cumsum(total)[:-1]))
+        col_of = days - total[row_of] + (np.arange(len(row_of)) - starts[row_of])
+        keep = col_of >= 0  # days 개보다 오래된 일봉 제외
+
+        for i, col in enumerate(columns, start=1):
+            matrix[col][row_of[keep], col_of[keep]] = data[keep, i]
+        matrix["count"] = np.minimum(total, days)
+        return matrix
+
+    def save(self, code, bars):
+        """일봉 upsert (한 트랜잭션으로 일괄 저장)"""
+        if len(bars) == 0:
+            return
+        rows = [
+            (code, str(d), o, h, l, c, v)
+            for d, o, h, l, c, v in zip(*(getattr(bars, col).tolist() for col in DailyBars.COLUMNS))
+        ]
+        self.db.executemany('''
+            INSERT INTO daily_bars (code, date, open, high, low, close, volume)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(code, date) DO UPDATE SET
+                open = excluded.open,
+                high = excluded.high,
+                low = excluded.low,
+                close = excluded.close,
+                volume = excluded.volume
+        ''', rows)
+
+    def delete(self, code):
+        """종목의 저장 일봉과 동기화 기록 삭제 (수정주가 변경 시 전체 재수신용)"""
+        with self.db.batch():
+            self.db.execute("DELETE FROM daily_bars WHERE code = ?", (code,))
+            self.db.execute("DELETE FROM daily_bars_sync WHERE code = ?", (code,))
+
+    def sync_state(self, code):
+        """(마지막 동기화 시각 datetime, complete) - 기록이 없으면 (None, False)"""
+        row = self.db.fetchone("SELECT synced_at, complete FROM daily_bars_sync WHERE code = ?", (code,))
+
+        if row is None:
+            return None, False
+        return datetime.strptime(row[0], '%Y-%m-%d %H:%M:%S'), bool(row[1])
+
+    def mark_synced(self, code, complete):
+        self.db.execute('''
+            INSERT INTO daily_bars_sync (code, synced_at, complete)
+            VALUES (?, ?, ?)
+            ON CONFLICT(code) DO UPDATE SET
+                synced_at = excluded.synced_at,
+                complete = excluded.complete
+        ''', (code, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), int(complete)))
+
+    def is_fresh(self, code):
+        """장 마감 이후 이미 동기화했고 지금 장중이 아니면 새로 받을 일봉이 없음"""
+        synced_at, _ = self.sync_state(code)
+        if synced_at is None or is_market_open():
+            return False
+        return synced_at >= last_market_close()
+
+    @staticmethod
+    def closed_bars(bars):
+        """장 마감이 끝난 일봉만 (장중 오늘 일봉은 저장하지 않음)"""
+        closed_through = int(last_market_close().strftime('%Y%m%d'))
+        return bars[:int(np.searchsorted(bars.date, closed_through, side="right"))]
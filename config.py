@@ -33,10 +33,41 @@ class Config:
     # API 설정
     API_VERSION = "0.1"
     CONNECT_TIMEOUT = 60  # 연결 타임아웃 (초)
+
+    # 일봉(opt10081) 캐시 설정
+    BAR_CACHE_TTL = int(os.getenv('BAR_CACHE_TTL', 60))  # 오늘 일봉 재조회 주기 (초)
+    BAR_CACHE_MAX_ENTRIES = int(os.getenv('BAR_CACHE_MAX_ENTRIES', 3000))
+
+    # TR 요청 제한 (키움: 초당 5회, 시간당 1,000회)
+    TR_PER_SECOND = int(os.getenv('TR_PER_SECOND', 5))
+    TR_PER_HOUR = int(os.getenv('TR_PER_HOUR', 1000))
+    TR_MAX_IN_FLIGHT = int(os.getenv('TR_MAX_IN_FLIGHT', 4))  # 동시에 응답을 기다리는 TR 수
+    TR_TIMEOUT = int(os.getenv('TR_TIMEOUT', 10))  # TR 1건 응답 대기 한도 (초)
+    # /api/indicators/batch 를 나눠 실행할 종목 수 (단위 사이에 주문/계좌 명령이 먼저 처리됨)
+    INDICATORS_BATCH_STEP = int(os.getenv('INDICATORS_BATCH_STEP', 5))
+
+    # HTTP 서버 (Hypercorn)
+    HTTP_HOST = os.getenv('HTTP_HOST', '127.0.0.1')
+    HTTP_PORT = int(os.getenv('HTTP_PORT', 5000))
+    HTTP_KEEP_ALIVE_TIMEOUT = int(os.getenv('HTTP_KEEP_ALIVE_TIMEOUT', 30))  # 유휴 keep-alive 연결 유지 시간 (초)
+
+    # 체결 이벤트 기반 계좌 장부를 TR 로 재확인하는 주기 (초)
+    ACCOUNT_RECONCILE_INTERVAL = int(os.getenv('ACCOUNT_RECONCILE_INTERVAL', 300))
+    # 계좌 조회 API(잔고/주문가능금액/보유/미체결) 응답 캐시 유지 시간 (초)
+    ACCOUNT_CACHE_TTL = float(os.getenv('ACCOUNT_CACHE_TTL', 3))
     
     # 거래 시간 설정
     MARKET_OPEN_TIME = "09:00"
     MARKET_CLOSE_TIME = "15:30"
+    # KRX 기본 휴장일 외 추가 휴장일 (YYYY-MM-DD, 쉼표 구분)
+    MARKET_HOLIDAYS = [d.strip() for d in os.getenv('MARKET_HOLIDAYS', '').split(',') if d.strip()]
+
+    # 장 시간 스케줄러
+    SCHEDULER_TICK_INTERVAL = int(os.getenv('SCHEDULER_TICK_INTERVAL', 30))  # 스케줄 확인 주기 (초)
+    INVEST_WEATHER_TIME = os.getenv('INVEST_WEATHER_TIME', '08:30')  # 장 시작 전 투자 날씨 리포트
+    VOLUME_CHECK_INTERVAL = int(os.getenv('VOLUME_CHECK_INTERVAL', 600))  # 장중 거래량 급증 검사 주기 (초)
+    EOD_BATCH_TIME = os.getenv('EOD_BATCH_TIME', '15:40')  # 장 마감 후 일봉/지표 저장
+    SCHEDULER_TR_RESERVE = int(os.getenv('SCHEDULER_TR_RESERVE', 200))  # 스케줄 작업이 남겨 둘 시간당 TR 여유분
     
     @classmethod
     def is_simulation_mode(cls):
@@ -0,0 +1,93 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+MA_WINDOWS = (5, 20, 60, 120)
+LONG_MA_NAMES = ("MA20", "MA60", "MA120")  # cross_signals 의 closest 값 순서
+
+
+def running_means(closes, windows=MA_WINDOWS):
+    """누적합으로 구한 단순 이동평균 {기간: 배열} (1-D 또는 2-D, 마지막 축이 일자)
+
+    NaN(2-D 행렬의 빈 앞부분)은 0 으로 더하고 기간 안의 유효 개수를 함께 세어
+    기간이 모두 채워진 위치만 값을 두고 나머지는 NaN. 정수 종가의 합은 float64 에서 정확하므로
+    pandas rolling 과 같은 값이 나온다.
+    """
+    x = np.asarray(closes, dtype=np.float64)
+    valid = ~np.isnan(x)
+    pad = [(0, 0)] * (x.ndim - 1) + [(1, 0)]
+    csum = np.pad(np.cumsum(np.where(valid, x, 0.0), axis=-1), pad)
+    ccount = np.pad(np.cumsum(valid, axis=-1), pad)
+
+    means = {}
+    for w in windows:
+        ma = np.full(x.shape, np.nan)
+        if x.shape[-1] >= w:
+            full = (ccount[..., w:] - ccount[..., :-w]) == w
+            ma[..., w - 1:] = np.where(full, (csum[..., w:] - csum[..., :-w]) / w, np.nan)
+        means[w] = ma
+    return means
+
+
+def _pad_front(values, count):
+    """최근 5일 창 기준 배열(T-4)을 일자 축 길이(T)로 맞춤 (앞부분 False)"""
+    pad = [(0, 0)] * (values.ndim - 1) + [(count, 0)]
+    return np.pad(values, pad, constant_values=False)
+
+
+def cross_signals(closes, near=0.03):
+    """5일선과 가장 가까운 장기이평선(20/60/120일) 기준 골든/데드크로스(예상) 신호를 전 구간에 대해 계산
+
+    detect_golden_cross / detect_dead_cross 의 cond1~cond5 를 일자마다 "그날까지 최근 5영업일" 창으로
+    평가한 마스크를 반환한다 (1-D 또는 2-D, 모든 배열은 closes 와 같은 모양).
+    - golden / dead            : cond1~cond5 모두 충족 (상태 1)
+    - golden_near / dead_near  : cond2 를 제외한 조건 충족 (상태 2, 코멘트용)
+    - ma5, closest_ma          : 5일선, 가장 가까운 장기이평선 값
+    - closest                  : 가장 가까운 장기이평선 (LONG_MA_NAMES 의 인덱스)
+    MA120 이 5일 창 전체에 대해 계산되지 않는 구간은 모두 False.
+    """
+    means = running_means(closes)
+    ma5 = means[5]
+    longs = np.stack([means[20], means[60], means[120]])  # (3, ..., T)
+    length = ma5.shape[-1]
+
+    distance = np.abs(longs - ma5)
+    closest = np.argmin(np.where(np.isnan(distance), np.inf, distance), axis=0)
+    closest_ma = np.take_along_axis(longs, closest[None], axis=0)[0]
+
+    result = {"ma5": ma5, "closest_ma": closest_ma, "closest": closest}
+    if length < 5:
+        empty = np.zeros(ma5.shape, dtype=bool)
+        result.update(golden=empty, golden_near=empty, dead=empty, dead_near=empty)
+        return result
+
+    # 일자 t 의 창 = t-4 ~ t 의 5일선 (..., T-4, 5)
+    window = sliding_window_view(ma5, 5, axis=-1)
+    first, second, prev, last = window[..., 0], window[..., 1], window[..., 3], window[..., 4]
+    low, high = window.min(axis=-1), window.max(axis=-1)
+
+    # 가장 가까운 이평선은 t 기준으로 고르고, 5영업일 전 값은 같은 이평선의 t-4 값
+    closest_t = closest[..., 4:]
+    closest_ma_t = closest_ma[..., 4:]
+    closest_first = np.take_along_axis(longs[..., :length - 4], closest_t[None], axis=0)[0]
+    valid = ~np.isnan(means[120][..., :length - 4])
+
+    gap = last - closest_ma_t
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cond1 = valid & (np.abs(gap) / closest_ma_t <= near)
+
+    golden_cond2 = (first == low) | (second == low)
+    golden_rest = cond1 & (prev < last) & (last == high) & (
+        ((gap <= 0) & (first < closest_first)) | ((gap > 0) & (first <= closest_first))
+    )
+    dead_cond2 = (first == high) | (second == high)
+    dead_rest = cond1 & (prev > last) & (last == low) & (
+        ((gap >= 0) & (first > closest_first)) | ((gap < 0) & (first >= closest_first))
+    )
+
+    result.update(
+        golden=_pad_front(golden_rest & golden_cond2, 4),
+        golden_near=_pad_front(golden_rest, 4),
+        dead=_pad_front(dead_rest & dead_cond2, 4),
+        dead_near=_pad_front(dead_rest, 4),
+    )
+    return result
@@ -0,0 +1,95 @@
+import numpy as np
+
+
+class DailyBars:
+    """일봉 컬럼 배열 컨테이너
+
+    opt10081 응답을 파싱 시점에 한 번만 변환해 둔다.
+    - 모든 컬럼은 과거 → 최신 순 (지표 계산 시 뒤집을 필요 없음)
+    - date: int32 (YYYYMMDD), 가격/거래량: int64
+    - 슬라이싱은 numpy view 를 반환하므로 복사가 일어나지 않음
+    """
+
+    __slots__ = ("date", "open", "high", "low", "close", "volume")
+
+    COLUMNS = ("date", "open", "high", "low", "close", "volume")
+
+    def __init__(self, date, open, high, low, close, volume):
+        self.date = np.asarray(date, dtype=np.int32)
+        self.open = np.asarray(open, dtype=np.int64)
+        self.high = np.asarray(high, dtype=np.int64)
+        self.low = np.asarray(low, dtype=np.int64)
+        self.close = np.asarray(close, dtype=np.int64)
+        self.volume = np.asarray(volume, dtype=np.int64)
+
+    @classmethod
+    def empty(cls):
+        return cls([], [], [], [], [], [])
+
+    @classmethod
+    def from_latest_first(cls, date, open, high, low, close, volume):
+        """키움 응답 순서(최신 → 과거) 배열을 과거 → 최신 순으로 한 번만 뒤집어 생성"""
+        columns = [np.ascontiguousarray(np.asarray(c)[::-1]) for c in (date, open, high, low, close, volume)]
+        return cls(*columns)
+
+    @classmethod
+    def concat(cls, bars_list):
+        """과거 → 최신 순으로 나열된 DailyBars 들을 이어 붙임 (겹치는 일자는 뒤쪽 데이터 우선)"""
+        parts = []
+        for bars in reversed(bars_list):
+            if len(bars) == 0:
+                continue
+            if parts:
+                bars = bars[:int(np.searchsorted(bars.date, parts[0].date[0]))]
+            parts.insert(0, bars)
+        if not parts:
+            return cls.empty()
+        if len(parts) == 1:
+            return parts[0]
+        return cls(*(np.concatenate([getattr(p, c) for p in parts]) for c in cls.COLUMNS))
+
+    def __len__(self):
+        return len(self.close)
+
+    def __getitem__(self, index):
+        """슬라이스 시 같은 버퍼를 공유하는 DailyBars 반환"""
+        if not isinstance(index, slice):
+            raise TypeError("DailyBars 는 슬라이스만 지원합니다.")
+        return DailyBars(*(getattr(self, c)[index] for c in self.COLUMNS))
+
+    def tail(self, count):
+        """최근 count 개 (0 이면 전체)"""
+        if count <= 0:
+            return self
+        return self[-count:]
+
+    def since(self, start_date):
+        """start_date(YYYYMMDD) 이후 일봉 view"""
+        return self[int(np.searchsorted(self.date, int(start_date))):]
+
+    def covers(self, count=None, start_date=None):
+        """요청한 개수 / 시작일자까지의 데이터를 모두 포함하는지"""
+        if count and len(self) < count:
+            return False
+        if start_date and (len(self) == 0 or int(self.date[0]) > int(start_date)):
+            return False
+        return True
+
+    @property
+    def first_date(self):
+        """가장 오래된 일자 (YYYYMMDD 문자열, 없으면 None)"""
+        if len(self) == 0:
+            return None
+        return str(int(self.date[0]))
+
+    @property
+    def last_date(self):
+        """가장 최근 일자 (YYYYMMDD 문자열, 없으면 None)"""
+        if len(self) == 0:
+            return None
+        return str(int(self.date[-1]))
+
+    def __repr__(self):
+        if len(self) == 0:
+            return "DailyBars(0)"
+        return f"DailyBars({len(self)}, {int(self.date[0])}~{int(self.date[-1])})"
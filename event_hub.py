@@ -0,0 +1,93 @@
+import asyncio
+import json
+import threading
+import time
+
+
+class EventHub:
+    """서버 → 브라우저 푸시 이벤트 (Server-Sent Events)
+
+    Qt 스레드(체결/시세/스캔)가 publish 하고, /api/events 연결마다 subscribe 한 asyncio 큐에서 꺼내 보낸다.
+    publish 는 어느 스레드에서든 호출할 수 있고, 큐에는 구독자 이벤트 루프의 call_soon_threadsafe 로 넣는다.
+    느린 구독자는 큐가 가득 차면 가장 오래된 이벤트부터 버려 publish 쪽이 막히지 않게 한다.
+    """
+
+    HEARTBEAT = 15  # 연결 유지용 주석 전송 주기 (초)
+
+    def __init__(self, max_pending=500):
+        self.max_pending = max_pending
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def subscribe(self):
+        """현재 이벤트 루프에서 읽을 구독 큐 (이벤트 루프 안에서 호출)"""
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(maxsize=self.max_pending))
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    @staticmethod
+    def _offer(queue, message):
+        # 이벤트 루프 스레드에서 실행되므로 가득 찼는지 확인 후 넣기까지 다른 소비가 끼어들지 않음
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(message)
+
+    def publish(self, event, data):
+        message = (event, data)
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self.published += 1
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, message)
+            except RuntimeError:
+                # 서버 종료로 이벤트 루프가 닫힘
+                self.unsubscribe((loop, queue))
+
+    async def stream(self):
+        """SSE 응답 본문 async generator (연결이 끊기면 구독 해제)"""
+        subscriber = self.subscribe()
+        queue = subscriber[1]
+        try:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), self.HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self.published,
+            }
+
+
+class Throttle:
+    """키별 최소 간격 제한 (실시간 시세처럼 잦은 이벤트를 초당 n 회로 줄일 때 사용)"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._last = {}
+
+    def allow(self, key):
+        now = time.monotonic()
+        if now - self._last.get(key, 0) < self.interval:
+            return False
+        self._last[key] = now
+        return True
+
+
+# 앱 전역에서 공유하는 인스턴스
+event_hub = EventHub()
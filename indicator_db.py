@@ -0,0 +1,79 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+DB_PATH = "stock_indicators.db"
+
+
+class IndicatorDB:
+    """stock_indicators.db 접근 계층
+
+    - 스레드별로 오래 유지되는 연결을 하나씩 둔다 (Qt 스레드 쓰기 / HTTP 서버·작업 스레드 읽기)
+    - WAL 저널 + synchronous=NORMAL: 쓰는 동안에도 다른 스레드가 읽을 수 있고 커밋마다 fsync 하지 않음
+    - SQL 문은 연결별 statement cache 에 남아 재사용됨 (prepared statement)
+    - batch() 안의 쓰기는 한 트랜잭션으로 묶어 마지막에 한 번만 커밋
+    """
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=10000")
+            self._local.conn = conn
+            self._local.depth = 0
+        return conn
+
+    @contextmanager
+    def batch(self):
+        """블록 안의 쓰기를 하나의 트랜잭션으로 커밋 (중첩 가능, 예외 시 롤백)"""
+        conn = self._connection()
+        self._local.depth += 1
+        try:
+            yield self
+        except Exception:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                conn.rollback()
+            raise
+        self._local.depth -= 1
+        if self._local.depth == 0:
+            conn.commit()
+
+    def _commit(self, conn):
+        if self._local.depth == 0:
+            conn.commit()
+
+    def execute(self, sql, params=()):
+        """쓰기 1건 (batch 밖이면 즉시 커밋)"""
+        conn = self._connection()
+        conn.execute(sql, params)
+        self._commit(conn)
+
+    def executemany(self, sql, rows):
+        """쓰기 여러 건 (batch 밖이면 한 번만 커밋)"""
+        conn = self._connection()
+        conn.executemany(sql, rows)
+        self._commit(conn)
+
+    def fetchone(self, sql, params=()):
+        return self._connection().execute(sql, params).fetchone()
+
+    def fetchall(self, sql, params=()):
+        return self._connection().execute(sql, params).fetchall()
+
+    def close(self):
+        """현재 스레드의 연결 종료"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+# 앱 전역에서 공유하는 인스턴스
+db = IndicatorDB()
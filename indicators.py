@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+
+
+def _wilder_smooth(values, first, seed_idx, ok, period):
+    """Wilder 이동평균 (alpha = 1/period)
+
+    각 행마다 seed_idx 위치에 첫 period 개 평균(SMA)을 두고,
+    이후는 (avg * (period - 1) + value) / period 로 갱신한다.
+    행(종목) 방향 반복문 없이 pandas ewm(adjust=False) 로 한 번에 계산.
+    """
+    n_rows, n_cols = values.shape
+    x = np.full((n_rows, n_cols), np.nan)
+    rows = np.nonzero(ok)[0]
+    if len(rows) == 0:
+        return x
+
+    csum = np.concatenate([np.zeros((n_rows, 1)), np.nancumsum(values, axis=1)], axis=1)
+    seeds = (csum[rows, seed_idx[rows] + 1] - csum[rows, first[rows]]) / period
+
+    cols = np.arange(n_cols)
+    after_seed = cols[None, :] > seed_idx[:, None]
+    after_seed[~ok] = False
+    x[after_seed] = values[after_seed]
+    x[rows, seed_idx[rows]] = seeds
+
+    return pd.DataFrame(x.T).ewm(alpha=1.0 / period, adjust=False).mean().to_numpy().T
+
+
+def wilder_rsi(closes, period=14):
+    """RSI 전체 시계열 (벡터화)
+
+    closes: 1-D (일자) 또는 2-D (종목 × 일자) 종가 배열, 과거 → 최신 순.
+            2-D 는 최근 일자 기준으로 오른쪽 정렬하고 앞쪽은 NaN 으로 채운다.
+    반환: (rsi, avg_gain, avg_loss) - closes 와 같은 모양, 계산 불가 구간은 NaN
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    one_d = closes.ndim == 1
+    c = np.atleast_2d(closes)
+    n_rows, n_days = c.shape
+
+    if n_days < 2:
+        empty = np.full(c.shape, np.nan)
+        return (empty[0], empty[0], empty[0]) if one_d else (empty, empty.copy(), empty.copy())
+
+    delta = np.diff(c, axis=1)
+    invalid = np.isnan(delta)
+    gains = np.where(delta > 0, delta, 0.0)
+    losses = np.where(delta < 0, -delta, 0.0)
+    gains[invalid] = np.nan
+    losses[invalid] = np.nan
+
+    first = np.argmax(~invalid, axis=1)
+    seed_idx = first + period - 1
+    ok = (~invalid).any(axis=1) & (seed_idx < delta.shape[1])
+
+    avg_gain = _wilder_smooth(gains, first, seed_idx, ok, period)
+    avg_loss = _wilder_smooth(losses, first, seed_idx, ok, period)
+    rsi = rsi_from_averages(avg_gain, avg_loss)
+
+    # 변화량은 일자보다 1개 적으므로 맨 앞에 NaN 을 붙여 closes 와 위치를 맞춤
+    pad = np.full((n_rows, 1), np.nan)
+    rsi, avg_gain, avg_loss = (np.concatenate([pad, a], axis=1) for a in (rsi, avg_gain, avg_loss))
+
+    if one_d:
+        return rsi[0], avg_gain[0], avg_loss[0]
+    return rsi, avg_gain, avg_loss
+
+
+def rsi_from_averages(avg_gain, avg_loss):
+    """평균 상승폭/하락폭으로 RSI 계산 (하락폭 0 이면 100)"""
+    avg_gain = np.asarray(avg_gain, dtype=np.float64)
+    avg_loss = np.asarray(avg_loss, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return np.where(avg_loss == 0, np.where(np.isnan(avg_gain), np.nan, 100.0), rsi)
+
+
+def rsi_step(avg_gain, avg_loss, prev_close, close, period=14):
+    """전일 avg_gain/avg_loss 에서 오늘 RSI 를 O(1) 로 계산 (스칼라/배열 모두 가능)
+
+    반환: (rsi, avg_gain, avg_loss)
+    """
+    delta = np.asarray(close, dtype=np.float64) - np.asarray(prev_close, dtype=np.float64)
+    gain = np.maximum(delta, 0.0)
+    loss = np.maximum(-delta, 0.0)
+    avg_gain = (np.asarray(avg_gain, dtype=np.float64) * (period - 1) + gain) / period
+    avg_loss = (np.asarray(avg_loss, dtype=np.float64) * (period - 1) + loss) / period
+    return rsi_from_averages(avg_gain, avg_loss), avg_gain, avg_loss
+
+
+def _frame(values):
+    """1-D 는 Series, 2-D (종목 × 일자) 는 일자를 행으로 하는 DataFrame"""
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        return pd.Series(values, copy=False)
+    return pd.DataFrame(values.T, copy=False)
+
+
+def _unframe(frame):
+    values = frame.to_numpy()
+    return values if values.ndim == 1 else values.T
+
+
+def stack_column(bars_list, column):
+    """DailyBars 목록의 한 컬럼을 2-D (종목 × 일자) float 배열로 변환
+
+    종목별 마지막 일봉이 마지막 열에 오도록 오른쪽 정렬하고, 빈 앞부분은 NaN.
+    지표는 행마다 독립적으로 계산되므로 종목별 단건 계산과 결과가 같다.
+    """
+    length = max((len(bars) for bars in bars_list), default=0)
+    matrix = np.full((len(bars_list), length), np.nan)
+    for row, bars in enumerate(bars_list):
+        if len(bars):
+            matrix[row, length - len(bars):] = getattr(bars, column)
+    return matrix
+
+
+def macd(closes, short_period=12, long_period=26, signal_period=9):
+    """MACD (1-D 또는 2-D). 반환: (macd, signal, histogram)"""
+    close = _frame(closes)
+    short_ema = close.ewm(span=short_period, adjust=False).mean()
+    long_ema = close.ewm(span=long_period, adjust=False).mean()
+    macd_line = short_ema - long_ema
+    signal_line = macd_line.ewm(span=signal_period, adjust=False).mean()
+    return _unframe(macd_line), _unframe(signal_line), _unframe(macd_line - signal_line)
+
+
+def slow_stochastic(highs, lows, closes, n=12, m=5, t=3):
+    """Slow Stochastic (1-D 또는 2-D). 반환: (%K, %D)"""
+    high = _frame(highs)
+    low = _frame(lows)
+    close = _frame(closes)
+
+    # Raw %K
+    lowest_low = low.rolling(window=n).min()
+    highest_high = high.rolling(window=n).max()
+    k_raw = (close - lowest_low) / (highest_high - lowest_low) * 100
+
+    # Slow %K (SMA of %K), Slow %D (SMA of Slow %K)
+    k = k_raw.rolling(window=m).mean()
+    d = k.rolling(window=t).mean()
+    return _unframe(k), _unframe(d)
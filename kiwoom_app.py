@@ -1,82 +1,200 @@
 from PyQt5.QtWidgets import QApplication
-from PyQt5.QtCore import QTimer
+from PyQt5.QtCore import QObject, Qt, pyqtSignal, QTimer
 from kiwoom_api import KiwoomAPI
 from trading import Trading
+from scan_jobs import ScanJobManager
+from market_scheduler import MarketScheduler
+import asyncio
 from queue import Queue
+from concurrent.futures import Future
 from logger import logger
+from config import Config
 
-request_queue = Queue()
-response_queue = Queue()
+# (명령, Future) 쌍을 Qt 스레드로 전달하는 큐 - 주문/계좌(고우선)와 분석(저우선) 레인
+high_queue = Queue()
+low_queue = Queue()
+
+# 고우선 레인으로 보낼 명령 (손절 등 주문 경로가 대량 스캔에 밀리지 않도록)
+HIGH_PRIORITY_COMMANDS = {
+    "get_account", "get_available_cash", "get_holdings", "get_unfilled_orders",
+    "buy", "sell", "cancel_order", "start_loss_gain_monitor", "stop_loss_gain_monitor",
+    "refresh_positions", "reconcile_account",
+}
+
+class RequestNotifier(QObject):
+    """요청이 들어오면 Qt 스레드를 깨우는 시그널 (다른 스레드에서 emit 해도 안전)"""
+    wakeup = pyqtSignal()
+
+_notifier = None
+
+def command_type(cmd):
+    """문자열 명령은 그대로, dict 명령은 "type" 값을 명령 종류로 사용"""
+    if isinstance(cmd, dict):
+        return cmd.get("type")
+    return cmd
+
+def submit_request(cmd):
+    """명령을 Qt 스레드로 전달하고, 해당 요청의 결과를 받을 Future 반환"""
+    future = Future()
+    queue = high_queue if command_type(cmd) in HIGH_PRIORITY_COMMANDS else low_queue
+    queue.put((cmd, future))
+    if _notifier is not None:
+        _notifier.wakeup.emit()
+    return future
+
+def queue_depth():
+    """레인별 대기 중인 명령 수"""
+    return {"high": high_queue.qsize(), "low": low_queue.qsize()}
+
+async def call_kiwoom(cmd, timeout=10):
+    """명령을 전달한 뒤 그 요청의 결과를 await (HTTP 이벤트 루프에서 호출, 대기 중 스레드를 점유하지 않음)"""
+    future = submit_request(cmd)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+    except asyncio.TimeoutError:
+        # 아직 처리 전이면 취소되어 Qt 스레드에서 실행되지 않음 (wrap_future 가 취소를 원본 Future 로 전달)
+        return {"error": "timeout"}
+
+async def call_kiwoom_cached(cache, cmd, timeout=10):
+    """call_kiwoom + 응답 캐시. 같은 명령이 처리 중이면 그 결과를 함께 기다림 (TR 1회)"""
+    key = command_type(cmd)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    future = cache.flight(key, lambda: submit_request(cmd))
+    try:
+        # 여러 요청이 공유하는 Future 이므로 한 요청의 timeout 이 다른 요청 대기를 취소하지 않게 shield
+        return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+    except asyncio.TimeoutError:
+        return {"error": "timeout"}
 
 class KiwoomAppWrapper:
 
     def __init__(self):
+        global _notifier
+
         self.app = QApplication([])
         self.app.setQuitOnLastWindowClosed(False)
         self.api = KiwoomAPI()
         self.trading = Trading(self.api)
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.process_requests)
-        self.timer.start(500)
+        self.scan_jobs = ScanJobManager(self.trading, submit_request)
+        self.scheduler = MarketScheduler(self.trading, submit_request)
+        self.handlers = {}
+        self._register_handlers()
+        self._processing = False
+
+        # 요청이 들어오는 즉시 Qt 스레드에서 process_requests 실행
+        self.notifier = RequestNotifier()
+        self.notifier.wakeup.connect(self.process_requests, Qt.QueuedConnection)
+        _notifier = self.notifier
+
+        # 보유 종목/미체결은 체결 이벤트로 갱신하고, 누락 확인용 재조회만 주기적으로 수행
+        self.reconcile_timer = QTimer()
+        self.reconcile_timer.timeout.connect(self._request_reconcile)
+        self.reconcile_timer.start(Config.ACCOUNT_RECONCILE_INTERVAL * 1000)
+
+        # 장 시간 기준 반복 작업 (투자 날씨, 장중 거래량 검사, 장 마감 후 지표 저장)
+        self.scheduler_timer = QTimer()
+        self.scheduler_timer.timeout.connect(self._scheduler_tick)
+        self.scheduler_timer.start(Config.SCHEDULER_TICK_INTERVAL * 1000)
 
     def run(self):
-        self.api.login()
+        if self.api.login():
+            self.trading.refresh_stock_master()
+            self.trading.reconcile_account()  # 계좌 장부 seed
+            self.scan_jobs.resume()  # 재시작 전 실행 중이던 스캔 작업 재개
+            self.scheduler.resume()
+            self.trading.subscribe_real_quotes()
+        self.process_requests()  # 로그인 중 쌓인 요청 처리
         self.app.exec_()
 
+    def _request_reconcile(self):
+        if self.api.connected:
+            submit_request("reconcile_account")
+
+    def _scheduler_tick(self):
+        if self.api.connected:
+            self.scheduler.tick()
+
+    def register_handler(self, name, handler):
+        """명령 종류별 처리 함수 등록 (handler(cmd) -> result)"""
+        self.handlers[name] = handler
+
+    def _register_handlers(self):
+        t = self.trading
+        self.register_handler("get_account", lambda cmd: t.get_balance_summary())
+        self.register_handler("get_available_cash", lambda cmd: t.get_available_cash())
+        self.register_handler("get_holdings", lambda cmd: t.get_holdings())
+        self.register_handler("volume_leaders", lambda cmd: t.get_volume_leaders())
+        self.register_handler("buy", lambda cmd: t.place_order(cmd["code"], cmd["price"], cmd["qty"]))
+        self.register_handler("sell", lambda cmd: t.place_sell_order(cmd["code"], cmd["price"], cmd["qty"]))
+        self.register_handler("get_unfilled_orders", lambda cmd: t.get_unfilled_orders())
+        self.register_handler("cancel_order", lambda cmd: t.cancel_order(
+            cmd.get("code"),
+            cmd.get("order_no"),
+            cmd.get("qty", 0),
+            cmd.get("order_type", ""),
+        ))
+        self.register_handler("get_rsi_data", lambda cmd: t.analyze_rsi(cmd["rsiCode"]))
+        self.register_handler("get_moving_average", lambda cmd: t.get_moving_average(cmd["code"], cmd["history_date"], cmd["history_code"], cmd["history_price"], cmd["history_qty"], cmd["history_flag"]))
+        self.register_handler("detect_golden_cross", lambda cmd: t.detect_golden_cross(cmd["code"]))
+        self.register_handler("detect_dead_cross", lambda cmd: t.detect_dead_cross(cmd["code"]))
+        self.register_handler("detect_crosses", lambda cmd: t.detect_crosses(cmd["code"]))
+        self.register_handler("search_stock_by_name", lambda cmd: t.search_stock_by_name(cmd["keyword"]))
+        self.register_handler("get_invest_weather", lambda cmd: t.ask_gpt_for_invest_weather())
+        self.register_handler("get_google_news_test", lambda cmd: t.get_google_news_test())
+        self.register_handler("get_macd_data", lambda cmd: t.analyze_macd(cmd["macdCode"]))
+        self.register_handler("get_stochastic_data", lambda cmd: t.analyze_stochastic(cmd["stochasticCode"], cmd["stochasticName"]))
+        self.register_handler("get_stochastic_data2", lambda cmd: t.analyze_stochastic2(cmd["stochasticCode"]))
+        self.register_handler("save_volume_data", lambda cmd: t.insert_get_today_volume(cmd["code"]))
+        self.register_handler("volume_search", lambda cmd: t.volume_search(cmd["code"], cmd["name"]))
+        self.register_handler("start_loss_gain_monitor", lambda cmd: t.start_loss_gain_monitoring())
+        self.register_handler("stop_loss_gain_monitor", lambda cmd: t.stop_loss_gain_monitoring())
+        self.register_handler("refresh_positions", lambda cmd: t.refresh_positions())
+        self.register_handler("reconcile_account", lambda cmd: t.reconcile_account())
+        self.register_handler("institution_trend", lambda cmd: t.get_institution_trend(cmd.get("code")))
+        self.register_handler("industry_volume_search", lambda cmd: t.industry_volume_search())
+        self.register_handler("subscribe_quotes", lambda cmd: t.subscribe_real_quotes(cmd.get("codes")))
+        self.register_handler("scan_job_step", lambda cmd: self.scan_jobs.run_step(cmd["job_id"]))
+        self.register_handler("scheduler_step", lambda cmd: self.scheduler.run_step(cmd["name"]))
+        self.register_handler("indicators_batch", lambda cmd: t.analyze_indicators_batch(cmd["codes"], cmd["indicators"]))
+
     def process_requests(self):
-        if not request_queue.empty():
-            cmd = request_queue.get()
-            result = None
-            if cmd == "get_account":
-                result = self.trading.get_balance_summary()
-            elif cmd == "get_available_cash":
-                result = self.trading.get_available_cash()
-            elif cmd == "get_holdings":
-                result = self.trading.get_holdings()
-            elif cmd == "volume_leaders":
-                result = self.trading.get_volume_leaders()
-            elif isinstance(cmd, dict) and cmd.get("type") == "buy":
-                result = self.trading.place_order(cmd["code"], cmd["price"], cmd["qty"])
-            elif isinstance(cmd, dict) and cmd.get("type") == "sell":
-                result = self.trading.place_sell_order(cmd["code"], cmd["price"], cmd["qty"])
-            elif cmd == "get_unfilled_orders":
-                result = self.trading.get_unfilled_orders()
-            elif isinstance(cmd, dict) and cmd.get("type") == "cancel_order":
-                result = self.trading.cancel_order(
-                    cmd.get("code"),
-                    cmd.get("order_no"),
-                    cmd.get("qty", 0),
-                    cmd.get("order_type", ""),
-                )
-            elif isinstance(cmd, dict) and cmd.get("type") == "get_rsi_data":
-                result = self.trading.analyze_rsi(cmd["rsiCode"])
-            elif isinstance(cmd, dict) and cmd.get("type") == "get_moving_average":
-                result = self.trading.get_moving_average(cmd["code"], cmd["history_date"], cmd["history_code"], cmd["history_price"], cmd["history_qty"], cmd["history_flag"])
-            elif isinstance(cmd, dict) and cmd.get("type") == "detect_golden_cross":
-                result = self.trading.detect_golden_cross(cmd["code"])
-            elif isinstance(cmd, dict) and cmd.get("type") == "detect_dead_cross":
-                result = self.trading.detect_dead_cross(cmd["code"])
-            elif isinstance(cmd, dict) and cmd.get("type") == "search_stock_by_name":
-                result = self.trading.search_stock_by_name(cmd["keyword"])    
-            elif cmd == "get_invest_weather":
-                result = self.trading.ask_gpt_for_invest_weather()  
-            elif cmd == "get_google_news_test":
-                result = self.trading.get_google_news_test()
-            elif isinstance(cmd, dict) and cmd.get("type") == "get_macd_data":
-                result = self.trading.analyze_macd(cmd["macdCode"])
-            elif isinstance(cmd, dict) and cmd.get("type") == "get_stochastic_data":
-                result = self.trading.analyze_stochastic(cmd["stochasticCode"], cmd["stochasticName"])
-            elif isinstance(cmd, dict) and cmd.get("type") == "get_stochastic_data2":
-                result = self.trading.analyze_stochastic2(cmd["stochasticCode"])
-            elif isinstance(cmd, dict) and cmd.get("type") == "save_volume_data":
-                result = self.trading.insert_get_today_volume(cmd["code"])
-            elif isinstance(cmd, dict) and cmd.get("type") == "volume_search":
-                result = self.trading.volume_search(cmd["code"], cmd["name"])
-            elif cmd == "start_loss_gain_monitor":
-                result = self.trading.start_loss_gain_monitoring()
-            elif isinstance(cmd, dict) and cmd.get("type") == "institution_trend":
-                result = self.trading.get_institution_trend(cmd.get("code"))
-            elif cmd == "industry_volume_search":
-                result = self.trading.industry_volume_search()
-
-            response_queue.put(result)
\ No newline at end of file
+        # TR 응답 대기(tr_client) 중 재진입 방지. 바깥 호출이 큐를 끝까지 비움
+        if self._processing:
+            return
+        self._processing = True
+        try:
+            while True:
+                item = self._next_request()
+                if item is None:
+                    break
+                self._run_request(*item)
+        finally:
+            self._processing = False
+
+    def _next_request(self):
+        for queue in (high_queue, low_queue):
+            if not queue.empty():
+                return queue.get()
+        return None
+
+    def _run_request(self, cmd, future):
+        # timeout 으로 취소된 요청은 건너뜀
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = self._dispatch(cmd)
+        except Exception as e:
+            logger.log_error("PROCESS_REQUEST", str(e))
+            result = {"error": str(e)}
+        future.set_result(result)
+
+    def _dispatch(self, cmd):
+        name = command_type(cmd)
+        handler = self.handlers.get(name)
+        if handler is None:
+            logger.warning(f"알 수 없는 명령: {name}")
+            return {"error": f"unknown command: {name}"}
+        return handler(cmd)
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+from config import Config
+
+# KRX 휴장일 (주말 제외, 연말 휴장일 포함) - 매년 KRX 공지에 맞춰 추가
+# 임시 휴장 등은 .env 의 MARKET_HOLIDAYS 로 추가 (예: 2026-06-03,2026-10-05)
+KRX_HOLIDAYS = {
+    # 2025
+    "2025-01-01", "2025-01-27", "2025-01-28", "2025-01-29", "2025-01-30",
+    "2025-03-03", "2025-05-01", "2025-05-05", "2025-05-06", "2025-06-03",
+    "2025-06-06", "2025-08-15", "2025-10-03", "2025-10-06", "2025-10-07",
+    "2025-10-08", "2025-10-09", "2025-12-25", "2025-12-31",
+    # 2026
+    "2026-01-01", "2026-02-16", "2026-02-17", "2026-02-18", "2026-03-02",
+    "2026-05-01", "2026-05-05", "2026-05-25", "2026-06-03", "2026-08-17",
+    "2026-09-24", "2026-09-25", "2026-10-05", "2026-10-09", "2026-12-25",
+    "2026-12-31",
+}
+HOLIDAYS = KRX_HOLIDAYS | set(Config.MARKET_HOLIDAYS)
+
+
+def at_time(day, hhmm):
+    hour, minute = map(int, hhmm.split(":"))
+    return day.replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+
+def is_trading_day(day):
+    """거래일 여부 (주말, KRX 휴장일 제외)"""
+    return day.weekday() < 5 and day.strftime('%Y-%m-%d') not in HOLIDAYS
+
+
+def previous_trading_day(day):
+    """day 직전 거래일 (date 또는 datetime)"""
+    day -= timedelta(days=1)
+    while not is_trading_day(day):
+        day -= timedelta(days=1)
+    return day
+
+
+def is_market_open(now=None):
+    """정규장 운영 중인지"""
+    now = now or datetime.now()
+    return is_trading_day(now) and at_time(now, Config.MARKET_OPEN_TIME) <= now < at_time(now, Config.MARKET_CLOSE_TIME)
+
+
+def last_market_close(now=None):
+    """now 이전 가장 최근 장 마감 시각"""
+    now = now or datetime.now()
+    day = now
+    while not is_trading_day(day) or at_time(day, Config.MARKET_CLOSE_TIME) > now:
+        day = (day - timedelta(days=1)).replace(hour=23, minute=59)
+    return at_time(day, Config.MARKET_CLOSE_TIME)
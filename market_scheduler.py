@@ -0,0 +1,231 @@
+import json
+import threading
+from datetime import datetime, timedelta
+from config import Config
+from indicator_db import db as default_db
+from event_hub import event_hub
+from market_hours import at_time, is_trading_day, is_market_open
+from scan_jobs import parse_basket_item
+from screener import MarketScreener
+from logger import logger
+
+
+class MarketScheduler:
+    """KRX 장 시간 기준 반복 작업 스케줄러
+
+    - invest_weather : 거래일 장 시작 전(INVEST_WEATHER_TIME ~ 개장) 투자 날씨 리포트 1회
+    - volume_chk     : 장중 VOLUME_CHECK_INTERVAL 마다 BASKET 거래량 급증 검사 (volume_search)
+    - eod_indicators : 거래일 EOD_BATCH_TIME 이후 BASKET 일봉 갱신 + RSI/MACD/STC 저장 1회
+    - market_bars    : 거래일 EOD_BATCH_TIME 이후 전 종목 일봉을 로컬 저장소에 동기화 1회 (스크리너용)
+
+    tick() 은 QTimer 로 Qt 스레드에서 호출되어 실행할 작업을 고르고, 실제 처리는
+    한 단위(종목/묶음)씩 저우선 명령(scheduler_step)으로 넣어 주문/계좌 명령이 끼어들 수 있게 한다.
+    시간당 TR 여유가 SCHEDULER_TR_RESERVE 이하이면 다음 tick 까지 쉬었다가 이어서 처리한다.
+    sch_data: (작업명, 'Y'/'N') = 작동 여부, (작업명 + ":status", JSON) = 마지막 실행 상태
+    """
+
+    STATUS_SUFFIX = ":status"
+    JOBS = ("invest_weather", "volume_chk", "eod_indicators", "market_bars")
+    EOD_CHUNK = 20  # eod_indicators / market_bars 한 단계에서 처리할 종목 수 (종목당 일봉 TR 최대 1회)
+    EOD_INDICATORS = ["rsi", "macd", "stochastic"]
+
+    def __init__(self, trading, submit, database=None):
+        self.trading = trading
+        self.submit_command = submit  # submit_request(cmd) - Qt 스레드로 명령 전달
+        self.db = database or default_db
+        self._states = {name: {"state": "idle"} for name in self.JOBS}
+        self._items = {}  # 작업명 -> [(종목코드, 종목명)] (실행 중인 작업만)
+        self._queued = set()  # scheduler_step 이 큐에 들어가 있는 작업
+        self._lock = threading.Lock()
+
+    # ---------------- 저장 ----------------
+    def _save(self, name):
+        with self.db.batch():
+            self.db.execute("DELETE FROM sch_data WHERE schNm = ?", (name + self.STATUS_SUFFIX,))
+            self.db.execute("INSERT INTO sch_data (schNm, status) VALUES (?, ?)",
+                            (name + self.STATUS_SUFFIX, json.dumps(self._states[name], ensure_ascii=False, default=str)))
+
+    def is_enabled(self, name):
+        """작동 여부 (조회만 함, 기본 행은 resume() 에서 저장)"""
+        row = self.db.fetchone("SELECT status FROM sch_data WHERE schNm = ?", (name,))
+        return row is None or row[0] == "Y"
+
+    def set_enabled(self, name, enabled):
+        if name not in self.JOBS:
+            return {"error": f"알 수 없는 작업: {name}"}
+        with self.db.batch():
+            self.db.execute("DELETE FROM sch_data WHERE schNm = ?", (name,))
+            self.db.execute("INSERT INTO sch_data (schNm, status) VALUES (?, ?)", (name, "Y" if enabled else "N"))
+        return {"name": name, "enabled": enabled}
+
+    def status(self):
+        with self._lock:
+            states = {name: dict(state) for name, state in self._states.items()}
+        return {
+            "market_open": is_market_open(),
+            "tr_remaining": self.trading.tr_scheduler.remaining(),
+            "jobs": {name: {"enabled": self.is_enabled(name), **state} for name, state in states.items()},
+        }
+
+    def _basket(self):
+        # basket_data 는 code/name 컬럼이 바뀌어 저장됨 (code=종목명, name=종목코드)
+        rows = self.db.fetchall("SELECT name, code FROM basket_data")
+        return [(parse_basket_item(code)[0], name or "") for code, name in rows if code]
+
+    # ---------------- 일정 ----------------
+    def _is_due(self, name, now):
+        state = self._states[name]
+        today = now.strftime('%Y-%m-%d')
+        if not is_trading_day(now):
+            return False
+
+        if name == "invest_weather":
+            return (state.get("run_date") != today
+                    and at_time(now, Config.INVEST_WEATHER_TIME) <= now < at_time(now, Config.MARKET_OPEN_TIME))
+        if name == "volume_chk":
+            started = state.get("started_at")
+            return is_market_open(now) and (
+                started is None
+                or now - datetime.strptime(started, '%Y-%m-%d %H:%M:%S') >= timedelta(seconds=Config.VOLUME_CHECK_INTERVAL)
+            )
+        if name in ("eod_indicators", "market_bars"):
+            return state.get("run_date") != today and now >= at_time(now, Config.EOD_BATCH_TIME)
+        return False
+
+    def _items_of(self, name):
+        if name == "invest_weather":
+            return [("", "")]
+        if name == "market_bars":
+            return [(code, stock_name) for code, stock_name, _ in self.trading.stock_master.rows()]
+        return self._basket()
+
+    def _start(self, name, now):
+        items = self._items_of(name)
+        with self._lock:
+            self._items[name] = items
+            self._states[name] = {
+                "state": "running",
+                "run_date": now.strftime('%Y-%m-%d'),
+                "started_at": now.strftime('%Y-%m-%d %H:%M:%S'),
+                "next": 0,
+                "total": len(items),
+                "errors": 0,
+            }
+            self._save(name)
+        logger.info(f"[스케줄러] {name} 시작 ({len(items)}건)")
+        event_hub.publish("scheduler", {"name": name, **self._states[name]})
+
+    def _queue_step(self, name):
+        with self._lock:
+            if name in self._queued:
+                return
+            self._queued.add(name)
+        self.submit_command({"type": "scheduler_step", "name": name})
+
+    # ---------------- 실행 (Qt 스레드) ----------------
+    def resume(self):
+        """재시작 시 sch_data 의 마지막 상태 복원 (같은 날 실행 중이던 작업은 이어서 처리)"""
+        today = datetime.now().strftime('%Y-%m-%d')
+        with self.db.batch():
+            for name in self.JOBS:
+                # 작동 여부 행이 없는 작업은 기본값 'Y' 로 한 번만 저장
+                self.db.execute("INSERT INTO sch_data (schNm, status) SELECT ?, 'Y' "
+                                "WHERE NOT EXISTS (SELECT 1 FROM sch_data WHERE schNm = ?)", (name, name))
+
+        for name in self.JOBS:
+            row = self.db.fetchone("SELECT status FROM sch_data WHERE schNm = ?", (name + self.STATUS_SUFFIX,))
+            if row is None:
+                continue
+            try:
+                state = json.loads(row[0])
+            except ValueError:
+                continue
+
+            with self._lock:
+                self._states[name] = state
+                if state.get("state") == "running":
+                    if state.get("run_date") == today and name != "invest_weather":
+                        self._items[name] = self._items_of(name)
+                        state["total"] = len(self._items[name])
+                    else:
+                        state["state"] = "stopped"
+                        self._save(name)
+
+    def tick(self, now=None):
+        """실행할 시각이 된 작업 시작, TR 여유 부족으로 멈춘 작업 재개"""
+        now = now or datetime.now()
+        for name in self.JOBS:
+            if self._states[name].get("state") == "running":
+                self._queue_step(name)
+            elif self.is_enabled(name) and self._is_due(name, now):
+                self._start(name, now)
+                self._queue_step(name)
+
+    def _finish(self, name, state):
+        state["finished_at"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._items.pop(name, None)
+        self._save(name)
+        logger.info(f"[스케줄러] {name} {state['state']} ({state['next']}/{state['total']}, 오류 {state['errors']})")
+
+    def run_step(self, name):
+        """작업 한 단위 처리 후 남은 단위가 있으면 다음 단계를 다시 큐에 넣음"""
+        with self._lock:
+            self._queued.discard(name)
+            state = self._states.get(name)
+            if state is None or state.get("state") != "running":
+                return None
+
+            if not self.is_enabled(name) or (name == "volume_chk" and not is_market_open()):
+                state["state"] = "stopped"
+            elif state["next"] >= state["total"]:
+                state["state"] = "done"
+            if state["state"] != "running":
+                self._finish(name, state)
+                summary = {"name": name, **state}
+                event_hub.publish("scheduler", summary)
+                return summary
+
+            size = self.EOD_CHUNK if name in ("eod_indicators", "market_bars") else 1
+            needed = 0 if name == "invest_weather" else size
+            if self.trading.tr_scheduler.remaining() - needed < Config.SCHEDULER_TR_RESERVE:
+                # TR 여유가 생기면 다음 tick 에서 이어서 처리
+                state["waiting"] = "tr_budget"
+                return {"name": name, **state}
+            state.pop("waiting", None)
+            chunk = self._items[name][state["next"]:state["next"] + size]
+
+        try:
+            result = self._run_unit(name, chunk)
+        except Exception as e:
+            logger.error(f"[스케줄러] {name} {chunk[0][0]} 오류: {e}")
+            result = None
+            with self._lock:
+                state["errors"] += 1
+
+        with self._lock:
+            state["next"] += len(chunk)
+            if name == "invest_weather" and result:
+                state["result"] = result
+            if name == "volume_chk" and result and result.get("result") == "Y":
+                state.setdefault("hits", []).append(chunk[0][0])
+            self._save(name)
+
+        self._queue_step(name)
+        return {"name": name, **state}
+
+    def _run_unit(self, name, chunk):
+        if name == "invest_weather":
+            result = self.trading.ask_gpt_for_invest_weather()
+            event_hub.publish("invest_weather", result)
+            return result
+        if name == "volume_chk":
+            code, stock_name = chunk[0]
+            return self.trading.volume_search(code, stock_name)
+        if name == "market_bars":
+            # 이미 장 마감 후 동기화한 종목은 TR 없이 건너뜀
+            for code, _ in chunk:
+                if not self.trading.bar_store.is_fresh(code):
+                    self.trading.get_daily_bars(code, count=MarketScreener.DAYS)
+            return None
+        # eod_indicators: 장 마감 후 일봉 증분 동기화 + 지표 저장 (analyze_indicators_batch 가 한 트랜잭션으로 저장)
+        return self.trading.analyze_indicators_batch([code for code, _ in chunk], self.EOD_INDICATORS)
@@ -0,0 +1,73 @@
+import threading
+import time
+import numpy as np
+
+
+class QuoteBook:
+    """실시간 시세 메모리 저장소
+
+    종목마다 slot 번호를 하나 배정하고, 필드별 값은 (slot × 필드) int64 배열 한 덩어리에 둔다.
+    실시간 체결(Qt 스레드)이 쓰고 HTTP 서버(asyncio) 스레드가 읽으므로 lock 으로 보호한다.
+    """
+
+    FIELDS = ("price", "change", "bid", "ask", "volume")
+    _INDEX = {name: i for i, name in enumerate(FIELDS)}
+
+    def __init__(self, capacity=256):
+        self._slots = {}  # 종목코드 -> slot
+        self._codes = []
+        self._values = np.zeros((capacity, len(self.FIELDS)), dtype=np.int64)
+        self._updated = np.zeros(capacity, dtype=np.float64)  # 마지막 수신 시각 (0 이면 아직 없음)
+        self._lock = threading.Lock()
+        self.ticks = 0
+
+    def _slot(self, code):
+        slot = self._slots.get(code)
+        if slot is None:
+            slot = len(self._codes)
+            if slot == len(self._values):
+                self._values = np.concatenate([self._values, np.zeros_like(self._values)])
+                self._updated = np.concatenate([self._updated, np.zeros_like(self._updated)])
+            self._slots[code] = slot
+            self._codes.append(code)
+        return slot
+
+    def update(self, code, **fields):
+        """수신한 필드만 갱신 (예: update("005930", price=71000, volume=1234567))"""
+        with self._lock:
+            slot = self._slot(code)
+            row = self._values[slot]
+            for name, value in fields.items():
+                row[self._INDEX[name]] = value
+            self._updated[slot] = time.time()
+            self.ticks += 1
+
+    def get(self, code):
+        """{price, change, bid, ask, volume, prev_close, updated_at} - 수신 이력이 없으면 None"""
+        with self._lock:
+            slot = self._slots.get(code)
+            if slot is None or self._updated[slot] == 0:
+                return None
+            values = self._values[slot].tolist()
+            updated_at = float(self._updated[slot])
+
+        quote = dict(zip(self.FIELDS, values))
+        quote["prev_close"] = quote["price"] - quote["change"]
+        quote["updated_at"] = updated_at
+        return quote
+
+    def get_many(self, codes):
+        return {code: self.get(code) for code in codes}
+
+    def price(self, code):
+        """마지막 체결가 (없으면 None)"""
+        quote = self.get(code)
+        return quote["price"] if quote and quote["price"] else None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "codes": len(self._codes),
+                "receiving": int(np.count_nonzero(self._updated[:len(self._codes)])),
+                "ticks": self.ticks,
+            }
@@ -0,0 +1,101 @@
+from logger import logger
+
+
+class RealQuoteFeed:
+    """실시간 시세 등록(SetRealReg)과 화면번호 배정
+
+    키움은 화면번호 하나에 최대 100 종목까지 실시간 등록할 수 있으므로
+    실시간 전용 화면번호(6000~)를 100 종목 단위로 나눠 쓴다. (TR 화면번호와 겹치지 않게 분리)
+    수신한 체결/호가는 QuoteBook 에 기록한다. Qt 스레드에서만 호출해야 한다.
+    """
+
+    SCREEN_BASE = 6000
+    MAX_SCREENS = 100
+    CODES_PER_SCREEN = 100
+
+    # 10 현재가, 11 전일대비, 13 누적거래량, 27 최우선매도호가, 28 최우선매수호가
+    TRADE_FIDS = "10;11;13;27;28"
+
+    def __init__(self, api, quote_book):
+        self.api = api
+        self.book = quote_book
+        self._screen_of = {}  # 종목코드 -> 화면번호
+        self._screen_codes = {}  # 화면번호 -> 등록 종목 set
+        self._listeners = []  # listener(code, tick) - 체결 수신마다 호출
+
+        self.api.ocx.OnReceiveRealData.connect(self._on_receive_real_data)
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def _allocate_screen(self):
+        """여유가 있는 화면번호 (없으면 새 화면번호, 한도를 넘으면 None)"""
+        for screen, codes in self._screen_codes.items():
+            if len(codes) < self.CODES_PER_SCREEN:
+                return screen
+        if len(self._screen_codes) >= self.MAX_SCREENS:
+            return None
+        screen = str(self.SCREEN_BASE + len(self._screen_codes))
+        self._screen_codes[screen] = set()
+        return screen
+
+    def subscribe(self, codes):
+        """아직 등록되지 않은 종목만 실시간 등록. 새로 등록한 종목 수 반환"""
+        pending = {}
+        for code in dict.fromkeys(codes):
+            if not code or code in self._screen_of:
+                continue
+            screen = self._allocate_screen()
+            if screen is None:
+                logger.warning(f"[실시간 시세] 화면번호 한도 초과로 {code} 등록 생략")
+                break
+            self._screen_codes[screen].add(code)
+            self._screen_of[code] = screen
+            pending.setdefault(screen, []).append(code)
+
+        for screen, screen_codes in pending.items():
+            # "1": 같은 화면의 기존 등록 종목을 유지한 채 추가
+            self.api.ocx.SetRealReg(screen, ";".join(screen_codes), self.TRADE_FIDS, "1")
+        return sum(len(c) for c in pending.values())
+
+    def unsubscribe(self, code):
+        screen = self._screen_of.pop(code, None)
+        if screen is None:
+            return
+        self._screen_codes[screen].discard(code)
+        self.api.ocx.SetRealRemove(screen, code)
+
+    def is_subscribed(self, code):
+        return code in self._screen_of
+
+    def _real_int(self, code, fid):
+        value = self.api.ocx.GetCommRealData(code, fid).strip()
+        try:
+            return int(value)
+        except ValueError:
+            return 0
+
+    def _on_receive_real_data(self, code, real_type, real_data):
+        if real_type != "주식체결":
+            return
+        # 가격 필드는 등락 부호(+/-)가 붙어 오므로 절대값 사용
+        tick = {
+            "price": abs(self._real_int(code, 10)),
+            "change": self._real_int(code, 11),
+            "volume": abs(self._real_int(code, 13)),
+            "ask": abs(self._real_int(code, 27)),
+            "bid": abs(self._real_int(code, 28)),
+        }
+        self.book.update(code, **tick)
+
+        for listener in self._listeners:
+            try:
+                listener(code, tick)
+            except Exception as e:
+                logger.error(f"[실시간 시세] 리스너 오류 ({code}): {e}")
+
+    def stats(self):
+        return {
+            "subscribed": len(self._screen_of),
+            "screens": {screen: len(codes) for screen, codes in self._screen_codes.items()},
+        }
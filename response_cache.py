@@ -0,0 +1,80 @@
+import threading
+import time
+
+
+class ResponseCache:
+    """짧은 TTL 응답 캐시 + 같은 요청 합치기 (single-flight)
+
+    - 같은 키의 요청이 처리 중이면 새로 보내지 않고 진행 중인 Future 를 함께 기다림
+    - 완료된 결과는 ttl 초 동안 재사용. 실패한 조회({"error": ...} 또는 None)는 저장하지 않음
+      (TR 실패 시 Trading 이 빈 기본값 대신 오류를 돌려주므로 빈 잔고가 캐시되어 다른 탭에 퍼지지 않음)
+    - invalidate() 이후에는 그 전에 출발한 요청 결과를 저장하지 않고 새 요청도 합치지 않음
+      (주문/체결 직후 이전 잔고가 다시 캐시되지 않도록 세대 번호로 구분)
+    Qt 스레드(무효화)와 HTTP 이벤트 루프(조회)가 함께 쓰므로 lock 으로 보호한다.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}  # key -> (저장시각, 값)
+        self._flights = {}  # key -> (세대, concurrent Future)
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """캐시된 값 (없거나 만료되면 None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] >= self.ttl:
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def flight(self, key, start):
+        """진행 중인 같은 키 요청의 Future, 없으면 start() 로 새 요청을 시작해 등록"""
+        with self._lock:
+            current = self._flights.get(key)
+            if current is not None and current[0] == self._generation:
+                self.coalesced += 1
+                return current[1]
+            self.misses += 1
+            generation = self._generation
+            # start 는 큐에 넣기만 하므로 lock 안에서 호출해 같은 키 요청이 두 번 출발하지 않게 함
+            future = start()
+            self._flights[key] = (generation, future)
+        future.add_done_callback(lambda f: self._land(key, generation, f))
+        return future
+
+    def _land(self, key, generation, future):
+        with self._lock:
+            if self._flights.get(key, (None, None))[1] is future:
+                del self._flights[key]
+            if future.cancelled() or future.exception() is not None or generation != self._generation:
+                return
+            value = future.result()
+            if value is None or (isinstance(value, dict) and "error" in value):
+                return
+            self._entries[key] = (time.monotonic(), value)
+
+    def invalidate(self):
+        """저장된 값을 모두 버리고 진행 중인 요청은 결과를 저장하지 않게 함 (주문/체결 이벤트 시)"""
+        with self._lock:
+            self._entries.clear()
+            self._flights.clear()
+            self._generation += 1
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "ttl": self.ttl,
+                "entries": len(self._entries),
+                "in_flight": len(self._flights),
+                "hits": self.hits,
+                "coalesced": self.coalesced,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,223 @@
+import json
+import threading
+import uuid
+from datetime import datetime
+from indicator_db import db as default_db
+from event_hub import event_hub
+from logger import logger
+
+# 검사 항목 -> (trading, 종목코드, 종목명) 으로 결과를 돌려주는 함수
+SCAN_CHECKS = {
+    "golden_cross": lambda t, code, name: t.detect_golden_cross(code),
+    "dead_cross": lambda t, code, name: t.detect_dead_cross(code),
+    "rsi": lambda t, code, name: t.analyze_rsi(code),
+    "macd": lambda t, code, name: t.analyze_macd(code),
+    "stochastic": lambda t, code, name: t.analyze_stochastic(code, name),
+    "stochastic2": lambda t, code, name: t.analyze_stochastic2(code),
+    "volume": lambda t, code, name: t.volume_search(code, name),
+}
+
+
+def parse_basket_item(item):
+    """"삼성전자[005930]" 또는 "005930" → (종목코드, 종목명)"""
+    item = str(item).strip()
+    if item.endswith("]") and "[" in item:
+        bracket = item.rindex("[")
+        return item[bracket + 1:-1].strip().replace("A", ""), item[:bracket].strip()
+    return item.replace("A", ""), ""
+
+
+class ScanJobManager:
+    """서버에서 실행하는 BASKET 스캔 작업
+
+    작업은 종목 하나씩 저우선 명령(scan_job_step)으로 Qt 스레드에 넣어 실행하므로
+    주문/계좌 명령이 사이사이 끼어들 수 있고, 취소는 다음 종목 처리 전에 반영된다.
+    - 작업 상태: sch_data (schNm = "scan_job:<id>", status = 작업 JSON)
+    - 종목별 마지막 결과: basket_data.etc (basket_data 는 code/name 컬럼이 바뀌어 저장됨: code=종목명, name=종목코드)
+    진행/결과는 event_hub 로 scan_progress / scan_result 이벤트를 푸시한다.
+    """
+
+    PREFIX = "scan_job:"
+
+    def __init__(self, trading, submit, database=None):
+        self.trading = trading
+        self.submit_command = submit  # submit_request(cmd) - Qt 스레드로 명령 전달
+        self.db = database or default_db
+        self._jobs = {}
+        self._lock = threading.Lock()  # _jobs / 작업 dict 보호 (SQLite 쓰기 중에는 잡지 않음)
+        self._save_lock = threading.Lock()  # 상태 스냅샷 ~ 저장 순서 보장
+
+    # ---------------- 저장 ----------------
+    @staticmethod
+    def _state(job):
+        """저장할 작업 상태 (결과 제외) JSON"""
+        return json.dumps({k: v for k, v in job.items() if k != "results"}, ensure_ascii=False)
+
+    def _save(self, job, result=None):
+        """작업 상태(와 종목 결과)를 한 트랜잭션으로 저장
+
+        상태는 _lock 안에서 스냅샷만 만들고 SQLite 쓰기(busy_timeout 대기 포함)는 _lock 밖에서 하므로
+        쓰는 동안에도 get/list/cancel 이 막히지 않는다. 스냅샷과 쓰기는 _save_lock 으로 묶어
+        먼저 만든 상태가 나중 상태를 덮어쓰지 않게 한다.
+        """
+        with self._save_lock:
+            with self._lock:
+                state = self._state(job)
+            with self.db.batch():
+                if result is not None:
+                    self._save_result(result)
+                self.db.execute("DELETE FROM sch_data WHERE schNm = ?", (self.PREFIX + job["job_id"],))
+                self.db.execute("INSERT INTO sch_data (schNm, status) VALUES (?, ?)", (self.PREFIX + job["job_id"], state))
+
+    def _save_result(self, result):
+        self.db.execute('''
+            INSERT INTO basket_data (code, name, etc)
+            VALUES (?, ?, ?)
+            ON CONFLICT(code) DO UPDATE SET
+                name = excluded.name,
+                etc = excluded.etc
+        ''', (result["name"] or result["code"], result["code"], json.dumps(result, ensure_ascii=False, default=str)))
+
+    def _summary(self, job):
+        return {
+            "job_id": job["job_id"],
+            "state": job["state"],
+            "checks": job["checks"],
+            "done": job["next"],
+            "total": len(job["items"]),
+            "created_at": job["created_at"],
+        }
+
+    # ---------------- 요청 (HTTP 서버에서 호출 가능) ----------------
+    # submit / cancel 은 SQLite 에 쓰므로 이벤트 루프에서는 asyncio.to_thread 로 호출
+    def submit(self, items, checks):
+        unknown = [c for c in checks if c not in SCAN_CHECKS]
+        if unknown:
+            return {"error": f"지원하지 않는 검사: {', '.join(unknown)}"}
+        if not checks or not items:
+            return {"error": "종목과 검사 항목을 지정하세요."}
+
+        parsed = []
+        for item in items:
+            code, name = parse_basket_item(item)
+            if code:
+                parsed.append([code, name or self.trading.stock_master.name_of(code) or ""])
+
+        job = {
+            "job_id": uuid.uuid4().hex[:12],
+            "checks": list(checks),
+            "items": parsed,
+            "next": 0,
+            "state": "running",
+            "created_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "results": [],
+        }
+        with self._lock:
+            self._jobs[job["job_id"]] = job
+        self._save(job)
+
+        self.submit_command({"type": "scan_job_step", "job_id": job["job_id"]})
+        return self._summary(job)
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return {"error": "작업을 찾을 수 없습니다."}
+            changed = job["state"] == "running"
+            if changed:
+                job["state"] = "cancelled"
+            summary = self._summary(job)
+        if changed:
+            self._save(job)
+        event_hub.publish("scan_progress", summary)
+        return summary
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return {"error": "작업을 찾을 수 없습니다."}
+            return {**self._summary(job), "results": list(job["results"])}
+
+    def list(self):
+        with self._lock:
+            return [self._summary(job) for job in self._jobs.values()]
+
+    # ---------------- 실행 (Qt 스레드) ----------------
+    def resume(self):
+        """재시작 시 sch_data 에 running 으로 남은 작업을 이어서 실행"""
+        rows = self.db.fetchall("SELECT schNm, status FROM sch_data WHERE schNm LIKE ?", (self.PREFIX + "%",))
+        resumed = 0
+        for _, status in rows:
+            try:
+                job = json.loads(status)
+            except ValueError:
+                continue
+
+            # 재시작 전에 끝난 종목의 결과는 basket_data 에서 복원
+            job["results"] = []
+            for code, _ in job["items"][:job["next"]]:
+                row = self.db.fetchone("SELECT etc FROM basket_data WHERE name = ?", (code,))
+                if row and row[0]:
+                    result = json.loads(row[0])
+                    if result.get("job_id") == job["job_id"]:
+                        job["results"].append(result)
+
+            with self._lock:
+                self._jobs[job["job_id"]] = job
+            if job["state"] == "running":
+                self.submit_command({"type": "scan_job_step", "job_id": job["job_id"]})
+                resumed += 1
+
+        if resumed:
+            logger.info(f"[스캔 작업] {resumed}개 작업 이어서 실행")
+        return resumed
+
+    def run_step(self, job_id):
+        """다음 종목 하나를 검사하고, 남은 종목이 있으면 다음 단계를 다시 큐에 넣음"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["state"] != "running":
+                return None
+            finished = job["next"] >= len(job["items"])
+            if finished:
+                job["state"] = "done"
+                summary = self._summary(job)
+            else:
+                code, name = job["items"][job["next"]]
+        if finished:
+            self._save(job)
+            event_hub.publish("scan_progress", summary)
+            return summary
+
+        result = {"job_id": job_id, "code": code, "name": name}
+        checks = list(job["checks"])
+        if "golden_cross" in checks and "dead_cross" in checks:
+            # 두 방향을 함께 고르면 일봉/현재가 조회 1회로 동시 판정
+            try:
+                crosses = self.trading.detect_crosses(code)
+                result["golden_cross"], result["dead_cross"] = crosses["golden_cross"], crosses["dead_cross"]
+                checks = [c for c in checks if c not in crosses]
+            except Exception as e:
+                logger.error(f"[스캔 작업] {job_id} {code} crosses 오류: {e}")
+
+        for check in checks:
+            try:
+                result[check] = SCAN_CHECKS[check](self.trading, code, name)
+            except Exception as e:
+                logger.error(f"[스캔 작업] {job_id} {code} {check} 오류: {e}")
+                result[check] = {"error": str(e)}
+
+        with self._lock:
+            job["results"].append(result)
+            job["next"] += 1
+            summary = self._summary(job)
+        self._save(job, result)
+
+        event_hub.publish("scan_result", result)
+        event_hub.publish("scan_progress", summary)
+
+        # 남은 종목이 없어도 한 번 더 넣어 done 처리 (취소되었으면 다음 단계에서 종료)
+        self.submit_command({"type": "scan_job_step", "job_id": job_id})
+        return summary
@@ -0,0 +1,121 @@
+import time
+import numpy as np
+from indicators import wilder_rsi, macd, slow_stochastic
+from crossover import cross_signals
+from logger import logger
+
+RULES = ("golden_cross", "dead_cross", "rsi_up", "macd_break", "stochastic")
+# 규칙별 최소 일봉 수 (MA120 + 5영업일, RSI 14, MACD 26+9)
+MIN_BARS = {"golden_cross": 124, "dead_cross": 124, "rsi_up": 15, "macd_break": 35, "stochastic": 35}
+
+
+def rule_masks(m, rules):
+    """(종목 × 일자) 일봉 행렬에서 규칙별 신호 마스크와 지표 값을 전 구간에 대해 계산
+
+    m: BarStore.load_matrix 결과 ({"high", "low", "close", ...} 2-D 배열).
+    반환: ({규칙: bool 배열}, {지표명: float 배열}) - 모두 close 와 같은 모양.
+    일자마다 그날까지의 일봉만 사용하므로 마지막 열은 스크리너, 전체 열은 백테스트에 쓴다.
+    """
+    close = m["close"]
+    masks, values = {}, {"close": close}
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if "golden_cross" in rules or "dead_cross" in rules:
+            signals = cross_signals(close)
+            if "golden_cross" in rules:
+                masks["golden_cross"] = signals["golden"]
+            if "dead_cross" in rules:
+                masks["dead_cross"] = signals["dead"]
+            values["ma5"] = signals["ma5"]
+
+        if "rsi_up" in rules or "stochastic" in rules:
+            rsi = wilder_rsi(close)[0]
+            values["rsi"] = rsi
+            rsi_up = rsi >= 50
+            if "rsi_up" in rules:
+                masks["rsi_up"] = rsi_up
+
+        if "macd_break" in rules or "stochastic" in rules:
+            macd_line, signal_line, _ = macd(close)
+            macd_break = macd_line > signal_line
+            values["macd"], values["signal"] = macd_line, signal_line
+            if "macd_break" in rules:
+                masks["macd_break"] = macd_break
+
+        if "stochastic" in rules:
+            # index2 "Slow STC 통합 조회" 조건: 19 < %K < 30, %K >= %D, STC/MACD 2일 연속 상승, MACD 돌파, RSI >= 50
+            k, d = slow_stochastic(m["high"], m["low"], close)
+            stc_up = np.zeros(k.shape, dtype=bool)
+            stc_up[:, 1:] = k[:, :-1] < k[:, 1:]
+            macd_up = np.zeros(k.shape, dtype=bool)
+            macd_up[:, 1:] = macd_line[:, :-1] < macd_line[:, 1:]
+            masks["stochastic"] = (19 < k) & (k < 30) & (k >= d) & stc_up & macd_up & macd_break & rsi_up
+            values["K"], values["D"] = k, d
+
+    # 그날까지 쌓인 일봉 수가 부족한 위치는 신호 없음
+    available = np.cumsum(~np.isnan(close), axis=-1)
+    for rule in masks:
+        masks[rule] = masks[rule] & (available >= MIN_BARS[rule])
+    return masks, values
+
+
+class MarketScreener:
+    """코스피+코스닥 전 종목 스크리너 (로컬 일봉 저장소 기준, TR 없음)
+
+    stock_master 의 전 종목 일봉을 daily_bars 에서 (종목 × 일자) 행렬로 한 번에 읽고,
+    골든/데드크로스, RSI 50 이상, MACD 시그널 돌파, Slow STC 통합 조건을 행렬 연산 한 번으로 판정한다.
+    일봉은 장 마감 후 스케줄러(market_bars)가 저장소에 채워 두며, 저장된 일봉이 부족한 종목은 제외된다.
+    행렬은 일자가 아니라 일봉 수로 오른쪽 정렬되므로, 마지막 저장 일자가 저장소의 최신 거래일보다 이른 종목
+    (거래정지, 동기화 누락)은 마지막 열이 오늘이 아니어서 판정에서 제외하고 stale 로 따로 센다.
+    지표는 최근 DAYS 개 일봉으로 계산하므로 600 개 일봉 기준 단건 조회와 EMA 계열 값이 소수점 단위로 다를 수 있다.
+    """
+
+    DAYS = 250
+
+    def __init__(self, bar_store, stock_master):
+        self.bar_store = bar_store
+        self.stock_master = stock_master
+
+    def screen(self, rules, market=None, limit=200):
+        """rules 를 모두 만족하는 종목 [{code, name, market, 지표...}] (종목코드 순, 최대 limit 개)"""
+        unknown = [rule for rule in rules if rule not in RULES]
+        if unknown:
+            return {"error": f"지원하지 않는 조건: {', '.join(unknown)}"}
+        if not rules:
+            return {"error": "조건을 하나 이상 지정하세요."}
+
+        started = time.perf_counter()
+        master = self.stock_master.rows(market)
+        codes = [row[0] for row in master]
+        m = self.bar_store.load_matrix(codes, self.DAYS)
+        loaded = time.perf_counter()
+
+        masks, values = rule_masks(m, rules)
+        last_date = np.nan_to_num(m["date"][:, -1]).astype(np.int64)
+        has_bars = m["count"] > 0
+        latest = int(last_date[has_bars].max()) if has_bars.any() else 0
+        fresh = has_bars & (last_date == latest)
+        matched = np.logical_and.reduce([masks[rule][:, -1] for rule in rules]) & fresh
+        rows = np.nonzero(matched)[0]
+
+        results = []
+        for row in rows[:limit]:
+            code, name, market_name = master[row]
+            item = {"code": code, "name": name, "market": market_name}
+            for key, column in values.items():
+                value = column[row, -1]
+                item[key] = None if np.isnan(value) else round(float(value), 2)
+            results.append(item)
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"[스크리너] {rules} {len(codes)}종목 중 {len(rows)}종목 일치 ({elapsed:.2f}초, 로드 {loaded - started:.2f}초)")
+        return {
+            "rules": list(rules),
+            "universe": len(codes),
+            "with_bars": int(np.count_nonzero(fresh)),
+            "stale": int(np.count_nonzero(has_bars & ~fresh)),
+            "latest_date": str(latest) if latest else None,
+            "matched": int(len(rows)),
+            "elapsed": round(elapsed, 3),
+            "results": results,
+        }
@@ -0,0 +1,123 @@
+import bisect
+import heapq
+from collections import defaultdict
+from indicator_db import db as default_db
+
+CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+
+
+def to_chosung(text):
+    """한글 음절을 초성으로 변환 (그 외 문자는 그대로)"""
+    return "".join(CHOSUNG[(ord(ch) - 0xAC00) // 588] if "가" <= ch <= "힣" else ch for ch in text)
+
+
+def is_chosung_query(keyword):
+    return all(ch in CHOSUNG for ch in keyword)
+
+
+class _NgramIndex:
+    """문자 1-gram / 2-gram → 항목 번호 역색인 (부분 문자열 후보를 교집합으로 좁힘)"""
+
+    def __init__(self, texts):
+        self.texts = texts
+        # 짧은 이름 → 가나다 순 정렬 위치 (결과 정렬 시 문자열 비교 대신 사용)
+        self.order = [0] * len(texts)
+        for position, i in enumerate(sorted(range(len(texts)), key=lambda i: (len(texts[i]), texts[i]))):
+            self.order[i] = position
+        grams = defaultdict(set)
+        for i, text in enumerate(texts):
+            for ch in text:
+                grams[ch].add(i)
+            for j in range(len(text) - 1):
+                grams[text[j:j + 2]].add(i)
+        self.grams = {gram: frozenset(ids) for gram, ids in grams.items()}
+
+    def find(self, keyword):
+        if len(keyword) == 1:
+            return self.grams.get(keyword, frozenset())
+
+        postings = [self.grams.get(keyword[j:j + 2]) for j in range(len(keyword) - 1)]
+        if any(p is None for p in postings):
+            return frozenset()
+        postings.sort(key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        if len(keyword) == 2:
+            return candidates
+        return frozenset(i for i in candidates if keyword in self.texts[i])
+
+
+class _MasterSnapshot:
+    """한 시점의 종목 마스터와 색인 (생성 후 변경하지 않음 → 스레드 간 공유 가능)"""
+
+    def __init__(self, rows):
+        self.rows = sorted(rows)  # (code, name, market), 종목코드 순
+        self.codes = [row[0] for row in self.rows]
+        self.names = [row[1].lower() for row in self.rows]
+        self.name_index = _NgramIndex(self.names)
+        self.chosung_index = _NgramIndex([to_chosung(name) for name in self.names])
+        self.by_code = {row[0]: row for row in self.rows}
+
+
+class StockMaster:
+    """종목 마스터 (종목명/코드/시장) 메모리 색인
+
+    세션당 1회 키움에서 받아 stock_master 테이블에 저장하고, 다음 시작 시에는 DB 에서 바로 읽는다.
+    검색은 색인만 읽으므로 Qt 스레드를 거치지 않고 HTTP 이벤트 루프에서 바로 호출한다.
+    - 종목명: 접두/부분 일치 (대소문자 무시)
+    - 초성: 'ㅅㅅㅈㅈ' → 삼성전자
+    - 종목코드: 숫자 입력 시 코드 접두 일치
+    """
+
+    def __init__(self, database=None):
+        self.db = database or default_db
+        self._snapshot = _MasterSnapshot([])
+
+    def __len__(self):
+        return len(self._snapshot.rows)
+
+    def load(self):
+        """DB 에 저장된 마스터로 색인 생성"""
+        rows = self.db.fetchall("SELECT code, name, market FROM stock_master")
+        self._snapshot = _MasterSnapshot(rows)
+        return len(rows)
+
+    def replace(self, rows):
+        """새 마스터로 DB 와 색인 교체"""
+        with self.db.batch():
+            self.db.execute("DELETE FROM stock_master")
+            self.db.executemany("INSERT INTO stock_master (code, name, market) VALUES (?, ?, ?)", rows)
+        self._snapshot = _MasterSnapshot(rows)
+
+    def rows(self, market=None):
+        """[(code, name, market)] 종목코드 순 (market: "KOSPI"/"KOSDAQ", 없으면 전체)"""
+        return [row for row in self._snapshot.rows if market is None or row[2] == market]
+
+    def name_of(self, code):
+        row = self._snapshot.by_code.get(code)
+        return row[1] if row else None
+
+    def search(self, keyword, limit=20):
+        """[{name, code, market}] - 완전 일치 → 접두 일치 → 부분 일치, 짧은 이름 순"""
+        snap = self._snapshot
+        keyword = keyword.strip().lower()
+        if not keyword:
+            return []
+
+        if keyword.isdigit():
+            start = bisect.bisect_left(snap.codes, keyword)
+            end = bisect.bisect_left(snap.codes, keyword + "\uffff")
+            matched = range(start, min(end, start + limit))
+        else:
+            index = snap.chosung_index if is_chosung_query(keyword) else snap.name_index
+            texts, order = index.texts, index.order
+            matched = heapq.nsmallest(
+                limit,
+                index.find(keyword),
+                key=lambda i: (texts[i] != keyword, not texts[i].startswith(keyword), order[i]),
+            )
+
+        result = []
+        for i in matched:
+            code, name, market = snap.rows[i]
+            result.append({"name": name, "code": code, "market": market})
+        return result
@@ -0,0 +1,104 @@
+import time
+from config import Config
+from logger import logger
+
+
+class StopLossEngine:
+    """실시간 체결마다 보유 종목 손절/익절 조건을 검사하는 엔진
+
+    - 매입가/수량은 보유 종목 조회 결과를 캐시해 두고 틱마다 TR 을 보내지 않음
+    - 손절: 손익률 <= -STOP_LOSS_RATE, 익절: 손익률 >= TAKE_PROFIT_RATE (Config, 비율)
+    - 같은 종목에 매도 주문이 나가 있는 동안(in-flight)은 다시 주문하지 않음
+    Qt 스레드(실시간 시세 콜백)에서만 호출된다.
+    """
+
+    # 주문 후 이 시간이 지나도 보유 수량이 그대로면 (주문 거부 등) 다음 틱 또는 보유 종목 갱신 때 다시 주문 가능
+    IN_FLIGHT_TIMEOUT = 30
+
+    def __init__(self, sell_func, stop_loss_rate=None, take_profit_rate=None, on_trigger=None):
+        self.sell = sell_func  # sell(code, qty) -> bool
+        self.on_trigger = on_trigger  # on_trigger(내역 dict) - 자동매도 주문 후 호출
+        self.stop_loss_rate = Config.STOP_LOSS_RATE if stop_loss_rate is None else stop_loss_rate
+        self.take_profit_rate = Config.TAKE_PROFIT_RATE if take_profit_rate is None else take_profit_rate
+        self.enabled = False
+        self._positions = {}  # 종목코드 -> (매입가, 수량, 종목명)
+        self._in_flight = {}  # 종목코드 -> 주문 시각
+        self.triggered = []  # 최근 자동매도 내역
+
+    def load_positions(self, holdings):
+        """opw00018 보유 종목으로 매입가 캐시 갱신
+
+        수량이 바뀌었거나 사라진 종목은 주문이 처리된 것으로 보고 in-flight 해제.
+        """
+        positions = {}
+        for h in holdings:
+            code = h.get("code", "").replace("A", "")
+            if h.get("purchase_price", 0) > 0 and h.get("quantity", 0) > 0:
+                positions[code] = (h["purchase_price"], h["quantity"], h.get("name"))
+
+        now = time.monotonic()
+        for code, sent_at in list(self._in_flight.items()):
+            old, new = self._positions.get(code), positions.get(code)
+            if new is None or old is None or new[1] != old[1] or now - sent_at >= self.IN_FLIGHT_TIMEOUT:
+                del self._in_flight[code]
+        self._positions = positions
+
+    def set_position(self, code, purchase_price, quantity, name=None):
+        """체결 등으로 바뀐 한 종목 갱신 (수량 0 이면 제거)"""
+        if purchase_price > 0 and quantity > 0:
+            self._positions[code] = (purchase_price, quantity, name)
+        else:
+            self._positions.pop(code, None)
+            self._in_flight.pop(code, None)
+
+    def codes(self):
+        return list(self._positions)
+
+    def holds(self, code):
+        return code in self._positions
+
+    def evaluate(self, code, price):
+        """조건 충족 시 시장가 전량 매도. 주문했으면 True"""
+        position = self._positions.get(code)
+        if not self.enabled or position is None or price <= 0:
+            return False
+
+        sent_at = self._in_flight.get(code)
+        if sent_at is not None:
+            if time.monotonic() - sent_at < self.IN_FLIGHT_TIMEOUT:
+                return False
+            logger.warning(f"[자동매도] {position[2]}({code}) 매도 주문 후 {self.IN_FLIGHT_TIMEOUT}초 동안 체결 확인 없음 -> 다시 검사")
+            del self._in_flight[code]
+
+        buy, qty, name = position
+        rate = (price - buy) / buy
+        if -self.stop_loss_rate < rate < self.take_profit_rate:
+            return False
+
+        reason = "손절" if rate < 0 else "익절"
+        logger.info(f"[자동매도] {name}({code}) 손익률 {rate * 100:.2f}% ({reason}) -> 전량 매도")
+        self._in_flight[code] = time.monotonic()
+        if not self.sell(code, qty):
+            del self._in_flight[code]
+            return False
+
+        item = {"code": code, "name": name, "price": price, "qty": qty, "rate": round(rate * 100, 2), "reason": reason, "time": time.time()}
+        self.triggered.append(item)
+        del self.triggered[:-50]
+        if self.on_trigger:
+            self.on_trigger(item)
+        return True
+
+    def on_tick(self, code, quote):
+        """RealQuoteFeed 리스너"""
+        self.evaluate(code, quote["price"])
+
+    def status(self):
+        return {
+            "enabled": self.enabled,
+            "stop_loss_rate": self.stop_loss_rate,
+            "take_profit_rate": self.take_profit_rate,
+            "positions": len(self._positions),
+            "in_flight": list(self._in_flight),
+            "triggered": self.triggered[-10:],
+        }
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 저장소 루트의 평면 모듈(indicators, crossover, backtest ...)을 import 할 수 있도록 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+
+import pytest
+
+from account_book import AccountBook
+from stop_loss import StopLossEngine
+
+HOLDINGS = [
+    {"code": "A005930", "name": "삼성전자", "quantity": 10, "purchase_price": 70000, "current_price": 71000},
+    {"code": "A000660", "name": "SK하이닉스", "quantity": 3, "purchase_price": 150000, "current_price": 149000},
+]
+ORDERS = [{"code": "035720", "name": "카카오", "qty": 5, "filled": 0, "price": 40000, "order_no": "0001", "order_type": "+매수"}]
+
+
+def _seeded():
+    book = AccountBook()
+    book.load(HOLDINGS, ORDERS)
+    engine = StopLossEngine(lambda code, qty: True, stop_loss_rate=0.05, take_profit_rate=0.1)
+    engine.load_positions(HOLDINGS)
+    return book, engine
+
+
+def test_account_book_load_and_drift():
+    book, _ = _seeded()
+    assert [h["code"] for h in book.holdings()] == ["A005930", "A000660"]
+    assert [o["order_no"] for o in book.unfilled_orders()["orders"]] == ["0001"]
+
+    # seed 이후 같은 결과는 drift 아님, 다른 결과는 drift 로 교체
+    assert book.load(HOLDINGS, ORDERS) is False
+    assert book.load(HOLDINGS[:1], []) is True
+    assert book.drift_count == 1
+
+
+def test_stop_loss_load_positions_caches_cost_basis():
+    _, engine = _seeded()
+    assert sorted(engine.codes()) == ["000660", "005930"]
+    engine.enabled = True
+    assert engine.evaluate("005930", 66000)  # -5.7% 손절
+    assert not engine.evaluate("000660", 149000)
+
+
+# ---------------- TR 실패 시 장부/엔진 유지 (trading.Trading) ----------------
+@pytest.fixture
+def trading_cls():
+    return pytest.importorskip("trading").Trading
+
+
+def _fake_trading(book, engine, **methods):
+    feed = SimpleNamespace(subscribe=lambda codes: 0)
+    return SimpleNamespace(account_book=book, stop_loss=engine, real_feed=feed, **methods)
+
+
+@pytest.mark.parametrize("holdings, orders", [
+    (None, {"orders": []}),  # opw00018 실패
+    (HOLDINGS, {"error": "unfilled_orders_req 응답 없음 (10초 초과)"}),  # opt10075 실패
+])
+def test_reconcile_failure_keeps_book_and_engine(trading_cls, holdings, orders):
+    book, engine = _seeded()
+    fake = _fake_trading(book, engine, query_holdings=lambda: holdings, query_unfilled_orders=lambda: orders)
+
+    assert "error" in trading_cls.reconcile_account(fake)
+    assert len(book.holdings()) == 2
+    assert len(book.unfilled_orders()["orders"]) == 1
+    assert book.drift_count == 0
+    assert sorted(engine.codes()) == ["000660", "005930"]
+
+
+def test_refresh_positions_failure_keeps_engine(trading_cls):
+    book, engine = _seeded()
+    fake = _fake_trading(book, engine, get_holdings=lambda: {"error": "보유종목 조회 실패"})
+
+    assert trading_cls.refresh_positions(fake) == {"error": "보유종목 조회 실패"}
+    assert sorted(engine.codes()) == ["000660", "005930"]
+
+    fake.refresh_positions = lambda: trading_cls.refresh_positions(fake)
+    assert "error" in trading_cls.start_loss_gain_monitoring(fake)
+    assert engine.enabled is False
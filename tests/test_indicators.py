@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import simulate
+from crossover import cross_signals
+from indicators import rsi_step, wilder_rsi
+
+
+# ---------------- RSI ----------------
+def test_wilder_rsi_hand_computed():
+    # 변화량 +1 +1 -1 +2 -1, period 3: 첫 평균 2/3, 1/3 → 이후 (avg * 2 + value) / 3
+    rsi, avg_gain, avg_loss = wilder_rsi([10, 11, 12, 11, 13, 12], period=3)
+
+    assert np.isnan(rsi[:3]).all()
+    np.testing.assert_allclose(rsi[3:], [200 / 3, 250 / 3, 100 - 1300 / 33])
+    np.testing.assert_allclose(avg_gain[3:], [2 / 3, 10 / 9, 20 / 27])
+    np.testing.assert_allclose(avg_loss[3:], [1 / 3, 2 / 9, 13 / 27])
+
+
+def test_wilder_rsi_no_loss_is_100():
+    rsi, _, _ = wilder_rsi(np.arange(1, 20, dtype=float))
+    assert rsi[-1] == 100.0
+
+
+def test_rsi_step_matches_full_series():
+    rng = np.random.default_rng(7)
+    closes = np.round(np.cumsum(rng.normal(0, 1, 60)) * 10 + 1000)
+    rsi, avg_gain, avg_loss = wilder_rsi(closes)
+
+    step_rsi, step_gain, step_loss = rsi_step(avg_gain[-2], avg_loss[-2], closes[-2], closes[-1])
+    assert step_rsi == pytest.approx(rsi[-1])
+    assert step_gain == pytest.approx(avg_gain[-1])
+    assert step_loss == pytest.approx(avg_loss[-1])
+
+
+def test_wilder_rsi_matrix_rows_match_single_series():
+    rng = np.random.default_rng(3)
+    long = np.cumsum(rng.normal(0, 1, 40)) + 100
+    short = np.cumsum(rng.normal(0, 1, 25)) + 100
+    matrix = np.full((2, 40), np.nan)
+    matrix[0] = long
+    matrix[1, 15:] = short
+
+    rsi = wilder_rsi(matrix)[0]
+    np.testing.assert_allclose(rsi[0], wilder_rsi(long)[0])
+    np.testing.assert_allclose(rsi[1, 15:], wilder_rsi(short)[0])
+
+
+# ---------------- 골든/데드크로스 ----------------
+def _reference_cross(closes, dead=False):
+    """기존 detect_golden_cross / detect_dead_cross 의 pandas 구현 (마지막 일자 기준)
+
+    반환: (cond1~cond5 모두 충족, cond2 제외 조건 충족)
+    """
+    df = pd.DataFrame({"close": closes})
+    for w in (5, 20, 60, 120):
+        df[f"MA{w}"] = df["close"].rolling(w).mean()
+    df = df.dropna().reset_index(drop=True)
+    recent = df.iloc[-5:]
+    ma5 = recent["MA5"].tolist()
+
+    last_ma5 = recent["MA5"].iloc[-1]
+    longs = [recent["MA20"].iloc[-1], recent["MA60"].iloc[-1], recent["MA120"].iloc[-1]]
+    distances = [abs(last_ma5 - ma) for ma in longs]
+    i = distances.index(min(distances))
+    name, closest = ["MA20", "MA60", "MA120"][i], longs[i]
+    gap = last_ma5 - closest
+
+    cond1 = abs(gap) / closest <= 0.03
+    if not dead:
+        cond2 = recent["MA5"].iloc[0] == min(ma5) or recent["MA5"].iloc[1] == min(ma5)
+        cond3 = recent["MA5"].iloc[3] < recent["MA5"].iloc[4]
+        cond4 = recent["MA5"].iloc[4] == max(ma5)
+        cond5 = (gap <= 0 and recent["MA5"].iloc[0] < recent[name].iloc[0]) or \
+                (gap > 0 and recent["MA5"].iloc[0] <= recent[name].iloc[0])
+    else:
+        cond2 = recent["MA5"].iloc[0] == max(ma5) or recent["MA5"].iloc[1] == max(ma5)
+        cond3 = recent["MA5"].iloc[3] > recent["MA5"].iloc[4]
+        cond4 = recent["MA5"].iloc[4] == min(ma5)
+        cond5 = (gap >= 0 and recent["MA5"].iloc[0] > recent[name].iloc[0]) or \
+                (gap < 0 and recent["MA5"].iloc[0] >= recent[name].iloc[0])
+    return all([cond1, cond2, cond3, cond4, cond5]), all([cond1, cond3, cond4, cond5])
+
+
+def test_cross_signals_match_pandas_reference():
+    rng = np.random.default_rng(0)
+    positives = 0
+    for _ in range(300):
+        n = int(rng.integers(124, 200))
+        closes = np.round(np.cumsum(rng.normal(0, 1, n)) * 50 + 10000)
+        signals = cross_signals(closes)
+        for key, dead in (("golden", False), ("dead", True)):
+            expected = _reference_cross(closes, dead)
+            assert (bool(signals[key][-1]), bool(signals[key + "_near"][-1])) == expected
+            positives += expected[1]
+    assert positives > 0  # 조건을 충족하는 경우도 비교됨
+
+
+def test_cross_signals_short_series_has_no_signal():
+    signals = cross_signals(np.arange(100, 223, dtype=float))  # 123 일: MA120 5일 창 불가
+    assert not signals["golden"].any() and not signals["dead"].any()
+
+
+# ---------------- 백테스트 매매 재현 ----------------
+def _bars(opens, highs=None, lows=None, closes=None):
+    opens = np.asarray(opens, dtype=float)
+    return (opens, opens + 1 if highs is None else np.asarray(highs, dtype=float),
+            opens - 1 if lows is None else np.asarray(lows, dtype=float),
+            opens if closes is None else np.asarray(closes, dtype=float))
+
+
+def test_simulate_hand_fixture():
+    # 일자 0 은 재현 시작 전날이라 그날 신호는 쓰지 않음 (신호는 1일부터)
+    nan = np.nan
+    rows = [
+        # 0: 1일 신호 → 2일 시가 100 진입, 3일 고가 111 ≥ 110 익절 (2일 신호는 보유 중이라 무시)
+        _bars([100, 100, 100, 105, 108, 108, 108], highs=[101, 101, 101, 111, 109, 109, 109]),
+        # 1: 2일 신호 → 3일 시가 50 진입, 4일 저가 47 ≤ 47.5 손절 (시가 49 가 더 높아 손절가 체결)
+        _bars([50, 50, 50, 50, 49, 49, 49], lows=[49, 49, 49, 49, 47, 48, 48]),
+        # 2: 1일 신호 → 2일 20 진입, 기준 미도달 → 5일(보유 3영업일) 종가 21 청산
+        _bars([20] * 7, highs=[20.5] * 5 + [21.5, 20.5], lows=[19.5] * 7, closes=[20, 20, 20, 20, 20, 21, 20]),
+        # 3: 1일 신호 → 2일 100 진입, 3일 시가 90 이 이미 손절가 95 아래 → 시가 청산
+        _bars([100, 100, 100, 90, 90, 90, 90], lows=[99, 99, 99, 88, 89, 89, 89]),
+        # 4: 상장 전(NaN) 구간 후 4일 신호 → 5일 30 진입, 기간 종료 시 마지막 종가 31 평가
+        _bars([nan] * 4 + [30, 30, 30], closes=[nan] * 4 + [30, 30, 31]),
+    ]
+    m = {key: np.array([row[i] for row in rows]) for i, key in enumerate(("open", "high", "low", "close"))}
+    entry = np.zeros((5, 7), dtype=bool)
+    entry[0, [1, 2]] = True
+    entry[1, 2] = True
+    entry[2, 1] = True
+    entry[3, 1] = True
+    entry[4, 4] = True
+
+    trades = simulate(m, entry, stop_loss_rate=0.05, take_profit_rate=0.1, max_hold=3, fee_rate=0.0)
+
+    order = np.argsort(trades["row"])
+    got = list(zip(*(trades[key][order].tolist() for key in ("row", "entry_day", "exit_day", "reason"))))
+    assert got == [
+        (0, 2, 3, "take_profit"),
+        (1, 3, 4, "stop_loss"),
+        (2, 2, 5, "max_hold"),
+        (3, 2, 3, "stop_loss"),
+        (4, 5, 6, "open"),
+    ]
+    assert trades["entry_price"][order].tolist() == pytest.approx([100, 50, 20, 100, 30])
+    assert trades["exit_price"][order].tolist() == pytest.approx([110, 47.5, 21, 90, 31])
+    returns = dict(zip(trades["row"].tolist(), trades["return"].tolist()))
+    assert returns == pytest.approx({0: 0.1, 1: -0.05, 2: 0.05, 3: -0.1, 4: 1 / 30})
+
+
+def test_simulate_fee_and_first_day():
+    opens, highs, lows, closes = _bars([10] * 5)
+    m = {"open": opens[None], "high": highs[None], "low": lows[None], "close": closes[None]}
+    entry = np.array([[False, True, True, False, False]])
+
+    # first_day=3: 1일/2일 신호는 진입 구간 이전이라 무시
+    assert len(simulate(m, entry, 0.5, 0.5, 10, 0.01, first_day=3)["row"]) == 0
+
+    # 1일 신호 → 2일 진입, 기간 끝까지 보유 (가격 변화 없음 → 수수료만큼 손실)
+    trades = simulate(m, entry, 0.5, 0.5, 10, 0.01)
+    assert trades["entry_day"].tolist() == [2]
+    assert trades["reason"].tolist() == ["open"]
+    assert trades["return"].tolist() == pytest.approx([-0.01])
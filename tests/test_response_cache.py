@@ -0,0 +1,52 @@
+from concurrent.futures import Future
+
+from response_cache import ResponseCache
+
+
+def _flight(cache, key, value):
+    """start() 로 새 요청이 나가면 value 로 완료, 합쳐졌으면 진행 중인 Future 반환"""
+    started = []
+
+    def start():
+        future = Future()
+        started.append(future)
+        return future
+
+    future = cache.flight(key, start)
+    for f in started:
+        f.set_result(value)
+    return future, bool(started)
+
+
+def test_successful_result_is_cached():
+    cache = ResponseCache(ttl=60)
+    _flight(cache, "get_holdings", [{"code": "A005930"}])
+    assert cache.get("get_holdings") == [{"code": "A005930"}]
+
+
+def test_failed_results_are_not_cached():
+    cache = ResponseCache(ttl=60)
+    for value in ({"error": "보유종목 조회 실패"}, None):
+        future, started = _flight(cache, "get_holdings", value)
+        assert started and future.result() == value
+        assert cache.get("get_holdings") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_empty_result_is_cached_when_successful():
+    # TR 실패는 오류로 오므로 빈 목록은 실제 "보유 종목 없음"
+    cache = ResponseCache(ttl=60)
+    _flight(cache, "get_holdings", [])
+    assert cache.get("get_holdings") == []
+
+
+def test_in_flight_result_is_dropped_after_invalidate():
+    cache = ResponseCache(ttl=60)
+    future = cache.flight("get_holdings", Future)
+    cache.invalidate()
+    future.set_result([{"code": "A005930"}])
+    assert cache.get("get_holdings") is None
+
+    # 무효화 이후 요청은 합쳐지지 않고 새로 출발
+    _, started = _flight(cache, "get_holdings", [])
+    assert started
@@ -0,0 +1,68 @@
+import pytest
+
+QtCore = pytest.importorskip("PyQt5.QtCore")
+
+from tr_client import TrClient
+from tr_registry import TrRegistry
+
+
+class _Scheduler:
+    def acquire(self, trcode):
+        pass
+
+
+class _Ocx:
+    """CommRqData 반환값만 정하는 가짜 OCX (응답 이벤트는 보내지 않음)"""
+
+    def __init__(self, ret=0):
+        self.ret = ret
+
+    def SetInputValue(self, key, value):
+        pass
+
+    def CommRqData(self, rqname, trcode, prev_next, screen):
+        return self.ret
+
+    def GetCommData(self, trcode, rqname, row, name):
+        return ""
+
+
+@pytest.fixture
+def qt_app():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+def test_timed_out_request_reports_failure(qt_app):
+    registry = TrRegistry()
+    client = TrClient(_Ocx(), registry, None, _Scheduler(), timeout=0.05)
+
+    response = client.request("opw00018_holdings_req")
+
+    assert not response.ok
+    assert "초과" in response.error
+    assert response.data == []  # 기본값은 그대로 채워짐
+    assert client.timeouts == 1
+    assert client.in_flight() == 0
+    assert registry.stats()["opw00018_holdings_req"]["errors"] == 1
+
+
+def test_rejected_request_reports_failure(qt_app):
+    client = TrClient(_Ocx(ret=-200), TrRegistry(), None, _Scheduler(), timeout=1)
+
+    response = client.request("opw00001_req")
+
+    assert not response.ok
+    assert "-200" in response.error
+    assert client.stats()["free_screens"] == TrClient.POOL_SIZE
+
+
+def test_received_response_is_ok(qt_app):
+    client = TrClient(_Ocx(), TrRegistry(), None, _Scheduler(), timeout=1)
+
+    future = client.send("opw00001_req")
+    screen, rqname = next(iter(client._pending))
+    client.on_receive(screen, rqname, "opw00001", "0")
+
+    response = future.result()
+    assert response.ok and response.error is None
+    assert response.data == {"available_cash": "0", "deposit_cash": "0"}
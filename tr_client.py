@@ -0,0 +1,180 @@
+import time
+from collections import deque, namedtuple
+from concurrent.futures import Future
+from PyQt5.QtCore import QEventLoop, QTimer
+from config import Config
+from logger import logger
+
+class TrResponse(namedtuple("TrResponse", "data has_next screen error")):
+    """data: spec.build 결과 (실패 시 spec.default()), has_next: 연속조회 데이터 남음, screen: 사용한 화면번호
+    error: 요청 거부/타임아웃/파싱 오류 사유 (정상 응답이면 None). 실패 시 data 는 빈 기본값이므로
+    빈 응답과 구분이 필요한 호출 측(계좌 조회 등)은 ok 를 확인해야 한다.
+    """
+
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class TrError(Exception):
+    """TR 요청이 거부/타임아웃/파싱 오류로 실패 (기본값을 받아들이지 않는 호출 측에서 발생)"""
+
+
+class _Pending:
+    def __init__(self, spec, inputs, prev_next, screen, future):
+        self.spec = spec
+        self.inputs = inputs
+        self.prev_next = prev_next
+        self.screen = screen
+        self.future = future
+        self.started = time.perf_counter()
+
+
+class TrClient:
+    """동시에 여러 TR 을 보내고 (화면번호, rqname) 으로 응답을 짝지어 요청별 Future 로 돌려주는 TR 클라이언트
+
+    - 화면번호는 TR 전용 풀(SCREEN_BASE~)에서 빌려 쓰고, 응답/타임아웃 시 반납 (가장 오래 쉰 번호부터 재사용)
+    - 동시에 응답을 기다리는 TR 은 Config.TR_MAX_IN_FLIGHT 개까지. 넘으면 하나가 끝날 때까지 대기
+    - 요청마다 Config.TR_TIMEOUT 초가 지나면 기본값으로 완료하고, 늦게 온 응답은 버림
+    - 대기는 요청별 QEventLoop 로 하므로 다른 화면의 응답이 엉뚱한 대기를 끝내지 않음
+    SetInputValue → CommRqData 는 전역 입력 상태를 쓰므로 보내는 과정은 Qt 스레드에서 한 번에 하나씩 한다.
+    """
+
+    SCREEN_BASE = 5000
+    POOL_SIZE = 20
+
+    def __init__(self, ocx, registry, parser, scheduler, max_in_flight=None, timeout=None):
+        self.ocx = ocx
+        self.registry = registry
+        self.parser = parser
+        self.scheduler = scheduler
+        self.max_in_flight = Config.TR_MAX_IN_FLIGHT if max_in_flight is None else max_in_flight
+        self.timeout = Config.TR_TIMEOUT if timeout is None else timeout
+        self._free = deque(str(self.SCREEN_BASE + i) for i in range(self.POOL_SIZE))
+        self._pending = {}  # (화면번호, rqname) -> _Pending
+        self._waiters = []  # 대기 중인 (QEventLoop, 완료 조건) - 중첩 대기면 여러 개
+        self.max_seen = 0
+        self.timeouts = 0
+        self.strays = 0
+
+    def in_flight(self):
+        return len(self._pending)
+
+    def _allocate(self, preferred=None):
+        """화면번호 대여 - 연속조회는 앞 페이지 화면번호를 그대로 쓰도록 preferred 우선"""
+        if preferred in self._free:
+            self._free.remove(preferred)
+            return preferred
+        return self._free.popleft()
+
+    def _finish(self, key, data, has_next, error=None):
+        pending = self._pending.pop(key)
+        self._free.append(pending.screen)
+        self.registry.record(pending.spec.rqname, time.perf_counter() - pending.started, ok=error is None)
+        if error is None and pending.prev_next == 0:
+            self.registry.store(pending.spec, pending.inputs, data, has_next)
+        pending.future.set_result(TrResponse(data, has_next, pending.screen, error))
+
+    def send(self, rqname, inputs=None, prev_next=0, screen=None):
+        """TR 요청을 보내고 TrResponse 를 받을 Future 반환 (응답을 기다리지 않음)"""
+        spec = self.registry[rqname]
+        inputs = spec.make_inputs(inputs)
+        future = Future()
+        future.set_running_or_notify_cancel()
+        future.add_done_callback(self._on_future_done)  # 요청당 1회만 등록
+
+        if prev_next == 0:
+            cached = self.registry.cached(spec, inputs)
+            if cached is not None:
+                future.set_result(TrResponse(cached[0], cached[1], None, None))
+                return future
+
+        # 동시 요청 한도 / 화면번호가 남을 때까지 앞선 응답 대기
+        while len(self._pending) >= self.max_in_flight or not self._free:
+            self.wait([p.future for p in self._pending.values()], any_done=True)
+
+        self.scheduler.acquire(spec.trcode)
+
+        screen = self._allocate(screen)
+        for key, value in inputs.items():
+            self.ocx.SetInputValue(key, value)
+        key = (screen, rqname)
+        self._pending[key] = _Pending(spec, inputs, prev_next, screen, future)
+        self.max_seen = max(self.max_seen, len(self._pending))
+
+        ret = self.ocx.CommRqData(rqname, spec.trcode, prev_next, screen)
+        if ret != 0:
+            # 요청이 거부되면 OnReceiveTrData 가 오지 않으므로 바로 완료
+            logger.error(f"[TR 요청 실패] {rqname}({spec.trcode}) 에러코드: {ret}")
+            self._finish(key, spec.default(), False, error=f"요청 거부 (에러코드 {ret})")
+            return future
+
+        QTimer.singleShot(int(self.timeout * 1000), lambda: self._expire(key, future))
+        return future
+
+    def _expire(self, key, future):
+        pending = self._pending.get(key)
+        if pending is None or pending.future is not future:
+            return
+        self.timeouts += 1
+        logger.error(f"[TR 타임아웃] {key[1]}({pending.spec.trcode}) 화면 {key[0]} {self.timeout}초 초과")
+        self._finish(key, pending.spec.default(), False, error=f"응답 없음 ({self.timeout}초 초과)")
+
+    def on_receive(self, screen_no, rqname, trcode, prev_next):
+        """OnReceiveTrData 처리 - 대기 중인 요청의 응답만 파싱해 해당 Future 완료"""
+        key = (str(screen_no), rqname)
+        pending = self._pending.get(key)
+        if pending is None:
+            self.strays += 1
+            logger.warning(f"[TR 수신] 대기 중이 아닌 응답 무시: {rqname}({trcode}) 화면 {screen_no}")
+            return
+
+        has_next = str(prev_next).strip() == "2"
+        try:
+            data, error = self.registry.parse(pending.spec, self.ocx, self.parser, trcode, rqname), None
+        except Exception as e:
+            logger.error(f"[TR 수신] {rqname}({trcode}) 처리 오류: {e}")
+            data, error = pending.spec.default(), f"응답 처리 오류: {e}"
+        self._finish(key, data, has_next, error)
+
+    def wait(self, futures, any_done=False):
+        """Future 들이 (any_done 이면 하나라도) 완료될 때까지 Qt 이벤트를 처리하며 대기"""
+        futures = list(futures)
+
+        def done():
+            finished = [f.done() for f in futures]
+            return any(finished) if any_done else all(finished)
+
+        if not futures or done():
+            return
+        loop = QEventLoop()
+        waiter = (loop, done)
+        self._waiters.append(waiter)
+        try:
+            loop.exec_()
+        finally:
+            self._waiters.remove(waiter)
+
+    def _on_future_done(self, _):
+        """요청 하나가 끝나면 조건을 만족한 대기만 깨움 (send 에서 Future 마다 한 번 등록)"""
+        for loop, done in list(self._waiters):
+            if done():
+                QTimer.singleShot(0, loop.quit)
+
+    def request(self, rqname, inputs=None, prev_next=0, screen=None):
+        """send + wait. TrResponse 반환"""
+        future = self.send(rqname, inputs, prev_next, screen)
+        self.wait([future])
+        return future.result()
+
+    def stats(self):
+        return {
+            "in_flight": len(self._pending),
+            "max_in_flight": self.max_in_flight,
+            "max_seen": self.max_seen,
+            "free_screens": len(self._free),
+            "timeouts": self.timeouts,
+            "strays": self.strays,
+        }
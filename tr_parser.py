@@ -0,0 +1,185 @@
+from collections import namedtuple
+import numpy as np
+from logger import logger
+
+# name: KOA 출력 필드명, key: 결과 컬럼명, kind: "str" (공백 제거) / "int" (쉼표 제거, 부호 유지) / "abs" (등락 부호 제거)
+TrField = namedtuple("TrField", "name key kind")
+# record: GetCommDataEx 레코드명, layout: KOA 멀티데이터 출력 순서 (GetCommDataEx 열 순서)
+TrSchema = namedtuple("TrSchema", "record layout fields")
+
+# 반복(멀티) TR 필드 스키마
+TR_SCHEMAS = {
+    "opw00018": TrSchema(
+        "계좌평가잔고개별합산",
+        ("종목번호", "종목명", "평가손익", "수익률(%)", "매입가", "전일종가", "보유수량", "매매가능수량", "현재가",
+         "전일매수수량", "전일매도수량", "금일매수수량", "금일매도수량", "매입금액", "매입수수료", "평가금액",
+         "평가수수료", "세금", "수수료합", "보유비중(%)", "신용구분", "신용구분명", "대출일"),
+        [TrField("종목번호", "code", "str"), TrField("종목명", "name", "str"), TrField("보유수량", "quantity", "int"),
+         TrField("매입가", "purchase_price", "int"), TrField("현재가", "current_price", "int")],
+    ),
+    "OPT10030": TrSchema(
+        "당일거래량상위",
+        ("종목코드", "종목명", "현재가", "전일대비기호", "전일대비", "등락률", "거래량", "전일비", "거래회전율", "거래금액"),
+        [TrField("종목코드", "code", "str"), TrField("종목명", "name", "str"), TrField("거래량", "vol", "int"),
+         TrField("거래금액", "amount", "int"), TrField("현재가", "price", "int")],
+    ),
+    "opt10075": TrSchema(
+        "미체결",
+        ("계좌번호", "주문번호", "관리사번", "종목코드", "업무구분", "주문상태", "종목명", "주문수량", "주문가격",
+         "미체결수량", "체결누계금액", "원주문번호", "주문구분", "매매구분", "시간", "체결번호", "체결가", "체결량",
+         "현재가", "매도호가", "매수호가", "단위체결가", "단위체결량", "당일매매수수료", "당일매매세금", "개인투자자"),
+        [TrField("종목코드", "code", "str"), TrField("종목명", "name", "str"), TrField("주문수량", "qty", "int"),
+         TrField("체결수량", "filled", "int"), TrField("주문가격", "price", "int"), TrField("주문번호", "order_no", "str"),
+         TrField("주문구분", "order_type", "str")],
+    ),
+    "opt10081": TrSchema(
+        "주식일봉차트조회",
+        ("종목코드", "현재가", "거래량", "거래대금", "일자", "시가", "고가", "저가", "수정주가구분", "수정비율",
+         "대업종구분", "소업종구분", "종목정보", "수정주가이벤트", "전일종가"),
+        [TrField("일자", "date", "int"), TrField("현재가", "close", "abs"), TrField("시가", "open", "abs"),
+         TrField("고가", "high", "abs"), TrField("저가", "low", "abs"), TrField("거래량", "volume", "int")],
+    ),
+    "opt10059": TrSchema(
+        "종목별투자자기관별",
+        ("일자", "현재가", "대비기호", "전일대비", "등락율", "누적거래량", "누적거래대금", "개인투자자", "외국인투자자",
+         "기관계", "금융투자", "보험", "투신", "기타금융", "은행", "연기금등", "사모펀드", "국가", "기타법인", "내외국인"),
+        [TrField("일자", "date", "str"), TrField("현재가", "cur_price", "str"), TrField("대비기호", "debi_sign", "str"),
+         TrField("전일대비", "debi_yesterday", "str"), TrField("등락율", "fluctuation", "str"),
+         TrField("누적거래량", "cumulative_amount", "str"), TrField("누적거래대금", "cumulative_paymt", "str"),
+         TrField("개인투자자", "individual", "str"), TrField("외국인투자자", "fr", "str"), TrField("기관계", "inst", "str"),
+         TrField("금융투자", "finance", "str"), TrField("보험", "insr", "str"), TrField("투신", "investmTrusts", "str"),
+         TrField("기타금융", "etc", "str"), TrField("은행", "bank", "str"), TrField("연기금등", "yun", "str"),
+         TrField("사모펀드", "samo", "str"), TrField("국가", "nation", "str"), TrField("기타법인", "etc_co", "str"),
+         TrField("내외국인", "inout", "str")],
+    ),
+    "OPT20001": TrSchema(
+        "업종현재가시간별",
+        ("시간", "현재가", "대비기호", "전일대비", "등락률", "거래량", "거래대금"),
+        [TrField("전일대비", "relative", "str"), TrField("거래량", "volume", "int"), TrField("거래대금", "paymt", "int")],
+    ),
+}
+
+
+def decode_int(values, absolute=False):
+    """문자열 목록 → (int64 배열, 변환 성공 여부 배열). 빈 값/변환 불가 값은 0, 성공 여부 False"""
+    text = np.char.replace(np.char.strip(np.asarray(values, dtype=str)), ",", "")
+    ok = text != ""
+    try:
+        ints = np.where(ok, text, "0").astype(np.int64)
+    except ValueError:
+        # 숫자가 아닌 값이 섞여 있을 때만 값별로 변환
+        ints = np.zeros(len(text), dtype=np.int64)
+        for i, value in enumerate(text):
+            try:
+                ints[i] = int(value)
+            except ValueError:
+                ok[i] = False
+    return (np.abs(ints) if absolute else ints), ok
+
+
+class TrBlock:
+    """반복 TR 응답을 스키마대로 변환한 컬럼 묶음
+
+    block[key] → "str" 필드는 list, "int"/"abs" 필드는 int64 배열. block.ok(key) 는 숫자 변환 성공 여부.
+    """
+
+    def __init__(self, schema, raw):
+        self.count = len(next(iter(raw.values()), []))
+        self._columns = {}
+        self._ok = {}
+        for field in schema.fields:
+            values = raw[field.name]
+            if field.kind == "str":
+                self._columns[field.key] = [str(v).strip() for v in values]
+            else:
+                self._columns[field.key], self._ok[field.key] = decode_int(values, absolute=field.kind == "abs")
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, key):
+        return self._columns[key]
+
+    def ok(self, key):
+        return self._ok[key]
+
+    def records(self):
+        """행 단위 dict 목록 (숫자는 int)"""
+        columns = {key: (col.tolist() if isinstance(col, np.ndarray) else col) for key, col in self._columns.items()}
+        return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+
+class TrParser:
+    """GetCommDataEx 로 반복 데이터 전체를 한 번에 받아 스키마대로 변환
+
+    GetCommData 는 (행 × 필드) 만큼 COM 호출이 필요하지만 GetCommDataEx 는 레코드 전체를 2-D 목록으로 한 번에 준다.
+    열 순서는 스키마의 layout 을 따르되, TR 마다 세션 첫 응답에서 앞쪽 몇 행을 GetCommData 값과 비교해
+    실제 열 위치를 확인한다 (layout 과 다르면 찾은 위치 사용, 못 찾은 필드만 GetCommData 로 읽음).
+    """
+
+    SAMPLE_ROWS = 3
+    PER_FIELD = None  # GetCommData 로 읽을 필드
+    EMPTY = -1  # 응답에 없는 필드 (GetCommData 도 빈 문자열)
+
+    def __init__(self, ocx):
+        self.ocx = ocx
+        self._columns = {}  # trcode -> {필드명: 열 번호 / PER_FIELD / EMPTY}
+        self.bulk_reads = 0
+        self.field_reads = 0
+
+    def _comm_data(self, trcode, rqname, row, name):
+        self.field_reads += 1
+        return self.ocx.GetCommData(trcode, rqname, row, name).strip()
+
+    def _calibrate(self, trcode, rqname, schema, table):
+        sample = range(min(len(table), self.SAMPLE_ROWS))
+        width = min(len(row) for row in table)
+        columns = {}
+        for field in schema.fields:
+            expected = [self._comm_data(trcode, rqname, r, field.name) for r in sample]
+            candidates = [j for j in range(width) if all(str(table[r][j]).strip() == expected[r] for r in sample)]
+            declared = schema.layout.index(field.name) if field.name in schema.layout else None
+
+            if declared is None and not any(expected):
+                columns[field.name] = self.EMPTY
+            elif declared in candidates:
+                columns[field.name] = declared
+            elif len(candidates) == 1:
+                logger.warning(f"[TR 파서] {trcode} {field.name} 열 위치가 스키마와 다름 ({declared} → {candidates[0]})")
+                columns[field.name] = candidates[0]
+            else:
+                logger.warning(f"[TR 파서] {trcode} {field.name} 열 위치를 확인하지 못해 GetCommData 로 읽음")
+                columns[field.name] = self.PER_FIELD
+        self._columns[trcode] = columns
+        return columns
+
+    def read(self, trcode, rqname, limit=None):
+        """반복 데이터 → TrBlock (limit 행까지)"""
+        schema = TR_SCHEMAS[trcode]
+        count = int(self.ocx.GetRepeatCnt(trcode, rqname))
+        if limit is not None:
+            count = min(count, limit)
+
+        table = self.ocx.dynamicCall("GetCommDataEx(QString, QString)", trcode, schema.record) if count else None
+        if not table or len(table) < count:
+            # 일괄 조회를 지원하지 않는 응답이면 필드별 조회
+            raw = {f.name: [self._comm_data(trcode, rqname, i, f.name) for i in range(count)] for f in schema.fields}
+            return TrBlock(schema, raw)
+
+        self.bulk_reads += 1
+        table = table[:count]
+        columns = self._columns.get(trcode) or self._calibrate(trcode, rqname, schema, table)
+
+        raw = {}
+        for field in schema.fields:
+            col = columns[field.name]
+            if col is self.PER_FIELD:
+                raw[field.name] = [self._comm_data(trcode, rqname, i, field.name) for i in range(count)]
+            elif col == self.EMPTY:
+                raw[field.name] = [""] * count
+            else:
+                raw[field.name] = [row[col] for row in table]
+        return TrBlock(schema, raw)
+
+    def stats(self):
+        return {"bulk_reads": self.bulk_reads, "field_reads": self.field_reads, "calibrated": sorted(self._columns)}
@@ -0,0 +1,208 @@
+import copy
+import threading
+import time
+import numpy as np
+from config import Config
+from daily_bars import DailyBars
+from logger import logger
+from tr_parser import TrField
+
+ACCOUNT_INPUTS = {
+    "계좌번호": Config.ACCNO,
+    "비밀번호": Config.ACCNO_PASSWORD,
+    "비밀번호입력매체구분": "00",
+    "조회구분": "2",
+}
+
+
+class TrSpec:
+    """TR 하나의 선언
+
+    - inputs   : 고정 입력값 (요청 시 넘긴 입력값이 덮어씀)
+    - single   : 단일 데이터 필드 (0 번 행, TrField 목록)
+    - repeat   : 반복 데이터 사용 여부 (필드는 tr_parser.TR_SCHEMAS[trcode]), limit 행까지
+    - build    : build(single dict, TrBlock 또는 None) → 응답 데이터
+    - default  : 응답이 없거나 실패했을 때 돌려줄 값을 만드는 함수
+    - cache_ttl: 같은 입력의 첫 페이지 응답을 재사용할 시간(초), 0 이면 캐시 안 함
+    """
+
+    def __init__(self, rqname, trcode, build, inputs=None, single=(), repeat=False, limit=None,
+                 default=dict, cache_ttl=0):
+        self.rqname = rqname
+        self.trcode = trcode
+        self.build = build
+        self.inputs = inputs or {}
+        self.single = single
+        self.repeat = repeat
+        self.limit = limit
+        self.default = default
+        self.cache_ttl = cache_ttl
+
+    def make_inputs(self, inputs=None):
+        return {**self.inputs, **(inputs or {})}
+
+
+def _comma_amount(text):
+    """"000001234567" → "1,234,567" """
+    return f"{int(text.lstrip('0') or '0'):,}"
+
+
+def _build_balance_summary(single, block):
+    try:
+        total = _comma_amount(single["total_investment"])
+        valuation = _comma_amount(single["total_valuation"])
+    except ValueError:
+        total, valuation = 0, 0
+    return {"total_investment": total, "total_valuation": valuation}
+
+
+def _build_available_cash(single, block):
+    available = _comma_amount(single["available_cash"])
+    return {"available_cash": available, "deposit_cash": available}
+
+
+def _build_volume_leaders(single, block):
+    stocks = [
+        {"code": s["code"], "name": s["name"], "price": s["price"], "vol": s["vol"], "amount": s["amount"]}
+        for s in block.records()
+    ]
+    return {"stocks": stocks}
+
+
+def _build_unfilled_orders(single, block):
+    orders = block.records()
+    for o in orders:
+        logger.info(f"[trading.py] unfilled_orders_req => {o['code']} | {o['name']} | {o['qty']} | {o['filled']} | {o['price']}")
+    return {"orders": orders}
+
+
+def _build_daily_bars(single, block):
+    # 응답은 최신 → 과거 순. 일자/종가가 없는 행은 제외하고 시가/고가/저가가 없으면 종가로 채움
+    keep = block.ok("date") & block.ok("close")
+    closes = block["close"]
+    ohl_ok = block.ok("open") & block.ok("high") & block.ok("low")
+    opens, highs, lows = (np.where(ohl_ok, block[key], closes) for key in ("open", "high", "low"))
+
+    return DailyBars.from_latest_first(
+        block["date"][keep].astype(np.int32), opens[keep], highs[keep], lows[keep],
+        closes[keep], block["volume"][keep]
+    )
+
+
+def _build_institution_trend(single, block):
+    # 최근 1일(첫 행)만 사용
+    stocks = block.records()
+    for s in stocks:
+        logger.info(", ".join(f"{key} : {value}" for key, value in s.items()))
+    return {"stocks": stocks}
+
+
+TR_SPECS = (
+    TrSpec("opw00018_req", "opw00018", _build_balance_summary, inputs=ACCOUNT_INPUTS,
+           single=[TrField("총매입금액", "total_investment", "str"), TrField("총평가금액", "total_valuation", "str")]),
+    TrSpec("opw00001_req", "opw00001", _build_available_cash, inputs=ACCOUNT_INPUTS,
+           single=[TrField("주문가능금액", "available_cash", "str")]),
+    TrSpec("opw00018_holdings_req", "opw00018", lambda single, block: block.records(),
+           inputs=ACCOUNT_INPUTS, repeat=True, default=list),
+    TrSpec("unfilled_orders_req", "opt10075", _build_unfilled_orders, repeat=True,
+           inputs={"계좌번호": Config.ACCNO, "전체": "0", "매매구분": "0", "체결구분": "1"},  # 전체 계좌, 미체결만
+           default=lambda: {"orders": []}),
+    TrSpec("volume_rank_req", "OPT10030", _build_volume_leaders, repeat=True, limit=50,
+           inputs={"시장구분": "000", "정렬구분": "1", "관리종목포함": "1", "신용구분": "0"},  # 전체 시장, 거래량순
+           default=lambda: {"stocks": []}, cache_ttl=10),
+    TrSpec("opt10081_req", "opt10081", _build_daily_bars, repeat=True, inputs={"수정주가구분": "1"},
+           default=DailyBars.empty),  # 일봉은 bar_cache / bar_store 가 캐시
+    TrSpec("opt10001_req", "opt10001", lambda single, block: {"현재가": single["price"], "전일대비": single["diff"]},
+           single=[TrField("현재가", "price", "str"), TrField("전일대비", "diff", "str")], cache_ttl=1),
+    TrSpec("opt10059_req", "opt10059", _build_institution_trend, repeat=True, limit=1,
+           inputs={"금액수량구분": "2", "매매구분": "0", "단위구분": "1"},
+           default=lambda: {"stocks": []}, cache_ttl=60),
+    # 시장구분: 0:코스피, 1:코스닥, 2:코스피200
+    # 업종코드: 001:종합(KOSPI), 002:대형주, 003:중형주, 004:소형주 101:종합(KOSDAQ), 201:KOSPI200, 302:KOSTAR, 701: KRX100 나머지
+    TrSpec("sector_volume_req", "OPT20001", lambda single, block: {"sectors": block.records()},
+           repeat=True, inputs={"시장구분": "1", "업종코드": "124"}, default=lambda: {"sectors": []}, cache_ttl=10),
+)
+
+
+class TrRegistry:
+    """rqname → TrSpec 등록부 + TR 공통 처리 (응답 파싱, 첫 페이지 캐시, 요청별 소요 시간 통계)
+
+    요청/응답 대기 자체는 tr_client.TrClient 가 하고, 여기서는 TR 별로 다른 부분만 선언에서 읽는다.
+    화면번호는 선언하지 않고 TrClient 의 화면번호 풀에서 배정한다.
+    HTTP 서버 스레드에서 통계를 읽을 수 있도록 lock 으로 보호한다.
+    """
+
+    def __init__(self, specs=TR_SPECS):
+        self.specs = {spec.rqname: spec for spec in specs}
+        self._cache = {}  # (rqname, 입력값) -> (저장시각, 데이터, 연속조회 여부)
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def get(self, rqname):
+        return self.specs.get(rqname)
+
+    def __getitem__(self, rqname):
+        return self.specs[rqname]
+
+    def parse(self, spec, ocx, parser, trcode, rqname):
+        """OnReceiveTrData 응답 → spec.build 결과"""
+        single = {f.key: ocx.GetCommData(trcode, rqname, 0, f.name).strip() for f in spec.single}
+        block = parser.read(trcode, rqname, limit=spec.limit) if spec.repeat else None
+        return spec.build(single, block)
+
+    @staticmethod
+    def _cache_key(spec, inputs):
+        return spec.rqname, tuple(sorted(inputs.items()))
+
+    def cached(self, spec, inputs):
+        """(데이터 사본, 연속조회 여부) 또는 None"""
+        if not spec.cache_ttl:
+            return None
+        key = self._cache_key(spec, inputs)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None or time.monotonic() - entry[0] >= spec.cache_ttl:
+                self._cache.pop(key, None)
+                return None
+            self._stat(spec.rqname)["cache_hits"] += 1
+            return copy.deepcopy(entry[1]), entry[2]
+
+    def store(self, spec, inputs, data, has_next):
+        if not spec.cache_ttl:
+            return
+        with self._lock:
+            self._cache[self._cache_key(spec, inputs)] = (time.monotonic(), copy.deepcopy(data), has_next)
+
+    def invalidate(self, rqname=None):
+        """rqname 의 캐시 (없으면 전체) 삭제"""
+        with self._lock:
+            for key in [key for key in self._cache if rqname is None or key[0] == rqname]:
+                del self._cache[key]
+
+    def _stat(self, rqname):
+        return self._stats.setdefault(rqname, {"requests": 0, "errors": 0, "cache_hits": 0, "total": 0.0, "max": 0.0})
+
+    def record(self, rqname, elapsed, ok=True):
+        """요청 1회(페이지 1개) 결과 기록 - elapsed 는 CommRqData 부터 응답까지 (속도 제한 대기 제외)"""
+        with self._lock:
+            stat = self._stat(rqname)
+            stat["requests"] += 1
+            stat["total"] += elapsed
+            stat["max"] = max(stat["max"], elapsed)
+            if not ok:
+                stat["errors"] += 1
+                logger.warning(f"[TR] {rqname} 응답 없음/실패 ({elapsed:.3f}초)")
+
+    def stats(self):
+        with self._lock:
+            return {
+                rqname: {
+                    "trcode": self.specs[rqname].trcode if rqname in self.specs else None,
+                    "requests": stat["requests"],
+                    "errors": stat["errors"],
+                    "cache_hits": stat["cache_hits"],
+                    "avg_time": round(stat["total"] / stat["requests"], 3) if stat["requests"] else 0.0,
+                    "max_time": round(stat["max"], 3),
+                }
+                for rqname, stat in self._stats.items()
+            }
@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import deque
+from PyQt5.QtCore import QEventLoop, QTimer
+from config import Config
+from logger import logger
+
+
+class TrScheduler:
+    """TR 요청 속도 제한 스케줄러
+
+    키움 TR 제한(초당 / 시간당 요청 수)을 슬라이딩 윈도우로 지키면서
+    주문·계좌 TR(고우선)과 분석용 TR(저우선)을 구분한다.
+    - 고우선 명령이 먼저 실행되도록 하는 것은 명령 큐(kiwoom_app.process_requests)의 몫.
+      저우선 작업은 짧은 단위로 나눠 단위 사이에 큐로 돌아간다 (TR 대기 중에 다른 명령을 끼워 실행하지 않음)
+    - 대기는 QEventLoop 로 하므로 대기 중에도 실시간/체결 이벤트는 계속 처리됨
+    """
+
+    HIGH = "high"
+    LOW = "low"
+
+    HIGH_PRIORITY_TRS = {"opw00018", "opw00001", "opt10075"}
+
+    def __init__(self, per_second=None, per_hour=None):
+        # (윈도우 길이(초), 허용 요청 수)
+        self.windows = [
+            (1.0, Config.TR_PER_SECOND if per_second is None else per_second),
+            (3600.0, Config.TR_PER_HOUR if per_hour is None else per_hour),
+        ]
+        self._sent = deque()  # 최근 1시간 요청 시각
+        self._lock = threading.Lock()
+        self._waiting = {self.HIGH: 0, self.LOW: 0}
+        self._stats = {
+            lane: {"requests": 0, "total_wait": 0.0, "max_wait": 0.0}
+            for lane in (self.HIGH, self.LOW)
+        }
+
+    def lane_of(self, trcode):
+        return self.HIGH if trcode.lower() in self.HIGH_PRIORITY_TRS else self.LOW
+
+    def _delay(self, now):
+        """지금 요청하면 제한을 넘는 경우 기다려야 할 시간(초)"""
+        longest = self.windows[-1][0]
+        while self._sent and now - self._sent[0] >= longest:
+            self._sent.popleft()
+
+        delay = 0.0
+        for length, limit in self.windows:
+            recent = [t for t in self._sent if now - t < length]
+            if len(recent) >= limit:
+                # limit 번째 최근 요청이 윈도우를 벗어날 때까지 대기
+                delay = max(delay, recent[-limit] + length - now)
+        return delay
+
+    def _sleep(self, seconds):
+        loop = QEventLoop()
+        QTimer.singleShot(int(seconds * 1000) + 1, loop.quit)
+        loop.exec_()
+
+    def acquire(self, trcode):
+        """TR 1회 요청 권한 획득 (필요 시 대기). 반환: 대기한 시간(초)"""
+        lane = self.lane_of(trcode)
+        started = time.monotonic()
+        with self._lock:
+            self._waiting[lane] += 1
+        try:
+            while True:
+                with self._lock:
+                    delay = self._delay(time.monotonic())
+                    if delay <= 0:
+                        self._sent.append(time.monotonic())
+                        break
+                self._sleep(delay)
+        finally:
+            with self._lock:
+                self._waiting[lane] -= 1
+
+        waited = time.monotonic() - started
+        with self._lock:
+            stats = self._stats[lane]
+            stats["requests"] += 1
+            stats["total_wait"] += waited
+            stats["max_wait"] = max(stats["max_wait"], waited)
+
+        if waited >= 1:
+            logger.info(f"[TR 스케줄러] {trcode} ({lane}) {waited:.2f}초 대기")
+        return waited
+
+    def remaining(self):
+        """가장 긴 윈도우(시간당)에서 아직 보낼 수 있는 TR 수"""
+        with self._lock:
+            self._delay(time.monotonic())  # 윈도우를 벗어난 기록 정리
+            return max(0, self.windows[-1][1] - len(self._sent))
+
+    def stats(self):
+        """레인별 요청 수 / 대기 시간, 윈도우별 사용량"""
+        with self._lock:
+            now = time.monotonic()
+            lanes = {}
+            for lane, stats in self._stats.items():
+                lanes[lane] = {
+                    "requests": stats["requests"],
+                    "waiting": self._waiting[lane],
+                    "avg_wait": round(stats["total_wait"] / stats["requests"], 3) if stats["requests"] else 0.0,
+                    "max_wait": round(stats["max_wait"], 3),
+                }
+            usage = {
+                f"last_{int(length)}s": {"used": sum(1 for t in self._sent if now - t < length), "limit": limit}
+                for length, limit in self.windows
+            }
+            return {"lanes": lanes, "usage": usage}
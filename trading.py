@@ -1,4 +1,3 @@
-from PyQt5.QtCore import QEventLoop, QTimer
 from config import Config
 import logging
 from logger import logger
@@ -8,7 +7,7 @@ from matplotlib import font_manager, rc
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 from PyQt5.QtWidgets import QDialog, QVBoxLayout
-from datetime import datetime
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import os
 import csv
@@ -16,6 +15,27 @@ from openai import OpenAI
 from google_news_scraper import get_google_news_snippets
 import sqlite3
 import requests
+from bar_cache import DailyBarCache
+from bar_store import BarStore
+from screener import MarketScreener
+from backtest import Backtester
+from indicator_db import db, DB_PATH
+from stock_master import StockMaster
+from quote_book import QuoteBook
+from real_feed import RealQuoteFeed
+from stop_loss import StopLossEngine
+from account_book import AccountBook
+from response_cache import ResponseCache
+from event_hub import event_hub, Throttle
+from tr_scheduler import TrScheduler
+from tr_parser import TrParser
+from tr_registry import TrRegistry
+from tr_client import TrClient, TrError
+from market_hours import previous_trading_day
+from daily_bars import DailyBars
+from indicators import wilder_rsi, rsi_step, macd, slow_stochastic, stack_column
+from crossover import cross_signals, LONG_MA_NAMES
+import numpy as np
 
 load_dotenv(dotenv_path="env_template.env")  # 파일 경로 직접 지정
 
@@ -33,7 +53,7 @@ plt.rcParams['axes.unicode_minus'] = False
 
 # 앱 시작 시 1회만 DB 초기화
 def initialize_db():
-    conn = sqlite3.connect("stock_indicators.db")
+    conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
 
     # 1. RSI 테이블
@@ -48,6 +68,11 @@ def initialize_db():
         )
     ''')
 
+    # RSI 증분 계산용 기준 종가 컬럼 (기존 DB 에 없으면 추가)
+    rsi_columns = [row[1] for row in cursor.execute("PRAGMA table_info(rsi_data)")]
+    if "close" not in rsi_columns:
+        cursor.execute("ALTER TABLE rsi_data ADD COLUMN close REAL")
+
     # 2. MACD 테이블
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS macd_data (
@@ -100,6 +125,40 @@ def initialize_db():
         )
     ''')
 
+    # 7. 일봉 로컬 저장소 (수정주가, 장 마감된 일봉만)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS daily_bars (
+            code TEXT,
+            date TEXT,
+            open INTEGER,
+            high INTEGER,
+            low INTEGER,
+            close INTEGER,
+            volume INTEGER,
+            PRIMARY KEY (code, date)
+        )
+    ''')
+
+    # 8. 일봉 동기화 상태 (마지막 동기화 시각, 상장일까지 수신 여부)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS daily_bars_sync (
+            code TEXT,
+            synced_at TEXT,
+            complete INTEGER,
+            PRIMARY KEY (code)
+        )
+    ''')
+
+    # 9. 종목 마스터 (종목 검색 색인용)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stock_master (
+            code TEXT,
+            name TEXT,
+            market TEXT,
+            PRIMARY KEY (code)
+        )
+    ''')
+
     conn.commit()
     conn.close()
 
@@ -136,10 +195,61 @@ class ChartDialog(QDialog):
 class Trading:
     def __init__(self, kiwoom_api):
         self.api = kiwoom_api
-        self.tr_event_loop = QEventLoop()
-        self.tr_data = {}
+        self.tr_parser = TrParser(self.api.ocx)  # 반복 TR 일괄 파싱 (GetCommDataEx)
+        self.tr_registry = TrRegistry()
+        self.bar_cache = DailyBarCache()
+        self.bar_store = BarStore()
+        self.stock_master = StockMaster()
+        self.screener = MarketScreener(self.bar_store, self.stock_master)
+        self.backtester = Backtester(self.stock_master)
+        self.stock_master.load()  # 이전 세션 마스터로 바로 검색 가능
+        self.quote_book = QuoteBook()
+        self.real_feed = RealQuoteFeed(self.api, self.quote_book)
+        self.stop_loss = StopLossEngine(self._sell_at_market, on_trigger=lambda item: event_hub.publish("stop_loss", item))
+        self.real_feed.add_listener(self.stop_loss.on_tick)
+        self.real_feed.add_listener(self._publish_quote)
+        self._quote_throttle = Throttle(1.0)
+        self.account_book = AccountBook(self.quote_book)
+        self.account_cache = ResponseCache(Config.ACCOUNT_CACHE_TTL)  # 계좌 조회 API 응답 캐시 (주문/체결 시 무효화)
+        self.tr_scheduler = TrScheduler()
+        self.tr_client = TrClient(self.api.ocx, self.tr_registry, self.tr_parser, self.tr_scheduler)
 
         self.api.ocx.OnReceiveTrData.connect(self._on_receive_tr_data)
+        self.api.ocx.OnReceiveChejanData.connect(self._on_receive_chejan_data)
+
+    @staticmethod
+    def _check_tr(rqname, response, accept_default):
+        """실패한 응답은 TrError (accept_default 이면 기본값을 그대로 사용)"""
+        if not response.ok and not accept_default:
+            raise TrError(f"{rqname} {response.error}")
+
+    def _request_tr(self, rqname, inputs=None, prev_next=0, accept_default=False):
+        """TR 1건 요청 후 응답 대기 (tr_client). 응답 데이터 반환 (연속조회가 필요하면 _iter_tr_pages)
+
+        trcode, 고정 입력값, 응답 파싱은 tr_registry 의 선언을 따르고 inputs 는 요청별 입력값만 넘긴다.
+        요청 거부/타임아웃/파싱 오류는 TrError. 빈 기본값을 받아도 되는 시세 조회만 accept_default=True.
+        """
+        response = self.tr_client.request(rqname, inputs, prev_next)
+        self._check_tr(rqname, response, accept_default)
+        return response.data
+
+    def _iter_tr_pages(self, rqname, inputs=None, accept_default=False):
+        """반복 TR 을 연속조회(prev_next=2)로 끝까지 따라가며 (페이지, 연속조회 데이터 남음 여부) 단위로 반환
+
+        호출 측에서 필요한 만큼 받았으면 반복을 멈추면 된다. 연속조회는 첫 페이지의 화면번호를 그대로 쓴다.
+        실패한 페이지는 _request_tr 과 같이 TrError (accept_default 이면 그 페이지에서 종료).
+        """
+        prev_next, screen = 0, None
+        while True:
+            response = self.tr_client.request(rqname, inputs, prev_next, screen)
+            self._check_tr(rqname, response, accept_default)
+            page = response.data
+            if not page:
+                return
+            yield page, response.has_next
+            if not response.has_next:
+                return
+            prev_next, screen = 2, response.screen
 
     def send_slack_message(self, text):
         webhook_url = ""    # (slack api) Webhook URL
@@ -153,34 +263,21 @@ class Trading:
     def volume_search(self, code, name):
         logger.info(f"trading > volume_search, code,name : {code},{name}")
 
-        prices = self.get_close_prices(code, 2)
+        bars = self.get_close_prices(code, 2)
+        if len(bars) < 2:
+            return {'result': 'N'}
 
-        curr_row = prices[0]
-        curr_volume = curr_row.get('거래량', 0)
-        
-        prev_row = prices[1]
-        prev_volume = prev_row.get('거래량', 0)
+        curr_volume = int(bars.volume[-1])
+        prev_volume = int(bars.volume[-2])
 
         logger.info(f"curr_volume : {curr_volume}")
         logger.info(f"prev_volume : {prev_volume}")
 
-        try:
-            curr_volume = int(curr_volume)
-            logger.info(f"curr_volume : {curr_volume}")
-        except Exception:
-            curr_volume = 0
-
-        try:
-            prev_volume = int(prev_volume)
-            logger.info(f"prev_volume : {prev_volume}")
-        except Exception:
-            prev_volume = 0
-
         result = ''
         if curr_volume >= (prev_volume * 2):
             logger.info("curr_volume >= (prev_volume * 2)")
 
-            stc_macd_result = self.analyze_stochastic(code)
+            stc_macd_result = self.analyze_stochastic(code, name)
             stc = stc_macd_result['stc']
             macd = stc_macd_result['macd']
 
@@ -199,67 +296,63 @@ class Trading:
         }
 
     def get_balance_summary(self):
+        """총매입/총평가 금액 - 계좌 장부가 채워져 있으면 메모리에서, 아니면 opw00018"""
+        summary = self.account_book.balance_summary()
+        if summary is not None:
+            return summary
+        return self.query_balance_summary()
+
+    def query_balance_summary(self):
         try:
             if not self.api.connected:
                 return {}
 
-            self.tr_data.pop('opw00018', None)
-            self.api.ocx.SetInputValue("계좌번호", Config.ACCNO)
-            self.api.ocx.SetInputValue("비밀번호", Config.ACCNO_PASSWORD)
-            self.api.ocx.SetInputValue("비밀번호입력매체구분", "00")
-            self.api.ocx.SetInputValue("조회구분", "2")
-            self.api.ocx.CommRqData("opw00018_req", "opw00018", 0, "9200")
-            self.tr_event_loop.exec_()
-            return self.tr_data.get('opw00018', {})
+            return self._request_tr("opw00018_req")
         except Exception as e:
             logger.error(f"잔고조회 오류: {e}")
-            return {}
+            return {"error": str(e)}
 
     def get_available_cash(self):
         try:
             if not self.api.connected:
                 return {}
 
-            self.tr_data.pop('opw00001', None)
-            self.api.ocx.SetInputValue("계좌번호", Config.ACCNO)
-            self.api.ocx.SetInputValue("비밀번호", Config.ACCNO_PASSWORD)
-            self.api.ocx.SetInputValue("비밀번호입력매체구분", "00")
-            self.api.ocx.SetInputValue("조회구분", "2")
-            self.api.ocx.CommRqData("opw00001_req", "opw00001", 0, "9201")
-            self.tr_event_loop.exec_()
-            return self.tr_data.get('opw00001', {})
+            return self._request_tr("opw00001_req")
         except Exception as e:
             logger.error(f"주문가능금액 조회 오류: {e}")
-            return {}    
+            return {"error": str(e)}    
 
     def get_holdings(self):
-        """보유 종목 조회"""
+        """보유 종목 - 계좌 장부가 채워져 있으면 메모리에서, 아니면 opw00018. 조회 실패 시 {"error": ...}"""
+        holdings = self.account_book.holdings()
+        if holdings is not None:
+            return holdings
+        holdings = self.query_holdings()
+        if holdings is None:
+            return {"error": "보유종목 조회 실패"}
+        return holdings
+
+    def query_holdings(self):
+        """보유 종목 조회 (opw00018). 조회 실패(미연결, TR 거부/타임아웃) 시 None - 빈 목록은 보유 종목 없음"""
         try:
             if not self.api.connected:
-                return []
-
-            self.tr_data.pop('opw00018', None)
-            self.api.ocx.SetInputValue("계좌번호", Config.ACCNO)
-            self.api.ocx.SetInputValue("비밀번호", Config.ACCNO_PASSWORD)
-            self.api.ocx.SetInputValue("비밀번호입력매체구분", "00")
-            self.api.ocx.SetInputValue("조회구분", "2")
-            self.api.ocx.CommRqData("opw00018_holdings_req", "opw00018", 0, "9202")
-            self.tr_event_loop.exec_()
-            return self.tr_data.get('opw00018', [])
+                return None
+
+            holdings = self._request_tr("opw00018_holdings_req")
+
+            # 실시간 시세를 받고 있으면 TR 시점 현재가 대신 최신 체결가 사용
+            for h in holdings:
+                price = self.quote_book.price(h["code"].replace("A", ""))
+                if price:
+                    h["current_price"] = price
+            return holdings
         except Exception as e:
             logger.error(f"보유종목 조회 오류: {e}")
-            return []
+            return None
 
     def get_volume_leaders(self):
         try:
-            self.tr_data.pop("OPT10030", None)
-            self.api.ocx.SetInputValue("시장구분", "000")  # 전체 시장
-            self.api.ocx.SetInputValue("정렬구분", "1")    # 거래량순
-            self.api.ocx.SetInputValue("관리종목포함", "1")
-            self.api.ocx.SetInputValue("신용구분", "0")
-            self.api.ocx.CommRqData("volume_rank_req", "OPT10030", 0, "4001")
-            self.tr_event_loop.exec_()
-            return self.tr_data.get("OPT10030", {"stocks": []})
+            return self._request_tr("volume_rank_req", accept_default=True)
         except Exception as e:
             return {"error": str(e)}
 
@@ -292,6 +385,7 @@ class Trading:
                     ""
                 )
 
+            self.account_cache.invalidate()
             return {"message": "✅ 매수 주문 요청 완료"}
         except Exception as e:
             logger.log_error("BUY_ORDER", str(e))
@@ -324,24 +418,32 @@ class Trading:
                     ""
                 )
 
+            self.account_cache.invalidate()
             return {"message": "✅ 매도 주문 요청 완료"}
         except Exception as e:
             logger.log_error("SELL_ORDER", str(e))
             return {"error": str(e)}
 
     def get_unfilled_orders(self):
-        """미체결 주문 조회"""
+        """미체결 주문 - 계좌 장부가 채워져 있으면 메모리에서, 아니면 opt10075"""
+        orders = self.account_book.unfilled_orders()
+        if orders is not None:
+            return orders
+        return self.query_unfilled_orders()
+
+    def query_unfilled_orders(self):
+        """미체결 주문 조회 (opt10075)"""
         if not self.api.connected:
             return {"error": "API 미연결"}
 
-        self.tr_data.pop("opt10075", None)
-        self.api.ocx.SetInputValue("계좌번호", Config.ACCNO)
-        self.api.ocx.SetInputValue("전체", "0") # 전체 계좌
-        self.api.ocx.SetInputValue("매매구분", "0") # 전체
-        self.api.ocx.SetInputValue("체결구분", "1") # 미체결만
-        self.api.ocx.CommRqData("unfilled_orders_req", "opt10075", 0, "9000")
-        self.tr_event_loop.exec_()
-        return self.tr_data.get("opt10075", {"orders": []})
+        orders = []
+        try:
+            for page, _ in self._iter_tr_pages("unfilled_orders_req"):
+                orders.extend(page.get("orders", []))
+        except TrError as e:
+            logger.error(f"미체결 조회 오류: {e}")
+            return {"error": str(e)}
+        return {"orders": orders}
 
     def cancel_order(self, code, order_no, qty, order_type=""):
         """미체결 주문 취소"""
@@ -360,81 +462,181 @@ class Trading:
                 "00",
                 order_no,
             )
+            self.account_cache.invalidate()
             return {"message": "✅ 주문 취소 요청 완료"}
         except Exception as e:
             logger.log_error("CANCEL_ORDER", str(e))
             return {"error": str(e)}
 
-    def get_close_prices(self, code, count):
-        today = datetime.today().strftime('%Y%m%d')
-
-        self.tr_data.pop("opt10081", None)
-        self.api.ocx.SetInputValue("종목코드", code)
-        self.api.ocx.SetInputValue("기준일자", today)
-        self.api.ocx.SetInputValue("수정주가구분", "1")
-        self.api.ocx.SetInputValue("output", "주식일봉차트조회")
-        self.api.ocx.CommRqData("opt10081_req", "opt10081", 0, "5000")
-        self.tr_event_loop.exec_()
+    def get_daily_bars(self, code, base_date=None, adjusted="1", count=None, start_date=None):
+        """일봉(opt10081) 조회 - 같은 (종목코드, 기준일자, 수정주가구분)은 캐시에서 반환
 
-        df = self.tr_data.get("opt10081", [])
+        count / start_date 를 주면 연속조회로 그 깊이까지 받아 정확히 그만큼 반환한다.
+        (둘 다 없으면 첫 페이지만 조회) 받은 페이지는 도착할 때마다 캐시에 반영한다.
+        오늘 기준 수정주가 일봉은 로컬 저장소를 먼저 읽고 새 일봉만 받아 온다.
+        """
+        today = datetime.today().strftime('%Y%m%d')
+        if base_date is None:
+            base_date = today
+
+        bars = self.bar_cache.get(code, base_date, adjusted, count, start_date)
+        if bars is None and base_date == today and adjusted == "1":
+            bars = self._sync_daily_bars(code, count, start_date)
+        if bars is None:
+            bars, _ = self._fetch_daily_bars(code, base_date, adjusted, count, start_date)
+
+        if start_date:
+            bars = bars.since(start_date)
+        if count:
+            bars = bars.tail(count)
+        return bars
+
+    def _fetch_daily_bars(self, code, base_date, adjusted, count, start_date, continue_from_cache=True):
+        """opt10081 연속조회로 필요한 깊이까지 받아 (일봉, 과거 데이터가 더 남았는지) 반환"""
+        # 얕게 캐시된 데이터가 있으면 그 이전 일자부터 이어서 조회
+        # (델타 동기화는 최신 일봉이 필요하므로 continue_from_cache=False 로 기준일자부터 받음)
+        use_partial = continue_from_cache and (count or start_date)
+        bars = self.bar_cache.partial(code, base_date, adjusted) if use_partial else None
+        if bars is not None and len(bars):
+            fetch_date = (datetime.strptime(bars.first_date, '%Y%m%d') - timedelta(days=1)).strftime('%Y%m%d')
+        else:
+            bars = DailyBars.empty()
+            fetch_date = base_date
 
-        if(count == 0):
-            close_prices = df
+        inputs = {
+            "종목코드": code,
+            "기준일자": fetch_date,
+            "수정주가구분": adjusted,
+        }
+        has_next = False
+        for page, has_next in self._iter_tr_pages("opt10081_req", inputs, accept_default=True):
+            bars = DailyBars.concat([page, bars])
+            self.bar_cache.put(code, base_date, adjusted, bars, not has_next)
+            if not has_next or (count is None and start_date is None) or bars.covers(count, start_date):
+                break
+        return bars, has_next
+
+    def _sync_daily_bars(self, code, count, start_date):
+        """로컬 저장소 일봉 + 마지막 저장 일자 이후 일봉만 받아 합친 뒤 저장 (델타 동기화)
+
+        - 장 마감 후 이미 동기화한 종목은 TR 없이 저장분 반환
+        - 마지막 저장 일봉의 종가가 새로 받은 값과 다르면 수정주가 변경(액면분할 등)으로 보고 전체 재수신
+        """
+        today = datetime.today().strftime('%Y%m%d')
+        stored = self.bar_store.load(code)
+        _, complete = self.bar_store.sync_state(code)
+
+        if len(stored) and self.bar_store.is_fresh(code):
+            bars = stored
+        elif len(stored):
+            # 마지막 저장 일자까지만 받음 (보통 첫 페이지 1회)
+            fetched, has_next = self._fetch_daily_bars(code, today, "1", None, stored.last_date, continue_from_cache=False)
+            if len(fetched) == 0:
+                return stored
+
+            new = fetched.since(stored.last_date)
+            if len(new) and new.date[0] == stored.date[-1] and new.close[0] == stored.close[-1]:
+                bars = DailyBars.concat([stored, new])
+            else:
+                logger.info(f"[일봉 저장소] {code} 수정주가 변경 감지 → 전체 재수신")
+                self.bar_store.delete(code)
+                bars = new = fetched
+                complete = not has_next
+            self.bar_store.save(code, self.bar_store.closed_bars(new))
         else:
-            close_prices = df[:count]
+            bars, has_next = self._fetch_daily_bars(code, today, "1", count, start_date)
+            if len(bars) == 0:
+                return bars
+            complete = not has_next
+            self.bar_store.save(code, self.bar_store.closed_bars(bars))
+
+        # 저장분보다 더 과거가 필요하면 가장 오래된 일자 이전부터 연속조회로 이어 받음
+        if not complete and not bars.covers(count, start_date):
+            self.bar_cache.put(code, today, "1", bars, complete)
+            older_from, before = bars.first_date, len(bars)
+            bars, has_next = self._fetch_daily_bars(code, today, "1", count, start_date)
+            if len(bars) > before:
+                complete = not has_next
+            self.bar_store.save(code, bars[:int(np.searchsorted(bars.date, int(older_from)))])
+
+        self.bar_store.mark_synced(code, complete)
+        self.bar_cache.put(code, today, "1", bars, complete)
+        return bars
 
-        logger.info(f"close_prices : {close_prices}")
-        return close_prices
+    def get_close_prices(self, code, count):
+        """최근 count 개 일봉 (0 이면 전체). 과거 → 최신 순 DailyBars view"""
+        bars = self.get_daily_bars(code).tail(count)
+        logger.info(f"close_prices : {bars}")
+        return bars
 
     def calculate_rsi(self, prices, period=14):
-        gains = []
-        losses = []
-        rsi = 0
-
-        for i in range(1, len(prices)):
-            delta = prices[i] - prices[i - 1]
-            if delta > 0:
-                gains.append(delta)
-                losses.append(0)
-            else:
-                gains.append(0)
-                losses.append(abs(delta))
+        """Wilder RSI (벡터화). 마지막 일자의 rsi/avg_gain/avg_loss 반환, 데이터 부족 시 None"""
+        rsi, avg_gain, avg_loss = wilder_rsi(prices, period)
+        if len(rsi) == 0 or np.isnan(rsi[-1]):
+            return None
 
-        avg_gain = sum(gains[:period]) / period
-        avg_loss = sum(losses[:period]) / period
+        return {
+            "rsi" : float(rsi[-1])
+            ,"avg_gain" : float(avg_gain[-1])
+            ,"avg_loss" : float(avg_loss[-1])
+        }
 
-        for i in range(period, len(prices) - 1):
-            gain = gains[i]
-            loss = losses[i]
-            avg_gain = (avg_gain * (period - 1) + gain) / period
-            avg_loss = (avg_loss * (period - 1) + loss) / period
+    def get_current_quote(self, code):
+        """현재가와 전일 종가 조회 - 실시간 시세가 있으면 메모리에서, 없으면 opt10001"""
+        quote = self.quote_book.get(code)
+        if quote and quote["price"]:
+            return {"price": quote["price"], "prev_close": quote["prev_close"]}
 
-            if avg_loss == 0:
-                rsi = 100
-            else:
-                rs = avg_gain / avg_loss
-                rsi = 100 - (100 / (1 + rs))
+        data = self._request_tr("opt10001_req", {"종목코드": code}, accept_default=True)
+        try:
+            price = abs(int(data.get("현재가", "").replace(",", "")))
+            diff = int(data.get("전일대비", "").replace(",", ""))
+        except ValueError:
+            return None
+
+        return {"price": price, "prev_close": price - diff}
+
+    def analyze_rsi_incremental(self, code, period=14):
+        """전일 저장된 avg_gain/avg_loss 로 오늘 RSI 를 O(1) 갱신
+
+        전일(직전 거래일) 상태가 없거나, 저장된 기준 종가가 실제 전일 종가와 다르면
+        (장중에 저장된 값 등) None 을 반환하고 일봉 전체 계산으로 넘어간다.
+        """
+        today = datetime.today()
+        prev_day = previous_trading_day(today)
+
+        state = db.fetchone("SELECT avg_gain, avg_loss, close FROM rsi_data WHERE code=? AND date=?", (code, prev_day.strftime('%Y-%m-%d')))
+
+        if not state or state[2] is None:
+            return None
+
+        quote = self.get_current_quote(code)
+        if not quote or quote["prev_close"] != state[2]:
+            return None
+
+        rsi, avg_gain, avg_loss = rsi_step(state[0], state[1], quote["prev_close"], quote["price"], period)
+        self.insert_rsi(code, today.strftime('%Y-%m-%d'), float(rsi), float(avg_gain), float(avg_loss), quote["price"])
 
         return {
-            "rsi" : round(rsi, 2)
-            ,"avg_gain" : round(avg_gain, 2)
-            ,"avg_loss" : round(avg_loss, 2)
+            "rsi" : round(float(rsi), 2)
+            ,"avg_gain" : round(float(avg_gain), 2)
+            ,"avg_loss" : round(float(avg_loss), 2)
         }
 
     def analyze_rsi(self, rsiCode):
         logger.info(f"analyze_rsi > rsiCode : {rsiCode}")
-        
-        prices = self.get_close_prices(rsiCode, 0)
 
-        #1. 가격만 추출 (종가 리스트 만들기)
-        close_values = [item['현재가'] for item in prices]
+        #1. 전일 RSI 상태가 있으면 현재가만으로 증분 계산 (일봉 600개 재조회 불필요)
+        rsi_dict = self.analyze_rsi_incremental(rsiCode)
+        if rsi_dict:
+            logger.info(f"RSI 정보(증분): {rsi_dict}")
+            return rsi_dict
 
-        #2. 가격 순서 뒤집기 (과거 → 최근 순으로)
-        #   get_close_prices()는 최신 데이터부터 먼저 오기 때문에, RSI 계산을 위해서는 과거 → 최신 순서로 뒤집어야 함.
-        close_values = close_values[::-1]
+        #2. 종가 배열 (이미 과거 → 최신 순)
+        bars = self.get_close_prices(rsiCode, 0)
 
-        #3. RSI 계산 함수 만들기
-        rsi_dict = self.calculate_rsi(close_values, period=14)
+        #3. RSI 계산
+        rsi_dict = self.calculate_rsi(bars.close, period=14)
         logger.info(f"RSI 정보: {rsi_dict}")
 
         if rsi_dict:
@@ -445,10 +647,11 @@ class Trading:
             self.save_single_rsi_to_csv(rsiCode, today_rsi_data)
             """
 
-            today = datetime.today().strftime('%Y-%m-%d')
-            self.insert_rsi(rsiCode, today, str(rsi_dict['rsi']), str(rsi_dict['avg_gain']), str(rsi_dict['avg_loss']))
+            # 마지막 일봉 일자 기준으로 저장 (다음 영업일 증분 계산의 기준 상태)
+            last_date = datetime.strptime(bars.last_date, '%Y%m%d').strftime('%Y-%m-%d')
+            self.insert_rsi(rsiCode, last_date, rsi_dict['rsi'], rsi_dict['avg_gain'], rsi_dict['avg_loss'], int(bars.close[-1]))
 
-            return rsi_dict
+            return {key: round(value, 2) for key, value in rsi_dict.items()}
         else:
             logger.warning("RSI 계산에 필요한 데이터가 부족합니다.")
             return None
@@ -516,19 +719,16 @@ class Trading:
             writer = csv.writer(f)
             writer.writerows(new_rows)
 
-    def insert_rsi(self, code, date, rsi, avg_gain, avg_loss):
-        conn = sqlite3.connect("stock_indicators.db")
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO rsi_data (code, date, rsi, avg_gain, avg_loss)
-            VALUES (?, ?, ?, ?, ?)
+    def insert_rsi(self, code, date, rsi, avg_gain, avg_loss, close=None):
+        db.execute('''
+            INSERT INTO rsi_data (code, date, rsi, avg_gain, avg_loss, close)
+            VALUES (?, ?, ?, ?, ?, ?)
             ON CONFLICT(code, date) DO UPDATE SET
                 rsi = excluded.rsi,
                 avg_gain = excluded.avg_gain,
-                avg_loss = excluded.avg_loss
-        ''', (code, date, rsi, avg_gain, avg_loss))
-        conn.commit()
-        conn.close()
+                avg_loss = excluded.avg_loss,
+                close = excluded.close
+        ''', (code, date, rsi, avg_gain, avg_loss, close))
 
     def get_moving_average(self, code, history_date, history_code, history_price, history_qty, history_flag):
 
@@ -539,23 +739,16 @@ class Trading:
         logger.info(f"get_moving_average > history_qty : {history_qty}")
         logger.info(f"get_moving_average > history_flag : {history_flag}")
 
-        self.tr_data.pop("opt10081", None)
-        self.api.ocx.SetInputValue("종목코드", str(code))
-        self.api.ocx.SetInputValue("수정주가구분", "1")
-        self.api.ocx.CommRqData("opt10081_req", "opt10081", 0, "5001")
-        self.tr_event_loop.exec_()
-
-        data = self.tr_data.get("opt10081", [])
-        if not data or len(data) < 5:
+        bars = self.get_daily_bars(str(code))
+        if len(bars) < 5:
             return {"error": "데이터 부족"}
 
-        df = pd.DataFrame(data)
-
-        # 데이터 가공
-        df['현재가'] = df['현재가'].astype(int)
-        df['일자'] = pd.to_datetime(df['일자'])
-        df.sort_values('일자', inplace=True)
-        df.set_index('일자', inplace=True)
+        # 차트용 DataFrame (bars 는 이미 과거 → 최신 순)
+        df = pd.DataFrame(
+            {'현재가': bars.close},
+            index=pd.to_datetime(bars.date.astype(str), format='%Y%m%d'),
+        )
+        df.index.name = '일자'
 
         # 이동평균 계산
         df['MA5'] = df['현재가'].rolling(window=5).mean()
@@ -628,280 +821,148 @@ class Trading:
 
         return {"status": "success"}
 
-    def detect_golden_cross(self, code):
-        from datetime import datetime
-        import pandas as pd
-
-        logger.info(f"detect_golden_cross > code : {code}")
-
-        end_date = datetime.today().strftime('%Y%m%d')
-
-        # TR 데이터 초기화
-        self.tr_data.pop("opt10081", None)
-
-        # 요청 세팅
-        self.api.ocx.SetInputValue("종목코드", code)
-        self.api.ocx.SetInputValue("기준일자", end_date)
-        self.api.ocx.SetInputValue("수정주가구분", "1")
-        self.api.ocx.CommRqData("opt10081_req", "opt10081", 0, "5001")
-
-        # 이벤트 루프 대기
-        self.tr_event_loop.exec_()
-
-        # 결과 가져오기
-        data = self.tr_data.get("opt10081", [])
-        if not data or len(data) < 120:
-            return {'code': code, 'golden_cross': 'N', 'reason': 'not enough data'}
-
-        df = pd.DataFrame(data)
-        df = df[['일자', '현재가']].copy()
-        df['현재가'] = df['현재가'].astype(int)
-        df.sort_values(by='일자', inplace=True)
-
-        # 이동 평균선 계산
-        df['MA5'] = df['현재가'].rolling(window=5).mean()
-        df['MA20'] = df['현재가'].rolling(window=20).mean()
-        df['MA60'] = df['현재가'].rolling(window=60).mean()
-        df['MA120'] = df['현재가'].rolling(window=120).mean()
-
-        df = df.dropna().reset_index(drop=True)
-        if len(df) < 5:
-            return {'code': code, 'golden_cross': 'N', 'reason': 'not enough data'}
-
-        # 최근 5영업일 기준 분석
-        recent = df.iloc[-5:].copy()
-        logger.info(f"[trading.py] recent: {recent}")
-
-        ma5s = recent['MA5'].tolist()
-        logger.info(f"[trading.py] ma5s: {ma5s}")
-
-        last_ma5 = recent['MA5'].iloc[-1]
-        last_ma20 = recent['MA20'].iloc[-1]
-        last_ma60 = recent['MA60'].iloc[-1]
-        last_ma120 = recent['MA120'].iloc[-1]
-
-        logger.info(f"[trading.py] last_ma5: {last_ma5}, last_ma20: {last_ma20}, last_ma60: {last_ma60}, last_ma120: {last_ma120}")
-
-        long_ma_candidates = [last_ma20, last_ma60, last_ma120]
-        diffs = [abs(last_ma5 - x) for x in long_ma_candidates]
-        min_idx = diffs.index(min(diffs))
-
-        closest_ma_nm = ''
-        closest_ma_nm2 = ''
-        if min_idx == 0:
-            closest_ma_nm = 'MA20'
-            closest_ma_nm2 = '<b style="color:#DAA520;">20일선</b>'
-        elif min_idx == 1:
-            closest_ma_nm = 'MA60'
-            closest_ma_nm2 = '<b style="color:green;">60일선</b>'
-        elif min_idx == 2:
-            closest_ma_nm = 'MA120'
-            closest_ma_nm2 = '<b style="color:red;">120일선</b>'
-
-        closest_ma = long_ma_candidates[min_idx]
-
-        # 조건 체크
-        # 가장 가까운 장기이평선 밑으로(또는 상위) 3% 이내에 접근한 상태.
-        cond1 = (abs(last_ma5 - closest_ma) / closest_ma <= 0.03)
-        # 4영업일(또는 3영업일) 전 5일선이 최근 5일간 5일선 가격 중 가장 낮아야 함.
-        cond2 = recent['MA5'].iloc[0] == min(ma5s) or recent['MA5'].iloc[1] == min(ma5s)
-        # 2영업일 전 5일선이 가장 최근 5일선 가격 보다 낮아야 함.
-        cond3 = recent['MA5'].iloc[3] < recent['MA5'].iloc[4]
-        # 가장 최근 5일선 가격이 가장 높아야 함.
-        cond4 = recent['MA5'].iloc[4] == max(ma5s)
-        # 가장 최근 5일선이 가장 가까운 장기이평선 미돌파 시 5영업일 전 5일선은 5영업일 전 가장 가까운 이평선 아래여야 함.      가장 최근 5일선이 가장 가까운 장기이평선 돌파 시 5영업일 전 5일선은 5영업일 전 가장 가까운 이평선과 같거나 아래여야 함.
-        cond5 = ( (last_ma5 - closest_ma) <= 0 and recent['MA5'].iloc[0] < recent[closest_ma_nm].iloc[0] ) or ( (last_ma5 - closest_ma) > 0 and (recent['MA5'].iloc[0] <= recent[closest_ma_nm].iloc[0]) )
-
-        all_conditions = all([cond1, cond2, cond3, cond4, cond5])   # 골든크로스(기대) 상태 1
-        conditions = all([cond1, cond3, cond4, cond5])   # 골든크로스(기대) 상태 2
-
-        comment = ''
-        comment2 = ''
-        if (last_ma5 - closest_ma) > 0 and ((last_ma5 - closest_ma) / closest_ma <= 0.01) and all_conditions:
-            comment = '골든크로스 돌파! <b style="color:blue;">5일선</b>이 '+closest_ma_nm2+' 위로 추가 1% 상승전! (강력)매수 고려.'
-        elif (last_ma5 - closest_ma) > 0 and ((last_ma5 - closest_ma) / closest_ma <= 0.02) and all_conditions:
-            comment = '골든크로스 돌파! <b style="color:blue;">5일선</b>이 '+closest_ma_nm2+' 위로 추가 2% 상승전! (강력)후발 매수 고려.'
-        elif (last_ma5 - closest_ma) > 0 and ((last_ma5 - closest_ma) / closest_ma <= 0.03) and all_conditions:
-            comment = '골든크로스 돌파! <b style="color:blue;">5일선</b>이 '+closest_ma_nm2+' 위로 추가 3% 상승전! 차익 실현 조심하며 (눌림목)후발 매수 고려.'
-        elif (last_ma5 - closest_ma) == 0 and conditions:
-            comment = '골든크로스 발생! (<b style="color:blue;">5일선</b>이 '+closest_ma_nm2+' 위로 골든크로스 돌파 확인하며 분할)매수.'
-        elif (last_ma5 - closest_ma) < 0 and (abs(last_ma5 - closest_ma) / closest_ma <= 0.01) and conditions:
-            comment = '골든크로스 발생 전 (<b style="color:blue;">5일선</b>이 '+closest_ma_nm2+' 향하여 1% 이내 근접). 매수 준비 고려.'
-        elif (last_ma5 - closest_ma) < 0 and (abs(last_ma5 - closest_ma) / closest_ma <= 0.02) and conditions:
-            comment = '골든크로스 발생 전 (<b style="color:blue;">5일선</b>이 '+closest_ma_nm2+' 향하여 2% 이내 근접). 골든크로스 시도 지켜볼 것.'
-        elif (last_ma5 - closest_ma) < 0 and (abs(last_ma5 - closest_ma) / closest_ma <= 0.03) and conditions:
-            comment = '골든크로스 발생 전 (<b style="color:blue;">5일선</b>이 '+closest_ma_nm2+' 향하여 3% 이내 근접). 골든크로스 시도 지켜볼 것.'
-        elif (last_ma5 - closest_ma) > 0:
-            comment = f'<b style="color:blue;">5일선</b>이 '+closest_ma_nm2+f' 위로 {round( ((last_ma5 - closest_ma) / closest_ma) * 100, 1)}% 상위'
-        elif (last_ma5 - closest_ma) < 0:
-            comment = f'<b style="color:blue;">5일선</b>이 '+closest_ma_nm2+f' 아래로 {round( (abs(last_ma5 - closest_ma) / closest_ma) * 100, 1)}% 하위'
-
-        if (last_ma5 - closest_ma) >= 0:
-            comment2 = '발생'
-        else:
-            comment2 = '대비'
-
-        name = self.api.ocx.dynamicCall("GetMasterCodeName(QString)", [code])    
-
-        self.tr_data.pop("opt10001", None)
-        self.api.ocx.SetInputValue("종목코드", code)
-        self.api.ocx.CommRqData("opt10001_req", "opt10001", 0, "0103")
-
-        self.tr_event_loop.exec_()
-
-        data = self.tr_data.get("opt10001", {})
-
-        logger.info(f"opt10001 > data : {data}")
-
-        price = data.get("현재가", 0)
-        price = int(price.replace(",", "")) if price else 0
-
-        return {'code': code, 'name':name, 'price':price, 'golden_cross': 'Y' if all_conditions else 'N', 'comment':comment, 'comment2':comment2}
-
-    def detect_dead_cross(self, code):
-        from datetime import datetime
-        import pandas as pd
-
-        logger.info(f"detect_dead_cross > code : {code}")
-
-        end_date = datetime.today().strftime('%Y%m%d')
-
-        # TR 데이터 초기화
-        self.tr_data.pop("opt10081", None)
-
-        # 요청 세팅
-        self.api.ocx.SetInputValue("종목코드", code)
-        self.api.ocx.SetInputValue("기준일자", end_date)
-        self.api.ocx.SetInputValue("수정주가구분", "1")
-        self.api.ocx.CommRqData("opt10081_req", "opt10081", 0, "5001")
-
-        # 이벤트 루프 대기
-        self.tr_event_loop.exec_()
-
-        # 결과 가져오기
-        data = self.tr_data.get("opt10081", [])
-        if not data or len(data) < 120:
-            return {'code': code, 'golden_cross': 'N', 'reason': 'not enough data'}
-
-        df = pd.DataFrame(data)
-        df = df[['일자', '현재가']].copy()
-        df['현재가'] = df['현재가'].astype(int)
-        df.sort_values(by='일자', inplace=True)
-
-        # 이동 평균선 계산
-        df['MA5'] = df['현재가'].rolling(window=5).mean()
-        df['MA20'] = df['현재가'].rolling(window=20).mean()
-        df['MA60'] = df['현재가'].rolling(window=60).mean()
-        df['MA120'] = df['현재가'].rolling(window=120).mean()
-
-        df = df.dropna().reset_index(drop=True)
-        if len(df) < 5:
-            return {'code': code, 'dead_cross': 'N', 'reason': 'not enough data'}
-
-        # 최근 5영업일 기준 분석
-        recent = df.iloc[-5:].copy()
-        logger.info(f"[trading.py] recent: {recent}")
-
-        ma5s = recent['MA5'].tolist()
-        logger.info(f"[trading.py] ma5s: {ma5s}")
-
-        last_ma5 = recent['MA5'].iloc[-1]
-        last_ma20 = recent['MA20'].iloc[-1]
-        last_ma60 = recent['MA60'].iloc[-1]
-        last_ma120 = recent['MA120'].iloc[-1]
-
-        logger.info(f"[trading.py] last_ma5: {last_ma5}, last_ma20: {last_ma20}, last_ma60: {last_ma60}, last_ma120: {last_ma120}")
-
-        long_ma_candidates = [last_ma20, last_ma60, last_ma120]
-        diffs = [abs(last_ma5 - x) for x in long_ma_candidates]
-        min_idx = diffs.index(min(diffs))
-
-        closest_ma_nm = ''
-        closest_ma_nm2 = ''
-        if min_idx == 0:
-            closest_ma_nm = 'MA20'
-            closest_ma_nm2 = '<b style="color:#DAA520;">20일선</b>'
-        elif min_idx == 1:
-            closest_ma_nm = 'MA60'
-            closest_ma_nm2 = '<b style="color:green;">60일선</b>'
-        elif min_idx == 2:
-            closest_ma_nm = 'MA120'
-            closest_ma_nm2 = '<b style="color:red;">120일선</b>'
-
-        closest_ma = long_ma_candidates[min_idx]
-
-        # 조건 체크
-        # 가장 가까운 장기이평선 밑으로(또는 상위) 3% 이내에 접근한 상태.
-        cond1 = (abs(last_ma5 - closest_ma) / closest_ma <= 0.03)
-        # 4영업일(또는 3영업일) 전 5일선이 최근 5일간 5일선 가격 중 가장 높아야 함.
-        cond2 = recent['MA5'].iloc[0] == max(ma5s) or recent['MA5'].iloc[1] == max(ma5s)
-        # 1영업일 전 5일선이 가장 최근 5일선 가격 보다 높아야 함.
-        cond3 = recent['MA5'].iloc[3] > recent['MA5'].iloc[4]
-        # 가장 최근 5일선 가격이 가장 낮아야 함.
-        cond4 = recent['MA5'].iloc[4] == min(ma5s)
-        # 가장 최근 5일선이 가장 가까운 장기이평선 미(하향)돌파 시 5영업일 전 5일선은 5영업일 전 가장 가까운 이평선 상위여야 함.      가장 최근 5일선이 가장 가까운 장기이평선 (하향)돌파 시 5영업일 전 5일선은 5영업일 전 가장 가까운 이평선과 같거나 상위여야 함.
-        cond5 = ( (last_ma5 - closest_ma) >= 0 and recent['MA5'].iloc[0] > recent[closest_ma_nm].iloc[0] ) or ( (last_ma5 - closest_ma) < 0 and (recent['MA5'].iloc[0] >= recent[closest_ma_nm].iloc[0]) )
-
-        all_conditions = all([cond1, cond2, cond3, cond4, cond5])   # 데드크로스(기대) 상태 1
-        conditions = all([cond1, cond3, cond4, cond5])   # 데드크로스(기대) 상태 2
-
-        comment = ''
-        comment2 = ''
-        if (last_ma5 - closest_ma) < 0 and (abs(last_ma5 - closest_ma) / closest_ma <= 0.01) and all_conditions:
-            comment = '데드크로스 하향 돌파! <b style="color:blue;">5일선</b>이 '+closest_ma_nm2+' 아래로 추가 1% 하락전! (이평선 반등 확인하며 하방 뚫릴 시)매도 고려.'
-        elif (last_ma5 - closest_ma) < 0 and (abs(last_ma5 - closest_ma) / closest_ma <= 0.02) and all_conditions:
-            comment = '데드크로스 하향 돌파! <b style="color:blue;">5일선</b>이 '+closest_ma_nm2+' 아래로 추가 2% 하락전! (강력)매도 고려.'
-        elif (last_ma5 - closest_ma) < 0 and (abs(last_ma5 - closest_ma) / closest_ma <= 0.03) and all_conditions:
-            comment = '데드크로스 하향 돌파! <b style="color:blue;">5일선</b>이 '+closest_ma_nm2+' 아래로 추가 3% 하락전! (강력)매도 고려.'
-        elif (last_ma5 - closest_ma) == 0 and conditions:
-            comment = '데드크로스 발생! (<b style="color:blue;">5일선</b>이 '+closest_ma_nm2+' 아래로 하방 돌파 확인하며 분할)매도 고려. (또는 이평선 지켜주며 반등 시 분할 매수)'
-        elif (last_ma5 - closest_ma) > 0 and ((last_ma5 - closest_ma) / closest_ma <= 0.01) and conditions:
-            comment = '데드크로스 발생 전 (<b style="color:blue;">5일선</b>이 하방으로 '+closest_ma_nm2+' 향하여 1% 이내 근접). 매도 준비 고려.'
-        elif (last_ma5 - closest_ma) > 0 and ((last_ma5 - closest_ma) / closest_ma <= 0.02) and conditions:
-            comment = '데드크로스 발생 전 (<b style="color:blue;">5일선</b>이 하방으로 '+closest_ma_nm2+' 향하여 2% 이내 근접). (이평선 지켜주는지 주의하며)매도 준비 고려.'
-        elif (last_ma5 - closest_ma) > 0 and (abs(last_ma5 - closest_ma) / closest_ma <= 0.03) and conditions:
-            comment = '데드크로스 발생 전 (<b style="color:blue;">5일선</b>이 하방으로 '+closest_ma_nm2+' 향하여 3% 이내 근접). (이평선 지켜주는지 주의하며)매도 준비 고려.'
-        elif (last_ma5 - closest_ma) > 0:
-            comment = f'<b style="color:blue;">5일선</b>이 '+closest_ma_nm2+f' 위로 {round( ((last_ma5 - closest_ma) / closest_ma) * 100, 1)}% 상위'
-        elif (last_ma5 - closest_ma) < 0:
-            comment = f'<b style="color:blue;">5일선</b>이 '+closest_ma_nm2+f' 아래로 {round( (abs(last_ma5 - closest_ma) / closest_ma) * 100, 1)}% 하위'
-
-        if (last_ma5 - closest_ma) <= 0:
-            comment2 = '발생'
-        else:
-            comment2 = '주의'
-
-        name = self.api.ocx.dynamicCall("GetMasterCodeName(QString)", [code])    
-
-        self.tr_data.pop("opt10001", None)
-        self.api.ocx.SetInputValue("종목코드", code)
-        self.api.ocx.CommRqData("opt10001_req", "opt10001", 0, "0104")
-
-        self.tr_event_loop.exec_()
-
-        data = self.tr_data.get("opt10001", {})
-
-        logger.info(f"opt10001 > data : {data}")
-
-        price = data.get("현재가", 0)
-        price = int(price.replace(",", "")) if price else 0
+    # cross_signals 의 closest 인덱스 → 화면 표시용 이평선 이름
+    CLOSEST_MA_LABELS = (
+        '<b style="color:#DAA520;">20일선</b>',
+        '<b style="color:green;">60일선</b>',
+        '<b style="color:red;">120일선</b>',
+    )
+
+    def _golden_cross_comment(self, gap, closest_ma, all_conditions, conditions, label):
+        ratio = abs(gap) / closest_ma
+        if gap > 0 and ratio <= 0.01 and all_conditions:
+            return '골든크로스 돌파! <b style="color:blue;">5일선</b>이 '+label+' 위로 추가 1% 상승전! (강력)매수 고려.'
+        if gap > 0 and ratio <= 0.02 and all_conditions:
+            return '골든크로스 돌파! <b style="color:blue;">5일선</b>이 '+label+' 위로 추가 2% 상승전! (강력)후발 매수 고려.'
+        if gap > 0 and ratio <= 0.03 and all_conditions:
+            return '골든크로스 돌파! <b style="color:blue;">5일선</b>이 '+label+' 위로 추가 3% 상승전! 차익 실현 조심하며 (눌림목)후발 매수 고려.'
+        if gap == 0 and conditions:
+            return '골든크로스 발생! (<b style="color:blue;">5일선</b>이 '+label+' 위로 골든크로스 돌파 확인하며 분할)매수.'
+        if gap < 0 and ratio <= 0.01 and conditions:
+            return '골든크로스 발생 전 (<b style="color:blue;">5일선</b>이 '+label+' 향하여 1% 이내 근접). 매수 준비 고려.'
+        if gap < 0 and ratio <= 0.02 and conditions:
+            return '골든크로스 발생 전 (<b style="color:blue;">5일선</b>이 '+label+' 향하여 2% 이내 근접). 골든크로스 시도 지켜볼 것.'
+        if gap < 0 and ratio <= 0.03 and conditions:
+            return '골든크로스 발생 전 (<b style="color:blue;">5일선</b>이 '+label+' 향하여 3% 이내 근접). 골든크로스 시도 지켜볼 것.'
+        return self._ma_position_comment(gap, ratio, label)
+
+    def _dead_cross_comment(self, gap, closest_ma, all_conditions, conditions, label):
+        ratio = abs(gap) / closest_ma
+        if gap < 0 and ratio <= 0.01 and all_conditions:
+            return '데드크로스 하향 돌파! <b style="color:blue;">5일선</b>이 '+label+' 아래로 추가 1% 하락전! (이평선 반등 확인하며 하방 뚫릴 시)매도 고려.'
+        if gap < 0 and ratio <= 0.02 and all_conditions:
+            return '데드크로스 하향 돌파! <b style="color:blue;">5일선</b>이 '+label+' 아래로 추가 2% 하락전! (강력)매도 고려.'
+        if gap < 0 and ratio <= 0.03 and all_conditions:
+            return '데드크로스 하향 돌파! <b style="color:blue;">5일선</b>이 '+label+' 아래로 추가 3% 하락전! (강력)매도 고려.'
+        if gap == 0 and conditions:
+            return '데드크로스 발생! (<b style="color:blue;">5일선</b>이 '+label+' 아래로 하방 돌파 확인하며 분할)매도 고려. (또는 이평선 지켜주며 반등 시 분할 매수)'
+        if gap > 0 and ratio <= 0.01 and conditions:
+            return '데드크로스 발생 전 (<b style="color:blue;">5일선</b>이 하방으로 '+label+' 향하여 1% 이내 근접). 매도 준비 고려.'
+        if gap > 0 and ratio <= 0.02 and conditions:
+            return '데드크로스 발생 전 (<b style="color:blue;">5일선</b>이 하방으로 '+label+' 향하여 2% 이내 근접). (이평선 지켜주는지 주의하며)매도 준비 고려.'
+        if gap > 0 and ratio <= 0.03 and conditions:
+            return '데드크로스 발생 전 (<b style="color:blue;">5일선</b>이 하방으로 '+label+' 향하여 3% 이내 근접). (이평선 지켜주는지 주의하며)매도 준비 고려.'
+        return self._ma_position_comment(gap, ratio, label)
+
+    def _ma_position_comment(self, gap, ratio, label):
+        if gap > 0:
+            return f'<b style="color:blue;">5일선</b>이 '+label+f' 위로 {round(ratio * 100, 1)}% 상위'
+        if gap < 0:
+            return f'<b style="color:blue;">5일선</b>이 '+label+f' 아래로 {round(ratio * 100, 1)}% 하위'
+        return ''
+
+    def detect_crosses(self, code, price=None):
+        """골든크로스(예상) / 데드크로스(예상) 동시 판정
+
+        일봉 조회와 현재가 조회를 한 번씩만 하고, crossover.cross_signals 로 두 방향 조건을 함께 계산한다.
+        반환: {"golden_cross": detect_golden_cross 결과, "dead_cross": detect_dead_cross 결과}
+        """
+        logger.info(f"detect_crosses > code : {code}")
+
+        # 현재가를 이미 알고 있으면 (배치 조회, 실시간 시세) opt10001 생략.
+        # 모르면 opt10001 을 먼저 보내 두고 일봉 조회와 응답 대기를 겹침
+        if price is None:
+            price = self.quote_book.price(code)
+        quote = self.tr_client.send("opt10001_req", {"종목코드": code}) if price is None else None
+
+        # 일봉 조회 (캐시 공유) - MA120 + 최근 5영업일 분석에 필요한 깊이까지 연속조회
+        bars = self.get_daily_bars(code, count=125)
+        if quote is not None:
+            self.tr_client.wait([quote])
+            data = quote.result().data
+            logger.info(f"opt10001 > data : {data}")
+            price = data.get("현재가", "")
+            price = abs(int(price.replace(",", ""))) if price else 0
+
+        if len(bars) < 124:
+            return {
+                "golden_cross": {'code': code, 'golden_cross': 'N', 'reason': 'not enough data'},
+                "dead_cross": {'code': code, 'dead_cross': 'N', 'reason': 'not enough data'},
+            }
+
+        signals = cross_signals(bars.close)
+        last_ma5 = float(signals["ma5"][-1])
+        closest_ma = float(signals["closest_ma"][-1])
+        label = self.CLOSEST_MA_LABELS[int(signals["closest"][-1])]
+        gap = last_ma5 - closest_ma
+        logger.info(f"[trading.py] last_ma5: {last_ma5}, closest_ma: {closest_ma} ({LONG_MA_NAMES[int(signals['closest'][-1])]})")
+
+        name = self.stock_master.name_of(code) or self.api.ocx.dynamicCall("GetMasterCodeName(QString)", [code])
+
+        golden, golden_near = bool(signals["golden"][-1]), bool(signals["golden_near"][-1])
+        dead, dead_near = bool(signals["dead"][-1]), bool(signals["dead_near"][-1])
+        return {
+            "golden_cross": {
+                'code': code, 'name': name, 'price': price,
+                'golden_cross': 'Y' if golden else 'N',
+                'comment': self._golden_cross_comment(gap, closest_ma, golden, golden_near, label),
+                'comment2': '발생' if gap >= 0 else '대비',
+            },
+            "dead_cross": {
+                'code': code, 'name': name, 'price': price,
+                'dead_cross': 'Y' if dead else 'N',
+                'comment': self._dead_cross_comment(gap, closest_ma, dead, dead_near, label),
+                'comment2': '발생' if gap <= 0 else '주의',
+            },
+        }
 
-        return {'code': code, 'name':name, 'price':price, 'dead_cross': 'Y' if all_conditions else 'N', 'comment':comment, 'comment2':comment2}
+    def detect_golden_cross(self, code, price=None):
+        return self.detect_crosses(code, price)["golden_cross"]
+
+    def detect_dead_cross(self, code, price=None):
+        return self.detect_crosses(code, price)["dead_cross"]
+
+    def refresh_stock_master(self):
+        """로그인 후 세션당 1회: 코스피/코스닥 종목 마스터를 받아 검색 색인과 DB 갱신"""
+        rows = []
+        for market, market_name in (("0", "KOSPI"), ("10", "KOSDAQ")):
+            codes = self.api.ocx.dynamicCall("GetCodeListByMarket(QString)", [market]).split(';')
+            for code in codes:
+                if code == '':
+                    continue
+                name = self.api.ocx.dynamicCall("GetMasterCodeName(QString)", [code])
+                rows.append((code, name, market_name))
+
+        if rows:
+            self.stock_master.replace(rows)
+        logger.info(f"[종목 마스터] {len(rows)}개 종목 색인")
+        return len(rows)
+
+    def subscribe_real_quotes(self, codes=None):
+        """실시간 시세 등록. codes 가 없으면 보유 종목 + 바스켓 종목"""
+        if codes is None:
+            holdings = self.get_holdings()
+            codes = [] if isinstance(holdings, dict) else [h["code"].replace("A", "") for h in holdings]
+            # basket_data 는 code/name 컬럼이 서로 바뀌어 저장되어 있음 (name 컬럼이 종목코드)
+            codes += [row[0] for row in db.fetchall("SELECT name FROM basket_data")]
+
+        added = self.real_feed.subscribe(codes)
+        logger.info(f"[실시간 시세] {added}개 종목 신규 등록")
+        return {"added": added, **self.real_feed.stats()}
 
     def search_stock_by_name(self, keyword):
-        kospi_codes = self.api.ocx.dynamicCall("GetCodeListByMarket(QString)", ["0"]).split(';')
-        kosdaq_codes = self.api.ocx.dynamicCall("GetCodeListByMarket(QString)", ["10"]).split(';')
-        all_codes = kospi_codes + kosdaq_codes
-
-        result = []
-        for code in all_codes:
-            if code == '':
-                continue
-            name = self.api.ocx.dynamicCall("GetMasterCodeName(QString)", [code])
-            if keyword in name:
-                result.append({"name": name, "code": code})
-
-        return result[:20]
+        """종목명/초성/종목코드 검색 (메모리 색인, COM 호출 없음)"""
+        return self.stock_master.search(keyword)
 
     def ask_gpt_for_invest_weather(self):
         client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
@@ -968,9 +1029,7 @@ class Trading:
             return {"error": str(e)}
 
     def insert_macd(self, code, date, macd, signal, histogram):
-        conn = sqlite3.connect("stock_indicators.db")
-        cursor = conn.cursor()
-        cursor.execute('''
+        db.execute('''
             INSERT INTO macd_data (code, date, macd, signal, histogram)
             VALUES (?, ?, ?, ?, ?)
             ON CONFLICT(code, date) DO UPDATE SET
@@ -978,114 +1037,54 @@ class Trading:
                 signal = excluded.signal,
                 histogram = excluded.histogram
         ''', (code, date, macd, signal, histogram))
-        conn.commit()
-        conn.close()
 
     def calculate_macd(self, prices, code, short_period=12, long_period=26, signal_period=9):
-        short_ema = pd.Series(prices).ewm(span=short_period, adjust=False).mean()
-        long_ema = pd.Series(prices).ewm(span=long_period, adjust=False).mean()
-        macd_line = short_ema - long_ema
-        signal_line = macd_line.ewm(span=signal_period, adjust=False).mean()
-        macd_histogram = macd_line - signal_line
-
-        today = datetime.today().strftime('%Y-%m-%d')
-        self.insert_macd(code, today, round(macd_line.iloc[-1], 2), round(signal_line.iloc[-1], 2), round(macd_histogram.iloc[-1], 2))
+        macd_line, signal_line, macd_histogram = macd(prices, short_period, long_period, signal_period)
+        return self._store_macd(code, macd_line[-1], signal_line[-1], macd_histogram[-1])
 
+    @staticmethod
+    def _macd_result(last_macd, last_signal, last_histogram):
         return {
-            "macd": round(macd_line.iloc[-1], 2),
-            "signal": round(signal_line.iloc[-1], 2),
-            "histogram": round(macd_histogram.iloc[-1], 2)
+            "macd": round(float(last_macd), 2),
+            "signal": round(float(last_signal), 2),
+            "histogram": round(float(last_histogram), 2)
         }
 
+    def _store_macd(self, code, last_macd, last_signal, last_histogram):
+        result = self._macd_result(last_macd, last_signal, last_histogram)
+
+        today = datetime.today().strftime('%Y-%m-%d')
+        self.insert_macd(code, today, result["macd"], result["signal"], result["histogram"])
+        return result
+
     def analyze_macd(self, code):
         logger.info(f"analyze_macd > code : {code}")
         
-        prices = self.get_close_prices(code, 0)
-        close_values = [item['현재가'] for item in prices]
-        close_values = close_values[::-1]  # 최신 데이터가 먼저이므로 반전
+        bars = self.get_close_prices(code, 0)
 
-        if len(close_values) < 35:
+        if len(bars) < 35:
             return {"error": "MACD 계산에 필요한 데이터 부족"}
 
-        macd_result = self.calculate_macd(close_values, code)
+        macd_result = self.calculate_macd(bars.close, code)
         logger.info(f"MACD 정보: {macd_result}")
         return macd_result
 
-    def get_price_data(self, code, count=30):
-        """
-        키움 API를 통해 일봉 데이터에서 고가, 저가, 현재가(종가)를 가져오는 함수
-        """
-        from datetime import datetime
-        import pandas as pd
-
-        logger.info(f"get_price_data > code : {code}")
-
-        end_date = datetime.today().strftime('%Y%m%d')
-
-        # 기존 데이터 초기화
-        self.tr_data.pop("opt10081", None)
-
-        # 요청 세팅
-        self.api.ocx.SetInputValue("종목코드", code)
-        self.api.ocx.SetInputValue("기준일자", end_date)
-        self.api.ocx.SetInputValue("수정주가구분", "1")
-        self.api.ocx.CommRqData("opt10081_req", "opt10081", 0, "5002")
-
-        # 이벤트 루프 대기
-        self.tr_event_loop.exec_()
-
-        data = self.tr_data.get("opt10081", [])
-        if not data or len(data) < 5:
-            return []
-
-        df = pd.DataFrame(data)
-        df = df[['현재가', '고가', '저가']].copy()
-        df = df.astype(int)
-        df = df[::-1].reset_index(drop=True)  # 과거 → 최신 순으로 정렬
-
-        result = df.to_dict(orient='records')  # 리스트[dict] 형식으로 변환
-
-        if count == 0:
-            return result
-        else:
-            return result[:count]  # 최신 기준 N개만 리턴
-
     def insert_stc(self, code, date, percent_k, percent_d):
-        conn = sqlite3.connect("stock_indicators.db")
-        cursor = conn.cursor()
-        cursor.execute('''
+        db.execute('''
             INSERT INTO stc_data (code, date, percent_k, percent_d)
             VALUES (?, ?, ?, ?)
             ON CONFLICT(code, date) DO UPDATE SET
                 percent_k = excluded.percent_k,
                 percent_d = excluded.percent_d
         ''', (code, date, percent_k, percent_d))
-        conn.commit()
-        conn.close()
 
-    def calculate_slow_stochastic(self, highs, lows, closes, code, n=12, m=5, t=3):
-        import pandas as pd
+    def _slow_stochastic(self, bars, n=12, m=5, t=3):
+        """Slow Stochastic 마지막 %K, %D"""
+        k, d = slow_stochastic(bars.high, bars.low, bars.close, n, m, t)
+        return round(float(k[-1]), 2), round(float(d[-1]), 2)
 
-        df = pd.DataFrame({
-            "High": highs[::-1],
-            "Low": lows[::-1],
-            "Close": closes[::-1]
-        })
-
-        # Raw %K
-        df['lowest_low'] = df['Low'].rolling(window=n).min()
-        df['highest_high'] = df['High'].rolling(window=n).max()
-
-        df['%K_raw'] = (df['Close'] - df['lowest_low']) / (df['highest_high'] - df['lowest_low']) * 100
-
-        # Slow %K (SMA of %K)
-        df['%K'] = df['%K_raw'].rolling(window=m).mean()
-
-        # Slow %D (SMA of Slow %K)
-        df['%D'] = df['%K'].rolling(window=t).mean()
-
-        last_k = round(df['%K'].iloc[-1], 2)
-        last_d = round(df['%D'].iloc[-1], 2)
+    def calculate_slow_stochastic(self, bars, code, n=12, m=5, t=3):
+        last_k, last_d = self._slow_stochastic(bars, n, m, t)
 
         today = datetime.today().strftime('%Y-%m-%d')
         self.insert_stc(code, today, last_k, last_d)
@@ -1099,24 +1098,17 @@ class Trading:
         logger.info(f"analyze_stochastic > code : {code}")
         logger.info(f"analyze_stochastic > name : {name}")
 
-        prices = self.get_price_data(code, 0)  # TR 요청해서 가격 가져옴
+        bars = self.get_daily_bars(code)  # TR 요청해서 가격 가져옴 (캐시 공유)
 
-        if len(prices) < 20:
+        if len(bars) < 20:
             return {"error": "데이터 부족"}
+        if len(bars) < 35:
+            return {"error": "MACD 계산에 필요한 데이터 부족"}
 
-        closes = [p['현재가'] for p in prices]
-        highs = [p['고가'] for p in prices]
-        lows = [p['저가'] for p in prices]
-
-        closes = closes[::-1]
-        highs = highs[::-1]
-        lows = lows[::-1]
-
-        result = self.calculate_slow_stochastic(highs, lows, closes, code)
+        result = self.calculate_slow_stochastic(bars, code)
         logger.info(f"Slow Stochastic: {result}")
 
-        close_values = closes[::-1]  # 최신 데이터가 먼저이므로 반전
-        macd_result = self.calculate_macd(close_values, code)
+        macd_result = self.calculate_macd(bars.close, code)
 
         K = result['K']
         D = result['D']
@@ -1133,48 +1125,25 @@ class Trading:
             ,'macd':macd_result
         }
 
-    def calculate_slow_stochastic2(self, highs, lows, closes, code, n=12, m=5, t=3):
-        import pandas as pd
-
-        df = pd.DataFrame({
-            "High": highs[::-1],
-            "Low": lows[::-1],
-            "Close": closes[::-1]
-        })
-
-        # Raw %K
-        df['lowest_low'] = df['Low'].rolling(window=n).min()
-        df['highest_high'] = df['High'].rolling(window=n).max()
-
-        df['%K_raw'] = (df['Close'] - df['lowest_low']) / (df['highest_high'] - df['lowest_low']) * 100
-
-        # Slow %K (SMA of %K)
-        df['%K'] = df['%K_raw'].rolling(window=m).mean()
-
-        # Slow %D (SMA of Slow %K)
-        df['%D'] = df['%K'].rolling(window=t).mean()
-
-        last_k = round(df['%K'].iloc[-1], 2)
-        last_d = round(df['%D'].iloc[-1], 2)
+    def calculate_slow_stochastic2(self, bars, code, n=12, m=5, t=3):
+        last_k, last_d = self._slow_stochastic(bars, n, m, t)
 
         today = datetime.today().strftime('%Y-%m-%d')
         self.insert_stc(code, today, last_k, last_d)
 
-        #---------------------- db 조회 : (오늘을 포함)2일치 stc_data 테이블의 rows 를 조회 후 통합 조건 적용 ---------------------
-        conn = sqlite3.connect("stock_indicators.db")
-        cursor = conn.cursor()
-
-        # 최근 2일치 데이터 조회
-        cursor.execute("SELECT date, percent_k, percent_d FROM stc_data WHERE code=? ORDER BY date DESC LIMIT 2", (code,))
-        stc_rows = cursor.fetchall()
-
-        cursor.execute("SELECT date, macd, signal FROM macd_data WHERE code=? ORDER BY date DESC LIMIT 2", (code,))
-        macd_rows = cursor.fetchall()
-
-        cursor.execute("SELECT date, rsi FROM rsi_data WHERE code=? ORDER BY date DESC LIMIT 2", (code,))
-        rsi_rows = cursor.fetchall()
+        return {
+            "K": last_k
+            ,"D": last_d
+            ,**self._combined_signal_flags(code)
+        }
 
-        conn.close()
+    def _combined_signal_flags(self, code):
+        """저장된 STC/MACD/RSI 로 통합 조건 플래그(stc_up, macd_up, macd_break, rsi_up) 계산"""
+        #---------------------- db 조회 : (오늘을 포함)2일치 stc_data 테이블의 rows 를 조회 후 통합 조건 적용 ---------------------
+        # 최근 2일치 데이터 조회 (batch 중이면 같은 트랜잭션에서 방금 저장한 값까지 보임)
+        stc_rows = db.fetchall("SELECT date, percent_k, percent_d FROM stc_data WHERE code=? ORDER BY date DESC LIMIT 2", (code,))
+        macd_rows = db.fetchall("SELECT date, macd, signal FROM macd_data WHERE code=? ORDER BY date DESC LIMIT 2", (code,))
+        rsi_rows = db.fetchall("SELECT date, rsi FROM rsi_data WHERE code=? ORDER BY date DESC LIMIT 2", (code,))
 
         # 정렬 (과거 → 최근)
         stc_rows = sorted(stc_rows)
@@ -1206,9 +1175,7 @@ class Trading:
             rsi_up = 'Y'
 
         return {
-            "K": last_k
-            ,"D": last_d
-            ,"stc_up":stc_up
+            "stc_up":stc_up
             ,"macd_up":macd_up
             ,"macd_break":macd_break
             ,"rsi_up":rsi_up
@@ -1218,47 +1185,133 @@ class Trading:
     def analyze_stochastic2(self, code):
         logger.info(f"analyze_stochastic2 > code : {code}")
 
-        prices = self.get_price_data(code, 0)  # TR 요청해서 가격 가져옴
+        bars = self.get_daily_bars(code)  # TR 요청해서 가격 가져옴 (캐시 공유)
 
-        if len(prices) < 20:
+        if len(bars) < 20:
             return {"error": "데이터 부족"}
 
-        closes = [p['현재가'] for p in prices]
-        highs = [p['고가'] for p in prices]
-        lows = [p['저가'] for p in prices]
-
-        closes = closes[::-1]
-        highs = highs[::-1]
-        lows = lows[::-1]
-
-        result = self.calculate_slow_stochastic2(highs, lows, closes, code)
+        result = self.calculate_slow_stochastic2(bars, code)
         logger.info(f"Slow Stochastic: {result}")
         return result
 
+    BATCH_INDICATORS = ("rsi", "macd", "stochastic", "stochastic2", "golden_cross", "dead_cross")
+
+    def analyze_indicators_batch(self, codes, indicators):
+        """여러 종목의 지표를 한 번에 계산
+
+        종목별 일봉은 1회만 조회(캐시 공유)하고, RSI/MACD/Stochastic 은
+        (종목 × 일자) 행렬로 묶어 한 번에 계산한다. 결과는 종목별로 반환.
+        """
+        logger.info(f"analyze_indicators_batch > codes : {codes}, indicators : {indicators}")
+
+        unknown = [name for name in indicators if name not in self.BATCH_INDICATORS]
+        if unknown:
+            return {"error": f"지원하지 않는 지표: {', '.join(unknown)}"}
+
+        bars_list = [self.get_daily_bars(code) for code in codes]
+        close = stack_column(bars_list, "close")
+
+        want_macd = any(name in indicators for name in ("macd", "stochastic", "stochastic2"))
+        want_stc = "stochastic" in indicators or "stochastic2" in indicators
+
+        if "rsi" in indicators:
+            rsi_all, avg_gain_all, avg_loss_all = wilder_rsi(close)
+        if want_macd:
+            macd_all, signal_all, histogram_all = macd(close)
+        if want_stc:
+            k_all, d_all = slow_stochastic(stack_column(bars_list, "high"), stack_column(bars_list, "low"), close)
+
+        # TR 조회(골든/데드크로스 일봉 포함)와 계산을 모두 끝낸 뒤 저장할 값만 모아 두고,
+        # 저장은 한 트랜잭션으로 묶어 스캔당 1회만 커밋 (TR 대기 중에 쓰기 트랜잭션을 열어 두지 않음)
+        results = []
+        rows_to_store = []  # (종목코드, rsi 인자 / None, macd 결과 / None, (K, D) / None)
+        today = datetime.today().strftime('%Y-%m-%d')
+        for row, (code, bars) in enumerate(zip(codes, bars_list)):
+            result = {"code": code}
+            results.append(result)
+            if len(bars) == 0:
+                result["error"] = "데이터 부족"
+                continue
+
+            rsi_row = macd_result = stc_row = None
+            if "rsi" in indicators:
+                if np.isnan(rsi_all[row, -1]):
+                    result["rsi"] = None
+                else:
+                    last_date = datetime.strptime(bars.last_date, '%Y%m%d').strftime('%Y-%m-%d')
+                    rsi_row = (last_date, float(rsi_all[row, -1]), float(avg_gain_all[row, -1]), float(avg_loss_all[row, -1]), int(bars.close[-1]))
+                    result["rsi"] = {
+                        "rsi": round(float(rsi_all[row, -1]), 2),
+                        "avg_gain": round(float(avg_gain_all[row, -1]), 2),
+                        "avg_loss": round(float(avg_loss_all[row, -1]), 2),
+                    }
+
+            if want_macd:
+                # 35일 미만이면 MACD 가 NaN 이므로 저장하지 않고 오류 반환
+                if len(bars) >= 35:
+                    macd_result = self._macd_result(macd_all[row, -1], signal_all[row, -1], histogram_all[row, -1])
+                if "macd" in indicators:
+                    result["macd"] = macd_result or {"error": "MACD 계산에 필요한 데이터 부족"}
+
+            if want_stc:
+                if len(bars) < 20:
+                    stc_result = {"error": "데이터 부족"}
+                else:
+                    stc_row = (round(float(k_all[row, -1]), 2), round(float(d_all[row, -1]), 2))
+                    stc_result = {"K": stc_row[0], "D": stc_row[1]}
+
+                if "stochastic" in indicators:
+                    if "error" in stc_result:
+                        result["stochastic"] = stc_result
+                    elif macd_result is None:
+                        result["stochastic"] = {"error": "MACD 계산에 필요한 데이터 부족"}
+                    else:
+                        result["stochastic"] = {"stc": stc_result, "macd": macd_result}
+                if "stochastic2" in indicators and "error" in stc_result:
+                    result["stochastic2"] = stc_result
+
+            # 현재가는 마지막 일봉 종가를 사용해 opt10001 추가 조회 생략, 두 방향은 한 번에 판정
+            if "golden_cross" in indicators or "dead_cross" in indicators:
+                crosses = self.detect_crosses(code, price=int(bars.close[-1]))
+                for key in ("golden_cross", "dead_cross"):
+                    if key in indicators:
+                        result[key] = crosses[key]
+
+            rows_to_store.append((result, rsi_row, macd_result, stc_row))
+
+        with db.batch():
+            for result, rsi_row, macd_result, stc_row in rows_to_store:
+                code = result["code"]
+                if rsi_row is not None:
+                    self.insert_rsi(code, *rsi_row)
+                if macd_result is not None:
+                    self.insert_macd(code, today, macd_result["macd"], macd_result["signal"], macd_result["histogram"])
+                if stc_row is not None:
+                    self.insert_stc(code, today, *stc_row)
+                    # stochastic2 의 통합 조건은 저장된 RSI/MACD/STC 를 읽으므로 같은 트랜잭션에서 저장 직후 계산 (TR 없음)
+                    if "stochastic2" in indicators:
+                        result["stochastic2"] = {"K": stc_row[0], "D": stc_row[1], **self._combined_signal_flags(code)}
+
+        for result in results:
+            event_hub.publish("scan_result", result)
+
+        return {"results": results, "bar_cache": self.bar_cache.stats()}
+
     def insert_volume(self, code, date, volume):
-        conn = sqlite3.connect("stock_indicators.db")
-        cursor = conn.cursor()
-        cursor.execute('''
+        db.execute('''
             INSERT INTO volume_data (code, date, volume)
             VALUES (?, ?, ?)
             ON CONFLICT(code, date) DO UPDATE SET
                 volume = excluded.volume
         ''', (code, date, volume))
-        conn.commit()
-        conn.close()
 
     def insert_get_today_volume(self, code):
         today = datetime.today().strftime('%Y%m%d')
-        prices = self.get_close_prices(code, 1)
-        if not prices:
+        bars = self.get_close_prices(code, 1)
+        if len(bars) == 0:
             return {"code": code, "error": "no data"}
 
-        row = prices[0]
-        volume = row.get('거래량', 0)
-        try:
-            volume = int(volume)
-        except Exception:
-            volume = 0
+        volume = int(bars.volume[-1])
 
         self.insert_volume(code, today, volume)
         return {"code": code, "volume": volume}
@@ -1269,7 +1322,7 @@ class Trading:
         logger.info(f"qty : {qty}")
 
         try:
-            self.api.ocx.SendOrder(
+            ret = self.api.ocx.SendOrder(
                 "손절매도",
                 "0110",
                 Config.ACCNO,
@@ -1280,36 +1333,106 @@ class Trading:
                 "03",
                 ""
             )
-            return True
+            if ret != 0:
+                logger.error(f"[AUTO_SELL] 주문 실패 {code} 에러코드: {ret}")
+            self.account_cache.invalidate()
+            return ret == 0
         except Exception as e:
-            logger.log_error("AUTO_SELL", str(e))
+            logger.error(f"[AUTO_SELL] {e}")
             return False
 
-    def start_loss_gain_monitoring(self):
-        logger.info("trading.py > start_loss_gain_monitoring")
+    def reconcile_account(self):
+        """opw00018 / opt10075 재조회로 계좌 장부를 채우거나(seed) 체결 이벤트 누락을 바로잡음
 
+        TR 이 하나라도 실패하면 빈 결과로 장부/손절 엔진을 덮어쓰지 않고 그대로 둔다 (다음 재조회 때 다시 시도).
+        """
+        holdings = self.query_holdings()
+        orders = self.query_unfilled_orders() if holdings is not None else {"error": "보유종목 조회 실패"}
+        if holdings is None or "error" in orders:
+            logger.error(f"[계좌 장부] 재조회 실패로 기존 장부 유지: {orders.get('error')}")
+            return {"error": "계좌 재조회 실패"}
+
+        drift = self.account_book.load(holdings, orders["orders"])
+        self.stop_loss.load_positions(holdings)
+        self.real_feed.subscribe([h["code"].replace("A", "") for h in holdings])
+        event_hub.publish("holdings", self.account_book.holdings())
+        event_hub.publish("orders", self.account_book.unfilled_orders())
+        return {"drift": drift, **self.account_book.stats()}
+
+    # 체결잔고 FID - 주문체결(gubun 0): 주문번호, 종목코드, 종목명, 주문수량, 주문가격, 미체결수량, 주문구분, 주문상태, 체결가, 체결량
+    CHEJAN_ORDER_FIDS = (9203, 9001, 302, 900, 901, 902, 905, 913, 910, 911)
+    # 잔고(gubun 1): 종목코드, 종목명, 보유수량, 매입단가, 현재가
+    CHEJAN_BALANCE_FIDS = (9001, 302, 930, 931, 10)
+
+    def _on_receive_chejan_data(self, gubun, item_cnt, fid_list):
+        """주문/체결/잔고 변경을 계좌 장부와 손절/익절 엔진에 반영"""
+        self.account_cache.invalidate()
+        if gubun == "0":
+            fields = {fid: self.api.ocx.GetChejanData(fid) for fid in self.CHEJAN_ORDER_FIDS}
+            self.account_book.on_order_event(fields)
+            if self.account_book.seeded:
+                event_hub.publish("orders", self.account_book.unfilled_orders())
+            if fields[913].strip() == "체결":
+                event_hub.publish("fill", {
+                    "order_no": fields[9203].strip(),
+                    "code": fields[9001].strip().replace("A", ""),
+                    "name": fields[302].strip(),
+                    "order_type": fields[905].strip(),
+                    "price": abs(int(fields[910].strip() or 0)),
+                    "qty": abs(int(fields[911].strip() or 0)),
+                })
+        elif gubun == "1":
+            changed = self.account_book.on_balance_event({fid: self.api.ocx.GetChejanData(fid) for fid in self.CHEJAN_BALANCE_FIDS})
+            if changed:
+                code, purchase_price, quantity, name = changed
+                self.stop_loss.set_position(code, purchase_price, quantity, name)
+                if quantity > 0:
+                    self.real_feed.subscribe([code])
+                if self.account_book.seeded:
+                    event_hub.publish("holdings", self.account_book.holdings())
+
+    def _publish_quote(self, code, tick):
+        """보유 종목 시세만 종목당 초당 1회로 줄여 푸시"""
+        if self.stop_loss.holds(code) and self._quote_throttle.allow(code):
+            event_hub.publish("quote", {"code": code, **tick})
+
+    def refresh_positions(self):
+        """보유 종목(계좌 장부, 없으면 opw00018)으로 손절/익절 엔진의 매입가/수량 캐시 갱신
+
+        조회 실패 시 기존 캐시를 그대로 두고 {"error": ...} 반환.
+        """
         holdings = self.get_holdings()
-        for h in holdings:
-            buy = h.get("purchase_price", 0)
-            cur = h.get("current_price", 0)
-            qty = h.get("quantity", 0)
+        if isinstance(holdings, dict):
+            logger.error(f"[손절/익절] 보유 종목 조회 실패로 기존 매입가 캐시 유지: {holdings['error']}")
+            return holdings
+        self.stop_loss.load_positions(holdings)
+        self.real_feed.subscribe(self.stop_loss.codes())
+        return holdings
 
-            code = h.get("code")
-            code = code.replace("A", "")
+    def start_loss_gain_monitoring(self):
+        """손절/익절 감시 시작 - 이후 실시간 체결마다 서버에서 판단 (브라우저 폴링 불필요)"""
+        logger.info("trading.py > start_loss_gain_monitoring")
 
-            logger.info(f"purchase_price : {buy}")
-            logger.info(f"current_price : {cur}")
-            logger.info(f"quantity : {qty}")
+        holdings = self.refresh_positions()
+        if isinstance(holdings, dict):
+            return holdings
+        self.stop_loss.enabled = True
 
-            if buy <= 0 or qty <= 0:
-                continue
-            rate = (cur - buy) / buy * 100
-            if rate <= -3 or rate >= 5:
-                logger.info(f"[자동매도] {h.get('name')}({h.get('code')}) 손익률 {rate:.2f}% -> 전량 매도")
-                self._sell_at_market(code, qty)
+        # 실시간 시세가 오기 전이라도 조회 시점 현재가로 한 번 판단
+        for h in holdings:
+            self.stop_loss.evaluate(h.get("code", "").replace("A", ""), h.get("current_price", 0))
+
+        return {
+            'message': 'ok',
+            **self.stop_loss.status()
+        }
 
-        return{
-            'message':'ok'
+    def stop_loss_gain_monitoring(self):
+        logger.info("trading.py > stop_loss_gain_monitoring")
+        self.stop_loss.enabled = False
+        return {
+            'message': 'ok',
+            **self.stop_loss.status()
         }
 
     def get_institution_trend(self, code):
@@ -1318,29 +1441,14 @@ class Trading:
         logger.info(f"get_institution_trend > code : {code}, today : {today}")
 
         try:
-            self.tr_data.pop("opt10059", None)
-            self.api.ocx.SetInputValue("일자", today)
-            self.api.ocx.SetInputValue("종목코드", code)
-            self.api.ocx.SetInputValue("금액수량구분", "2")
-            self.api.ocx.SetInputValue("매매구분", "0")
-            self.api.ocx.SetInputValue("단위구분", "1")
-            self.api.ocx.CommRqData("opt10059_req", "opt10059", 0, "4003")
-            self.tr_event_loop.exec_()
-            return self.tr_data.get("opt10059", {"stocks": []})
+            return self._request_tr("opt10059_req", {"일자": today, "종목코드": code}, accept_default=True)
         except Exception as e:
             return {"error": str(e)}
 
     def industry_volume_search(self):
         """업종별 거래량을 조회하여 가장 거래량이 많은 업종을 반환"""
         try:
-            self.tr_data.pop("OPT20001", None)
-            # 시장구분: 0:코스피, 1:코스닥, 2:코스피200
-            self.api.ocx.SetInputValue("시장구분", "1")
-            # 업종코드: 001:종합(KOSPI), 002:대형주, 003:중형주, 004:소형주 101:종합(KOSDAQ), 201:KOSPI200, 302:KOSTAR, 701: KRX100 나머지
-            self.api.ocx.SetInputValue("업종코드", "124")
-            self.api.ocx.CommRqData("sector_volume_req", "OPT20001", 0, "4010")
-            self.tr_event_loop.exec_()
-            sectors = self.tr_data.get("OPT20001", {"sectors": []}).get("sectors", [])
+            sectors = self._request_tr("sector_volume_req", accept_default=True).get("sectors", [])
             if not sectors:
                 return {"sectors": []}
             logger.info(f"sectors : {sectors}")
@@ -1349,244 +1457,4 @@ class Trading:
             return {"error": str(e)}
 
     def _on_receive_tr_data(self, screen_no, rqname, trcode, recordname, prev_next, data_len, error_code, message, splm_msg):
-        try:
-            if rqname == "opw00018_req":
-                total = self.api.ocx.GetCommData(trcode, rqname, 0, "총매입금액")
-                valuation = self.api.ocx.GetCommData(trcode, rqname, 0, "총평가금액")
-
-                try:
-                    total = total.lstrip("0") or "0"
-                    valuation = valuation.lstrip("0") or "0"
-
-                    total = int(total)
-                    valuation = int(valuation)
-
-                    total = f"{total:,}"
-                    valuation = f"{valuation:,}"
-
-                except:
-                    total, valuation, available = 0, 0, 0
-
-                self.tr_data["opw00018"] = {
-                    "total_investment": total,
-                    "total_valuation": valuation
-                }
-
-            elif rqname == "opw00001_req":
-                available = self.api.ocx.GetCommData(trcode, rqname, 0, "주문가능금액")
-                available = available.lstrip("0") or "0"
-                available = int(available)
-                available = f"{available:,}"
-
-                deposit = self.api.ocx.GetCommData(trcode, rqname, 0, "주문가능금액")
-                deposit = deposit.lstrip("0") or "0"
-                deposit = int(deposit)
-                deposit = f"{deposit:,}"
-
-                self.tr_data["opw00001"] = {
-                    "available_cash": available
-                    ,"deposit_cash": deposit
-                }
-
-            elif rqname == "opw00018_holdings_req":
-                holdings = []
-                cnt = self.api.ocx.GetRepeatCnt(trcode, rqname)
-                for i in range(cnt):
-                    code = self.api.ocx.GetCommData(trcode, rqname, i, "종목번호").strip()
-                    name = self.api.ocx.GetCommData(trcode, rqname, i, "종목명").strip()
-                    qty = self.api.ocx.GetCommData(trcode, rqname, i, "보유수량").strip()
-                    prcs = self.api.ocx.GetCommData(trcode, rqname, i, "매입가").strip()
-                    cur = self.api.ocx.GetCommData(trcode, rqname, i, "현재가").strip()
-
-                    try:
-                        qty = int(qty.replace(',', ''))
-                    except ValueError:
-                        qty = 0
-                    try:
-                        prcs = int(prcs.replace(',', ''))
-                    except ValueError:
-                        prcs = 0
-                    try:
-                        cur = int(cur.replace(',', ''))
-                    except ValueError:
-                        cur = 0
-
-                    holdings.append({
-                        "code": code,
-                        "name": name,
-                        "quantity": qty,
-                        "purchase_price": prcs,
-                        "current_price": cur,
-                    })
-
-                self.tr_data["opw00018"] = holdings
-
-            elif rqname == "volume_rank_req":
-                stocks = []
-                count = int(self.api.ocx.GetRepeatCnt(trcode, rqname))
-                for i in range(min(count, 50)):
-                    code = self.api.ocx.GetCommData(trcode, rqname, i, "종목코드").strip()
-                    name = self.api.ocx.GetCommData(trcode, rqname, i, "종목명").strip()
-                    volume = self.api.ocx.GetCommData(trcode, rqname, i, "거래량").strip()
-                    amount = self.api.ocx.GetCommData(trcode, rqname, i, "거래금액").strip()
-                    price = self.api.ocx.GetCommData(trcode, rqname, i, "현재가").strip()
-
-                    try:
-                        volume = int(volume.replace(',', ''))
-                    except (ValueError, AttributeError):
-                        volume = 0
-                    try:
-                        amount = int(amount.replace(',', ''))
-                    except (ValueError, AttributeError):
-                        amount = 0
-                    try:
-                        price = int(price.replace(',', ''))
-                    except (ValueError, AttributeError):
-                        price = 0
-
-                    stocks.append({
-                        "code": code,
-                        "name": name,
-                        "price": price,
-                        "vol": volume,
-                        "amount": amount,
-                    })
-
-                self.tr_data["OPT10030"] = {"stocks": stocks}
-
-            elif rqname == "unfilled_orders_req":
-                orders = []
-                count = int(self.api.ocx.GetRepeatCnt(trcode, rqname))
-                for i in range(count):
-                    code = self.api.ocx.GetCommData(trcode, rqname, i, "종목코드").strip()
-                    name = self.api.ocx.GetCommData(trcode, rqname, i, "종목명").strip()
-                    qty = self.api.ocx.GetCommData(trcode, rqname, i, "주문수량").strip()
-                    filled = self.api.ocx.GetCommData(trcode, rqname, i, "체결수량").strip()
-                    price = self.api.ocx.GetCommData(trcode, rqname, i, "주문가격").strip()
-                    order_no = self.api.ocx.GetCommData(trcode, rqname, i, "주문번호").strip()
-                    order_type = self.api.ocx.GetCommData(trcode, rqname, i, "주문구분").strip()
-
-                    logger.info(f"[trading.py] unfilled_orders_req => {code} | {name} | {qty} | {filled} | {price}")
-
-                    orders.append({
-                        "code": code,
-                        "name": name,
-                        "qty": int(qty.replace(",", "") or 0),
-                        "filled": int(filled.replace(",", "") or 0),
-                        "price": int(price.replace(",", "") or 0),
-                        "order_no": order_no,
-                        "order_type": order_type,
-                    })
-
-                self.tr_data["opt10075"] = {"orders": orders}
-
-            elif rqname == "opt10081_req":
-                count = self.api.ocx.GetRepeatCnt(trcode, rqname)
-                rows = []
-                for i in range(count):
-                    date = self.api.ocx.GetCommData(trcode, rqname, i, "일자").strip()
-                    close = self.api.ocx.GetCommData(trcode, rqname, i, "현재가").strip()
-                    high = self.api.ocx.GetCommData(trcode, rqname, i, "고가").strip()
-                    low = self.api.ocx.GetCommData(trcode, rqname, i, "저가").strip()
-                    volume = self.api.ocx.GetCommData(trcode, rqname, i, "거래량").strip()
-
-                    try:
-                        close = int(close)
-                    except:
-                        continue
-                    try:
-                        volume = int(volume.replace(',', ''))
-                    except Exception:
-                        volume = 0
-
-                    rows.append({"일자": date, "현재가": close, "고가": high, "저가": low, "거래량": volume})
-                self.tr_data["opt10081"] = rows
-
-            elif rqname == "market_news_req":
-                news_list = []
-                count = self.api.ocx.GetRepeatCnt(trcode, rqname)
-                for i in range(count):
-                    title = self.api.ocx.GetCommData(trcode, rqname, i, "뉴스제목").strip()
-                    time = self.api.ocx.GetCommData(trcode, rqname, i, "시간").strip()
-                    news_list.append({"title": title, "time": time})
-                self.tr_data["OPT10051"] = news_list
-
-            elif rqname == "opt10001_req":
-                price = self.api.ocx.GetCommData(trcode, rqname, 0, "현재가").strip()
-                self.tr_data["opt10001"] = {
-                    "현재가": price
-                }
-
-            elif rqname == "opt10059_req":
-                stocks = []
-                count = int(self.api.ocx.GetRepeatCnt(trcode, rqname))
-                for i in range(1):
-                    date = self.api.ocx.GetCommData(trcode, rqname, i, "일자").strip()
-                    cur_price = self.api.ocx.GetCommData(trcode, rqname, i, "현재가").strip()
-                    debi_sign = self.api.ocx.GetCommData(trcode, rqname, i, "대비기호").strip()
-                    debi_yesterday = self.api.ocx.GetCommData(trcode, rqname, i, "전일대비").strip()
-                    fluctuation = self.api.ocx.GetCommData(trcode, rqname, i, "등락율").strip()
-                    cumulative_amount = self.api.ocx.GetCommData(trcode, rqname, i, "누적거래량").strip()
-                    cumulative_paymt = self.api.ocx.GetCommData(trcode, rqname, i, "누적거래대금").strip()
-                    individual = self.api.ocx.GetCommData(trcode, rqname, i, "개인투자자").strip()
-                    fr = self.api.ocx.GetCommData(trcode, rqname, i, "외국인투자자").strip()
-                    inst = self.api.ocx.GetCommData(trcode, rqname, i, "기관계").strip()
-                    finance = self.api.ocx.GetCommData(trcode, rqname, i, "금융투자").strip()
-                    insr = self.api.ocx.GetCommData(trcode, rqname, i, "보험").strip()
-                    investmTrusts = self.api.ocx.GetCommData(trcode, rqname, i, "투신").strip()
-                    etc = self.api.ocx.GetCommData(trcode, rqname, i, "기타금융").strip()
-                    bank = self.api.ocx.GetCommData(trcode, rqname, i, "은행").strip()
-                    yun = self.api.ocx.GetCommData(trcode, rqname, i, "연기금등").strip()
-                    samo = self.api.ocx.GetCommData(trcode, rqname, i, "사모펀드").strip()
-                    nation = self.api.ocx.GetCommData(trcode, rqname, i, "국가").strip()
-                    etc_co = self.api.ocx.GetCommData(trcode, rqname, i, "기타법인").strip()
-                    inout = self.api.ocx.GetCommData(trcode, rqname, i, "내외국인").strip()
-
-                    logger.info(f"date : {date}, cur_price : {cur_price}, debi_sign : {debi_sign}, debi_yesterday : {debi_yesterday}, fluctuation : {fluctuation}, cumulative_amount : {cumulative_amount}, cumulative_paymt : {cumulative_paymt}, individual : {individual}, fr : {fr}, inst : {inst}, finance : {finance}, insr : {insr}, investmTrusts : {investmTrusts}, etc : {etc}, bank : {bank}, yun : {yun}, samo : {samo}, nation : {nation}, etc_co : {etc_co}, inout : {inout} ")
-
-                    stocks.append({
-                        "date": date,
-                        "cur_price": cur_price,
-                        "debi_sign": debi_sign,
-                        "debi_yesterday": debi_yesterday,
-                        "fluctuation": fluctuation,
-                        "cumulative_amount": cumulative_amount,
-                        "cumulative_paymt": cumulative_paymt,
-                        "individual": individual,
-                        "fr": fr,
-                        "inst": inst,
-                        "finance": finance,
-                        "insr": insr,
-                        "investmTrusts": investmTrusts,
-                        "etc": etc,
-                        "bank": bank,
-                        "yun": yun,
-                        "samo": samo,
-                        "nation": nation,
-                        "etc_co": etc_co,
-                        "inout": inout
-                    })
-                self.tr_data["opt10059"] = {"stocks": stocks}
-
-            elif rqname == "sector_volume_req":
-                sectors = []
-                count = int(self.api.ocx.GetRepeatCnt(trcode, rqname))
-                for i in range(count):
-                    relative = self.api.ocx.GetCommData(trcode, rqname, i, "전일대비").strip()
-                    volume = self.api.ocx.GetCommData(trcode, rqname, i, "거래량").strip()
-                    paymt = self.api.ocx.GetCommData(trcode, rqname, i, "거래대금").strip()
-
-                    try:
-                        volume = int(volume.replace(',', ''))
-                    except (ValueError, AttributeError):
-                        volume = 0
-                    try:
-                        paymt = int(paymt.replace(',', ''))
-                    except (ValueError, AttributeError):
-                        paymt = 0
-
-                    sectors.append({"relative": relative, "volume": volume, "paymt": paymt})
-                self.tr_data["OPT20001"] = {"sectors": sectors}
-
-        finally:
-            QTimer.singleShot(0, self.tr_event_loop.quit)
+        self.tr_client.on_receive(screen_no, rqname, trcode, prev_next)